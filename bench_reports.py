@@ -0,0 +1,285 @@
+"""Benchmarks of the report, dashboard and table-listing paths against synthetic history.
+
+Fills a dedicated MySQL database with N years of daily results, starts
+the app on it (with a fake Zabbix server so no network is involved) and
+times, end to end as the user sees them:
+
+    generate_report   button press until the report is on screen, per report type
+    display_report    rendering alone, with the data of the matching generate_report
+    refresh_tables_list
+    update_dashboard_calendar   cold (cache cleared) and warm
+    export_to_csv     one day, until the success message
+
+Results are written as JSON and can be compared with an earlier run:
+
+    python bench_reports.py --years 5 --checks 40 --output before.json
+    python bench_reports.py --years 5 --checks 40 --output after.json --compare before.json
+
+With --compare the exit status is 1 when a median got slower than
+--threshold percent, so the suite can guard a change in CI.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tkinter as tk
+from datetime import datetime, timedelta
+
+import mysql.connector
+
+import work
+from fake_zabbix import FakeZabbixServer
+from healthcheck_core.storage import ensure_schema, get_db_pool, upsert_results
+
+REPORT_TYPES = ['daily', 'weekly', 'monthly', 'yearly', 'custom']
+
+
+def seed_history(db_config, years, checks, failure_rate, seed=0, batch_days=30):
+    """Recreate db_config's database with `years` of results ending yesterday. Returns (rows, first_day, last_day)."""
+    conn = mysql.connector.connect(host=db_config['host'], user=db_config['user'], password=db_config['password'])
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {db_config['database']}")
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    ensure_schema(db_config)
+
+    rng = random.Random(seed)
+    names = [f"Synthetic check {i:03d}" for i in range(1, checks + 1)]
+    last_day = datetime.now().date() - timedelta(days=1)
+    first_day = last_day - timedelta(days=int(years * 365) - 1)
+    rows_written = 0
+    db_pool = get_db_pool(db_config)
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        day = first_day
+        while day <= last_day:
+            rows = []
+            for offset in range(batch_days):
+                current = day + timedelta(days=offset)
+                if current > last_day:
+                    break
+                for name in names:
+                    failed = rng.random() < failure_rate
+                    rows.append((current, name, 'NOT OK' if failed else 'OK',
+                                 'Synthetic failure' if failed else '', '', 'bench'))
+            upsert_results(cursor, rows)
+            conn.commit()
+            rows_written += len(rows)
+            day += timedelta(days=batch_days)
+        cursor.close()
+    return rows_written, first_day, last_day
+
+
+def wait_for(app, target, name, trigger, timeout):
+    """Call trigger() and run the Tk loop until target.<name> has returned. Returns the elapsed ms.
+
+    target.<name> is wrapped for the duration of the call; it is the last
+    step of the path being timed (e.g. display_report for generate_report).
+    Returns the arguments it was called with as well.
+    """
+    original = getattr(target, name)
+    finished = []
+
+    def wrapped(*args, **kwargs):
+        try:
+            return original(*args, **kwargs)
+        finally:
+            finished.append((time.perf_counter(), args, kwargs))
+
+    setattr(target, name, wrapped)
+    try:
+        start = time.perf_counter()
+        trigger()
+        while not finished:
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError(f"{name} did not run within {timeout}s")
+            app.root.update()
+            time.sleep(0.001)
+        end, args, kwargs = finished[0]
+        return (end - start) * 1000, args, kwargs
+    finally:
+        setattr(target, name, original)
+
+
+def set_entry(entry, value):
+    entry.delete(0, tk.END)
+    entry.insert(0, value)
+
+
+def select_report(app, report_type, first_day, last_day):
+    """Fill the Reports tab inputs for one report type over the synthetic history."""
+    middle = first_day + (last_day - first_day) / 2
+    app.report_type.set(report_type)
+    if report_type == 'daily':
+        set_entry(app.single_date_entry, f"{middle:%Y-%m-%d}")
+    elif report_type == 'weekly':
+        set_entry(app.week_entry, f"{middle:%Y-%m-%d}")
+    elif report_type == 'monthly':
+        set_entry(app.month_entry, f"{middle:%Y-%m}")
+    elif report_type == 'yearly':
+        set_entry(app.year_entry, str(last_day.year - 1 if last_day.year > first_day.year else last_day.year))
+    else:
+        set_entry(app.start_date_entry, f"{first_day:%Y-%m-%d}")
+        set_entry(app.end_date_entry, f"{last_day:%Y-%m-%d}")
+
+
+def summarize(runs):
+    return {
+        'runs_ms': [round(r, 3) for r in runs],
+        'median_ms': round(statistics.median(runs), 3),
+        'mean_ms': round(statistics.mean(runs), 3),
+        'min_ms': round(min(runs), 3),
+        'max_ms': round(max(runs), 3),
+    }
+
+
+def run_benchmarks(app, first_day, last_day, repeat, timeout):
+    """Time every benchmarked path `repeat` times. Returns {name: [ms, ...]}."""
+    runs = {}
+
+    def record(name, ms):
+        runs.setdefault(name, []).append(ms)
+
+    app.ensure_tab(app.TAB_VIEW_TABLES)
+    app.ensure_tab(app.TAB_REPORTS)
+    app.ensure_tab(app.TAB_DASHBOARD)
+    # Let the startup jobs (day catalog, first Zabbix poll, ...) settle first
+    settle = time.perf_counter()
+    while time.perf_counter() - settle < 1.0:
+        app.root.update()
+        time.sleep(0.01)
+
+    for _ in range(repeat):
+        ms, _, _ = wait_for(app, app, 'show_saved_days', app.refresh_tables_list, timeout)
+        record('refresh_tables_list', ms)
+
+        for report_type in REPORT_TYPES:
+            select_report(app, report_type, first_day, last_day)
+            ms, args, kwargs = wait_for(app, app, 'display_report', app.generate_report, timeout)
+            record(f'generate_report.{report_type}', ms)
+            start = time.perf_counter()
+            app.display_report(*args, **kwargs)
+            app.root.update_idletasks()
+            record(f'display_report.{report_type}', (time.perf_counter() - start) * 1000)
+
+        month = first_day + (last_day - first_day) / 2
+        app.dash_calendar.see(month)
+        app.problem_cache.invalidate()
+        ms, _, _ = wait_for(app, app, 'paint_dashboard_calendar', app.update_dashboard_calendar, timeout)
+        record('update_dashboard_calendar.cold', ms)
+        ms, _, _ = wait_for(app, app, 'paint_dashboard_calendar', app.update_dashboard_calendar, timeout)
+        record('update_dashboard_calendar.warm', ms)
+
+        children = app.tables_tree.get_children()
+        if children:
+            app.tables_tree.selection_set(children[0])
+            ms, _, _ = wait_for(app, work.messagebox, 'showinfo', app.export_to_csv, timeout)
+            record('export_to_csv', ms)
+    return runs
+
+
+def compare(results, baseline, threshold):
+    """Print the median change of every benchmark against a baseline. Returns the names that regressed."""
+    regressed = []
+    print(f"{'benchmark':40} {'baseline':>12} {'current':>12} {'change':>9}", file=sys.stderr)
+    for name, stats in sorted(results['benchmarks'].items()):
+        before = baseline.get('benchmarks', {}).get(name)
+        if not before:
+            print(f"{name:40} {'-':>12} {stats['median_ms']:>10.1f}ms {'new':>9}", file=sys.stderr)
+            continue
+        change = (stats['median_ms'] - before['median_ms']) / before['median_ms'] * 100 if before['median_ms'] else 0.0
+        flag = ' SLOWER' if change > threshold else ''
+        print(f"{name:40} {before['median_ms']:>10.1f}ms {stats['median_ms']:>10.1f}ms {change:>+8.1f}%{flag}",
+              file=sys.stderr)
+        if change > threshold:
+            regressed.append(name)
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark reports, dashboard and table listing on synthetic history")
+    parser.add_argument('--years', type=float, default=3, help="years of daily history to generate")
+    parser.add_argument('--checks', type=int, default=30, help="checks per day")
+    parser.add_argument('--failure-rate', type=float, default=0.05, help="share of NOT OK results (0-1)")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per benchmark")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds before a single run is abandoned")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the synthetic history")
+    parser.add_argument('--zabbix-hosts', type=int, default=2, help="sensor hosts of the fake Zabbix server")
+    parser.add_argument('--db-host', default='localhost')
+    parser.add_argument('--db-user', default='root')
+    parser.add_argument('--db-password', default='123456')
+    parser.add_argument('--database', default='health_checks_bench',
+                        help="database to (re)create for the benchmark; it is dropped first")
+    parser.add_argument('--output', help="write the JSON results here (default: stdout)")
+    parser.add_argument('--compare', metavar='BASELINE', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=20.0,
+                        help="with --compare, percent slowdown of a median that counts as a regression")
+    args = parser.parse_args()
+
+    if args.database == 'health_checks_db':
+        parser.error("refusing to drop the application database; pick another --database")
+    db_config = {'host': args.db_host, 'user': args.db_user, 'password': args.db_password,
+                 'database': args.database}
+
+    seed_start = time.perf_counter()
+    rows, first_day, last_day = seed_history(db_config, args.years, args.checks, args.failure_rate, args.seed)
+    seed_ms = (time.perf_counter() - seed_start) * 1000
+    print(f"[INFO] Seeded {rows} results from {first_day} to {last_day} in {seed_ms:.0f} ms", file=sys.stderr)
+
+    export_dir = tempfile.mkdtemp(prefix='health_check_bench_')
+    with FakeZabbixServer(hosts=args.zabbix_hosts) as zabbix:
+        with open(os.path.join(export_dir, 'zabbix_config.json'), 'w', encoding='utf-8') as f:
+            json.dump({'url': zabbix.url, 'username': 'bench', 'password': 'bench',
+                       'metrics': zabbix.api.metric_registry()}, f)
+        # Export dialog and message boxes would block the run
+        work.filedialog.asksaveasfilename = lambda **kwargs: os.path.join(export_dir, kwargs['initialfile'])
+        work.messagebox.showinfo = lambda *a, **kw: None
+        root = tk.Tk()
+        root.withdraw()
+        app = work.HealthCheckApp(root, username='bench', db_config=db_config, export_dir=export_dir)
+        try:
+            runs = run_benchmarks(app, first_day, last_day, args.repeat, args.timeout)
+        finally:
+            root.destroy()
+
+    results = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'years': args.years,
+            'checks': args.checks,
+            'failure_rate': args.failure_rate,
+            'seed': args.seed,
+            'rows': rows,
+            'first_day': first_day.isoformat(),
+            'last_day': last_day.isoformat(),
+            'repeat': args.repeat,
+            'seed_ms': round(seed_ms, 1),
+        },
+        'benchmarks': {name: summarize(ms) for name, ms in sorted(runs.items())},
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"[INFO] Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            print(f"[ERROR] Slower than baseline by more than {args.threshold}%: {', '.join(regressed)}",
+                  file=sys.stderr)
+            raise SystemExit(1)
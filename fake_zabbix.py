@@ -0,0 +1,275 @@
+"""Stand-in Zabbix JSON-RPC server for offline testing and benchmarks.
+
+Implements user.login, user.logout, item.get, history.get and trend.get
+for a set of synthetic environment sensors. Each host env-01, env-02, ...
+has a temperature item (sensor.temp) and a humidity item (sensor.humidity)
+with deterministic values that follow a daily cycle, so repeated runs see
+the same data. Latency and the share of failed calls are configurable.
+
+Run it next to the app:
+
+    python fake_zabbix.py --hosts 20 --latency 0.05 --error-rate 0.02
+
+and point the Zabbix settings at the printed URL (any user and password
+log in), or use FakeZabbixServer from code:
+
+    with FakeZabbixServer(hosts=4) as server:
+        client = ZabbixClient(server.url, 'user', 'pass')
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds between two history values of an item
+HISTORY_STEP = 60
+# (key, name, unit, base value, daily swing, value_type) of the items on every host
+SENSOR_ITEMS = [
+    ('sensor.temp', 'Temperature', '°C', 23.0, 3.0, 0),
+    ('sensor.humidity', 'Humidity', '%', 50.0, 8.0, 0),
+]
+
+
+class FakeZabbix:
+    """The API state and synthetic data behind the server.
+
+    latency is added to every call (plus up to `jitter` more), error_rate
+    is the share of authenticated calls answered with a JSON-RPC error,
+    and api_token, if set, is accepted like a session token. version is
+    what apiinfo.version reports; as on a real server, 6.4+ logs in with
+    "username" and accepts a Bearer header, older versions take "user"
+    and the "auth" field, and 7.2+ no longer accepts "auth".
+    """
+    def __init__(self, hosts=2, latency=0.0, jitter=0.0, error_rate=0.0, api_token=None, seed=0, version='7.0.0'):
+        self.hosts = [f"env-{i:02d}" for i in range(1, hosts + 1)]
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.api_token = api_token
+        self.version = version
+        self.random = random.Random(seed)
+        self.tokens = set()
+        self.calls = {}
+        self._lock = threading.Lock()
+        # itemid -> (host, key, base, swing, phase)
+        self.items = {}
+        for h, host in enumerate(self.hosts):
+            for k, (key, _, _, base, swing, _) in enumerate(SENSOR_ITEMS):
+                itemid = str(10000 + h * len(SENSOR_ITEMS) + k)
+                self.items[itemid] = (host, key, base, swing, (h * 37 + k * 11) % 24)
+
+    def metric_registry(self):
+        """The Zabbix settings 'metrics' list covering every fake sensor, one room per host."""
+        return [
+            {'room': host, 'host': host, 'key': key, 'name': name, 'unit': unit}
+            for host in self.hosts for key, name, unit, _, _, _ in SENSOR_ITEMS
+        ]
+
+    def value(self, itemid, clock):
+        """The value of an item at a Unix time: a daily sine wave plus a small deterministic wobble."""
+        _, _, base, swing, phase = self.items[itemid]
+        hours = clock / 3600.0 + phase
+        wobble = math.sin(clock / 600.0 + int(itemid)) * swing * 0.1
+        return round(base + swing * math.sin(hours * 2 * math.pi / 24) + wobble, 2)
+
+    def handle(self, request, bearer=None):
+        """Answer one JSON-RPC request dict with a response dict."""
+        method = request.get('method')
+        params = request.get('params') or {}
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            fail = method != 'user.login' and self.random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+
+        def reply(result):
+            return {'jsonrpc': '2.0', 'result': result, 'id': request.get('id')}
+
+        def error(code, message, data):
+            return {'jsonrpc': '2.0', 'error': {'code': code, 'message': message, 'data': data},
+                    'id': request.get('id')}
+
+        version = tuple(int(part) for part in self.version.split('.')[:2])
+        if method == 'apiinfo.version':
+            if request.get('auth') or bearer:
+                return error(-32602, 'Invalid params.',
+                             'The "apiinfo.version" method must be called without authorization.')
+            return reply(self.version)
+        if method == 'user.login':
+            user = params.get('username' if version >= (6, 4) else 'user')
+            if not user or not params.get('password'):
+                return error(-32602, 'Invalid params.', 'Incorrect user name or password.')
+            token = uuid.uuid4().hex
+            with self._lock:
+                self.tokens.add(token)
+            return reply(token)
+        if version < (6, 4):
+            bearer = None
+        token = bearer or (request.get('auth') if version < (7, 2) else None)
+        if not token:
+            return error(-32602, 'Invalid params.', 'Not authorised.')
+        if token != self.api_token and token not in self.tokens:
+            return error(-32602, 'Invalid params.', 'Session terminated, re-login, please.')
+        if fail:
+            return error(-32500, 'Application error.', 'Simulated failure.')
+        if method == 'user.logout':
+            with self._lock:
+                self.tokens.discard(token)
+            return reply(True)
+        if method == 'item.get':
+            return reply(self.item_get(params))
+        if method == 'history.get':
+            return reply(self.history_get(params))
+        if method == 'trend.get':
+            return reply(self.trend_get(params))
+        return error(-32601, 'Method not found.', f'Incorrect API "{method}".')
+
+    def item_get(self, params):
+        hosts = params.get('host') or params.get('filter', {}).get('host')
+        hosts = [hosts] if isinstance(hosts, str) else hosts
+        keys = params.get('filter', {}).get('key_')
+        keys = [keys] if isinstance(keys, str) else keys
+        itemids = params.get('itemids')
+        now = int(time.time())
+        items = []
+        for itemid, (host, key, _, _, _) in self.items.items():
+            if (hosts and host not in hosts) or (keys and key not in keys) or (itemids and itemid not in itemids):
+                continue
+            spec = next(s for s in SENSOR_ITEMS if s[0] == key)
+            clock = now - now % HISTORY_STEP
+            items.append({
+                'itemid': itemid, 'key_': key, 'name': spec[1], 'units': spec[2], 'value_type': str(spec[5]),
+                'host': host, 'lastclock': str(clock), 'lastvalue': str(self.value(itemid, clock)),
+            })
+        return self.select(items, params.get('output'))
+
+    def history_get(self, params):
+        itemids = self.requested_items(params)
+        start, till = self.time_range(params)
+        limit = params.get('limit')
+        clocks = range(start + (-start) % HISTORY_STEP, till + 1, HISTORY_STEP)
+        if params.get('sortorder') == 'DESC':
+            clocks = reversed(clocks)
+        rows = []
+        for clock in clocks:
+            for itemid in itemids:
+                rows.append({'itemid': itemid, 'clock': str(clock), 'value': str(self.value(itemid, clock)), 'ns': '0'})
+            if limit and len(rows) >= int(limit):
+                rows = rows[:int(limit)]
+                break
+        return self.select(rows, params.get('output'))
+
+    def trend_get(self, params):
+        itemids = self.requested_items(params)
+        start, till = self.time_range(params)
+        rows = []
+        for hour in range(start + (-start) % 3600, till + 1, 3600):
+            for itemid in itemids:
+                values = [self.value(itemid, hour + s) for s in range(0, 3600, HISTORY_STEP)]
+                rows.append({
+                    'itemid': itemid, 'clock': str(hour), 'num': str(len(values)),
+                    'value_min': str(min(values)), 'value_avg': str(round(sum(values) / len(values), 4)),
+                    'value_max': str(max(values)),
+                })
+        limit = params.get('limit')
+        return self.select(rows[:int(limit)] if limit else rows, params.get('output'))
+
+    def requested_items(self, params):
+        itemids = params.get('itemids') or list(self.items)
+        itemids = [itemids] if isinstance(itemids, (str, int)) else itemids
+        return [str(i) for i in itemids if str(i) in self.items]
+
+    @staticmethod
+    def time_range(params):
+        now = int(time.time())
+        return int(params.get('time_from', now - 86400)), int(params.get('time_till', now))
+
+    @staticmethod
+    def select(rows, output):
+        if not output or output == 'extend':
+            return rows
+        return [{field: row[field] for field in output if field in row} for row in rows]
+
+
+class FakeZabbixServer:
+    """FakeZabbix served over HTTP on a background thread; usable as a context manager."""
+    def __init__(self, host='127.0.0.1', port=0, **options):
+        self.api = FakeZabbix(**options)
+        api = self.api
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                    bearer = (self.headers.get('Authorization') or '').replace('Bearer ', '') or None
+                    response = api.handle(request, bearer)
+                except ValueError:
+                    response = {'jsonrpc': '2.0', 'error': {'code': -32700, 'message': 'Parse error.',
+                                                            'data': 'Invalid JSON.'}, 'id': None}
+                body = json.dumps(response).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api_jsonrpc.php"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Zabbix JSON-RPC server")
+    parser.add_argument('--bind', default='127.0.0.1', help="address to listen on")
+    parser.add_argument('--port', type=int, default=8085, help="port to listen on")
+    parser.add_argument('--hosts', type=int, default=2, help="number of sensor hosts (two items each)")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every call")
+    parser.add_argument('--jitter', type=float, default=0.0, help="up to this many extra seconds per call")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of calls answered with an error (0-1)")
+    parser.add_argument('--api-token', help="also accept this API token")
+    parser.add_argument('--zabbix-version', default='7.0.0', help="version reported by apiinfo.version")
+    args = parser.parse_args()
+
+    server = FakeZabbixServer(args.bind, args.port, hosts=args.hosts, latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate, api_token=args.api_token, version=args.zabbix_version)
+    config = {'url': server.url, 'username': 'api_user', 'password': 'api_password',
+              'api_token': args.api_token or '', 'metrics': server.api.metric_registry()}
+    print(f"[INFO] Fake Zabbix listening on {server.url}")
+    print("[INFO] Zabbix settings for this server:")
+    print(json.dumps(config, indent=2, ensure_ascii=False))
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
@@ -0,0 +1,11 @@
+"""Health check engine without a UI.
+
+storage      MySQL pool, schema migrations, check results and sensor readings
+aggregation  report periods, result summaries and sensor statistics
+rendering    report text segments and PDF layouts
+zabbix       Zabbix client, metric polling, history backfill and reading snapshot
+instrumentation  span timings and counters of the hot paths
+
+The Tk app (work.py) is one client of these modules; scripts and services
+can call them directly without a display.
+"""
@@ -0,0 +1,188 @@
+"""Pure aggregation of check results and sensor readings; no database or UI access."""
+from calendar import monthrange
+from datetime import datetime, timedelta
+
+
+def year_chunks(start_date, end_date):
+    """Split a date range into (first_day, last_day) pieces that do not cross a year boundary."""
+    chunks = []
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start.replace(month=12, day=31), end_date)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def merge_range_summaries(summaries):
+    """Combine range summaries of consecutive periods, oldest first, into one."""
+    check_stats = {}
+    total_days = 0
+    last_user = None
+    for summary in summaries:
+        for check_name, stats in summary['check_stats'].items():
+            merged = check_stats.setdefault(check_name, {
+                'total': 0, 'ok': 0, 'not_ok': 0, 'last_reason': None, 'last_date': None
+            })
+            merged['total'] += stats['total']
+            merged['ok'] += stats['ok']
+            merged['not_ok'] += stats['not_ok']
+            if stats['last_date']:
+                merged['last_reason'] = stats['last_reason']
+                merged['last_date'] = stats['last_date']
+        total_days += summary['total_days']
+        last_user = summary['last_user'] or last_user
+    return {
+        'check_stats': dict(sorted(check_stats.items())),
+        'total_days': total_days,
+        'last_user': last_user
+    }
+
+
+def load_metric_registry(zabbix_config):
+    """The metrics to poll, from zabbix_config['metrics'] or, for older configs, host/temp_key/humidity_key.
+
+    Each metric is a dict with room, host, key, name and unit, plus optional
+    inclusive min/max thresholds outside of which it is NOT OK, and an
+    exclusive upper limit `below` that the value must stay under, e.g.
+    {"room": "DC1", "host": "rack-a-env", "key": "sensor.temp", "name": "Temperature", "unit": "°C", "below": 28}
+    """
+    metrics = zabbix_config.get('metrics')
+    if not metrics:
+        host = zabbix_config.get('host')
+        metrics = [
+            {'room': host, 'host': host, 'key': zabbix_config.get('temp_key'),
+             'name': 'Temperature', 'unit': '°C', 'below': 28},
+            {'room': host, 'host': host, 'key': zabbix_config.get('humidity_key'),
+             'name': 'Humidity', 'unit': '%', 'min': 40, 'max': 60},
+        ]
+    return [dict({'room': m.get('host'), 'name': m.get('key'), 'unit': '', 'min': None, 'max': None, 'below': None},
+                 **m)
+            for m in metrics]
+
+
+def metric_status(metric, value):
+    """'OK' if value is within the metric's thresholds, else 'NOT OK' (also when there is no value)."""
+    if value is None:
+        return 'NOT OK'
+    if metric['min'] is not None and value < metric['min']:
+        return 'NOT OK'
+    if metric['max'] is not None and value > metric['max']:
+        return 'NOT OK'
+    if metric.get('below') is not None and value >= metric['below']:
+        return 'NOT OK'
+    return 'OK'
+
+
+def aggregate_by_room(readings):
+    """Min/max/avg of each metric per room, as {room: {name: {unit, sensors, min, max, avg, status}}}."""
+    rooms = {}
+    for reading in readings:
+        stats = rooms.setdefault(reading['room'], {}).setdefault(reading['name'], {
+            'unit': reading['unit'], 'sensors': 0, 'values': [], 'status': 'OK'
+        })
+        stats['sensors'] += 1
+        if reading['value'] is not None:
+            stats['values'].append(reading['value'])
+        if reading['status'] != 'OK':
+            stats['status'] = 'NOT OK'
+    for metrics in rooms.values():
+        for stats in metrics.values():
+            values = stats.pop('values')
+            stats['min'] = min(values) if values else None
+            stats['max'] = max(values) if values else None
+            stats['avg'] = round(sum(values) / len(values), 2) if values else None
+    return rooms
+
+
+def format_room_stats(rooms):
+    """One line per room metric, e.g. 'DC1 Temperature: 21.5-24.0 °C (avg 22.6, 3 sensors) OK'."""
+    lines = []
+    for room, metrics in rooms.items():
+        for name, stats in metrics.items():
+            if stats['avg'] is None:
+                values = "N/A"
+            elif stats['sensors'] == 1:
+                values = f"{stats['avg']} {stats['unit']}"
+            else:
+                values = (f"{stats['min']}-{stats['max']} {stats['unit']} "
+                          f"(avg {stats['avg']}, {stats['sensors']} sensors)")
+            lines.append((f"{room} {name}: {values} {stats['status']}", stats['status']))
+    return lines
+
+
+def summarize_records(data):
+    """Aggregate raw result rows into per-check pass/fail totals (the shape of fetch_range_summary)."""
+    check_stats = {}
+    for record in data:
+        check_name = record['check_name']
+        if check_name not in check_stats:
+            check_stats[check_name] = {
+                'total': 0,
+                'ok': 0,
+                'not_ok': 0,
+                'last_reason': None,
+                'last_date': None
+            }
+        check_stats[check_name]['total'] += 1
+        if record['status'] == "OK":
+            check_stats[check_name]['ok'] += 1
+        else:
+            check_stats[check_name]['not_ok'] += 1
+            check_stats[check_name]['last_reason'] = record.get('reason')
+            check_stats[check_name]['last_date'] = record.get('date')
+    return {
+        'check_stats': check_stats,
+        'total_days': len({r['date'] for r in data if 'date' in r}),
+        'last_user': None
+    }
+
+
+REPORT_TYPES = ('daily', 'weekly', 'monthly', 'yearly', 'custom')
+
+
+class InvalidReportRange(ValueError):
+    """A custom report range that ends before it starts."""
+
+
+def report_period(report_type, value, end_value=None):
+    """(title, start_date, end_date) of a report.
+
+    value is the day (YYYY-MM-DD) of a daily report, the first day of a
+    weekly or custom one, the month (YYYY-MM) of a monthly one and the year
+    of a yearly one; end_value is the last day of a custom report. Raises
+    ValueError for input that does not parse and InvalidReportRange for an
+    inverted custom range.
+    """
+    if report_type == 'daily':
+        day = datetime.strptime(value, '%Y-%m-%d').date()
+        return f"Daily Health Check Report - {day:%Y-%m-%d}", day, day
+    if report_type == 'weekly':
+        start_date = datetime.strptime(value, '%Y-%m-%d').date()
+        end_date = start_date + timedelta(days=6)
+        return f"Weekly Health Check Report - {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}", start_date, end_date
+    if report_type == 'monthly':
+        year, month = map(int, value.split('-'))
+        first_day = datetime(year, month, 1).date()
+        last_day = datetime(year, month, monthrange(year, month)[1]).date()
+        return f"Monthly Health Check Report - {first_day:%Y-%m}", first_day, last_day
+    if report_type == 'yearly':
+        year = int(value)
+        return f"Yearly Health Check Report - {year}", datetime(year, 1, 1).date(), datetime(year, 12, 31).date()
+    if report_type == 'custom':
+        start_date = datetime.strptime(value, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end_value or '', '%Y-%m-%d').date()
+        if start_date > end_date:
+            raise InvalidReportRange("start date must be before end date")
+        return f"Custom Health Check Report - {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}", start_date, end_date
+    raise ValueError(f"unknown report type {report_type!r}")
+
+
+def missing_reasons(form_rows):
+    """Names of the NOT OK checks in {check_name: (status, reason, notes)} that have no reason."""
+    return [name for name, (status, reason, _) in form_rows.items() if status == "NOT OK" and not reason]
+
+
+def changed_rows(form_rows, saved_rows):
+    """The rows of form_rows that differ from saved_rows, the values last saved."""
+    return {name: values for name, values in form_rows.items() if saved_rows.get(name) != values}
@@ -0,0 +1,309 @@
+"""Local HTTP/JSON API for automated check submission and read-only report data.
+
+    POST /api/results   submit a batch of check results
+    GET  /api/status    per-check status of a day (?date=YYYY-MM-DD, default today)
+    GET  /api/report    report aggregates (?type=monthly&period=previous, ?type=custom&period=...&end=...)
+    GET  /api/health    liveness probe
+
+A submission is either a list of results or an object with a default
+date and username for them:
+
+    {"date": "2026-10-18", "username": "nagios",
+     "results": [{"check_name": "Printers", "status": "NOT OK", "reason": "Paper jam", "notes": ""}, ...]}
+
+Each result may carry its own date and username. A batch is validated as
+a whole (NOT OK needs a reason, as in the form) and written in one
+transaction with multi-row upserts. When a token is set, every request
+must send it as "Authorization: Bearer <token>".
+
+Run it on its own with `python work.py serve`, or next to the UI with
+`python work.py --api-port PORT`.
+"""
+import argparse
+import json
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from . import instrumentation
+from .aggregation import load_metric_registry
+from .cli import resolve_period
+from .reports import build_report
+from .storage import (CHECK_NAME_MAX, DB_POOL_SIZE, DEFAULT_DB_CONFIG, ensure_schema, fetch_day_summary, get_db_pool,
+                      upsert_results)
+from .zabbix import read_zabbix_config
+
+# Port the API listens on by default
+INGEST_API_PORT = 8086
+# Largest request body and batch accepted
+INGEST_MAX_BODY = 4 * 1024 * 1024
+INGEST_MAX_BATCH = 5000
+# Rows per upsert statement; a batch is still committed once
+INGEST_INSERT_BATCH = 1000
+# Requests handled at the same time (each holds one pooled connection), and
+# seconds a request waits for a slot before it is answered with 503
+INGEST_MAX_CONCURRENT = 4
+INGEST_QUEUE_TIMEOUT = 30
+RESULT_STATUSES = ('OK', 'NOT OK')
+# Longest username stored with a result (VARCHAR(50))
+USERNAME_MAX = 50
+
+
+class RequestTooLarge(ValueError):
+    """A request body over INGEST_MAX_BODY; answered with 413."""
+
+
+class InvalidSubmission(ValueError):
+    """A submitted batch that cannot be written; errors lists every problem found."""
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def parse_results(payload, today=None):
+    """Validate a submission and return its (check_date, check_name, status, reason, notes, username) rows.
+
+    A check submitted twice for the same day keeps its last entry. Raises
+    InvalidSubmission listing every invalid result.
+    """
+    today = today or datetime.now().date()
+    if isinstance(payload, dict):
+        results, defaults = payload.get('results'), payload
+    else:
+        results, defaults = payload, {}
+    if not isinstance(results, list) or not results:
+        raise InvalidSubmission(["expected a non-empty list of results"])
+    if len(results) > INGEST_MAX_BATCH:
+        raise InvalidSubmission([f"at most {INGEST_MAX_BATCH} results per request"])
+
+    rows = {}
+    errors = []
+    for i, result in enumerate(results):
+        if not isinstance(result, dict):
+            errors.append(f"result {i}: expected an object")
+            continue
+        check_name = str(result.get('check_name') or '').strip()
+        status = str(result.get('status') or '').strip().upper()
+        reason = str(result.get('reason') or '').strip()
+        notes = str(result.get('notes') or '').strip()
+        username = result.get('username') or defaults.get('username')
+        day = result.get('date') or defaults.get('date')
+        if not check_name or len(check_name) > CHECK_NAME_MAX:
+            errors.append(f"result {i}: check_name is required (at most {CHECK_NAME_MAX} characters)")
+        if username is not None and (not isinstance(username, str) or len(username) > USERNAME_MAX):
+            errors.append(f"result {i}: username must be a string of at most {USERNAME_MAX} characters")
+        if status not in RESULT_STATUSES:
+            errors.append(f"result {i}: status must be one of {', '.join(RESULT_STATUSES)}")
+        elif status == 'NOT OK' and not reason:
+            errors.append(f"result {i}: a NOT OK result needs a reason")
+        try:
+            day = datetime.strptime(day, '%Y-%m-%d').date() if day else today
+        except (TypeError, ValueError):
+            errors.append(f"result {i}: date must be YYYY-MM-DD")
+            continue
+        rows[(day, check_name)] = (day, check_name, status, reason, notes, username)
+    if errors:
+        raise InvalidSubmission(errors)
+    return list(rows.values())
+
+
+def write_results(db_pool, rows, batch_size=INGEST_INSERT_BATCH):
+    """Upsert result rows in batches of multi-row statements, committed together. Returns the days written."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            for i in range(0, len(rows), batch_size):
+                upsert_results(cursor, rows[i:i + batch_size])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    return sorted({row[0] for row in rows})
+
+
+def day_status(db_pool, day):
+    """The /api/status reply for one day."""
+    checks = fetch_day_summary(db_pool, day)
+    return {
+        'date': day.isoformat(),
+        'ok': sum(1 for c in checks if c['status'] == 'OK'),
+        'not_ok': sum(1 for c in checks if c['status'] != 'OK'),
+        'checks': [
+            {'check_name': c['check_name'], 'status': c['status'],
+             'ok_count': int(c['ok_count']), 'not_ok_count': int(c['not_ok_count'])}
+            for c in checks
+        ],
+    }
+
+
+class IngestServer:
+    """The API served over HTTP on a background thread; usable as a context manager.
+
+    metrics is the Zabbix metric registry used to judge the recorded
+    conditions in /api/report. on_write, if given, is called with the list
+    of days after every successful submission, on the server thread.
+    """
+    def __init__(self, db_pool, host='127.0.0.1', port=INGEST_API_PORT, token=None, metrics=(), on_write=None,
+                 max_concurrent=INGEST_MAX_CONCURRENT):
+        self.db_pool = db_pool
+        # The HTTP server runs one thread per connection; this bounds how many reach the database
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.token = token
+        self.metrics = list(metrics)
+        self.on_write = on_write
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self.dispatch('GET')
+
+            def do_POST(self):
+                self.dispatch('POST')
+
+            def dispatch(self, method):
+                url = urlsplit(self.path)
+                route = server.ROUTES.get((method, url.path.rstrip('/')))
+                if route is None:
+                    # The request body is left unread, so the connection cannot be reused
+                    self.close_connection = True
+                    return self.reply(404, {'error': f"no such endpoint: {method} {url.path}"})
+                if server.token and self.headers.get('Authorization') != f"Bearer {server.token}":
+                    self.close_connection = True
+                    return self.reply(401, {'error': "missing or wrong API token"})
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                if not server.slots.acquire(timeout=INGEST_QUEUE_TIMEOUT):
+                    self.close_connection = True
+                    return self.reply(503, {'error': "server busy, retry later"})
+                try:
+                    with instrumentation.span(f"api.{route}"):
+                        status, body = getattr(server, route)(self, query)
+                except InvalidSubmission as e:
+                    status, body = 400, {'error': "invalid submission", 'details': e.errors}
+                except RequestTooLarge as e:
+                    status, body = 413, {'error': str(e)}
+                except ValueError as e:
+                    status, body = 400, {'error': str(e)}
+                except Exception as e:
+                    print(f"[ERROR] API {method} {url.path} failed: {e}")
+                    status, body = 500, {'error': str(e)}
+                finally:
+                    server.slots.release()
+                self.reply(status, body)
+
+            def read_json(self):
+                # The body is left unread on every error below, so the connection cannot be reused
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self.close_connection = True
+                    raise ValueError("invalid Content-Length")
+                if length > INGEST_MAX_BODY:
+                    self.close_connection = True
+                    raise RequestTooLarge(f"request body larger than {INGEST_MAX_BODY} bytes")
+                try:
+                    return json.loads(self.rfile.read(length) or b'null')
+                except ValueError:
+                    raise ValueError("request body is not valid JSON")
+
+            def reply(self, status, body):
+                data = json.dumps(body, default=str).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    ROUTES = {
+        ('GET', '/api/health'): 'get_health',
+        ('POST', '/api/results'): 'post_results',
+        ('GET', '/api/status'): 'get_status',
+        ('GET', '/api/report'): 'get_report',
+    }
+
+    def get_health(self, request, query):
+        return 200, {'status': 'ok'}
+
+    def post_results(self, request, query):
+        rows = parse_results(request.read_json())
+        days = write_results(self.db_pool, rows)
+        instrumentation.count("api.results_written", len(rows))
+        if self.on_write:
+            self.on_write(days)
+        return 200, {'written': len(rows), 'days': [day.isoformat() for day in days]}
+
+    def get_status(self, request, query):
+        day = datetime.strptime(query['date'], '%Y-%m-%d').date() if query.get('date') else datetime.now().date()
+        return 200, day_status(self.db_pool, day)
+
+    def get_report(self, request, query):
+        report_type = query.get('type', 'daily')
+        period = resolve_period(report_type, query.get('period') or ('today' if report_type == 'daily' else 'current'))
+        return 200, build_report(self.db_pool, report_type, period, query.get('end'), self.metrics).as_dict()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None, export_dir=None):
+    """Entry point of `work.py serve`: run the API in the foreground until interrupted."""
+    export_dir = export_dir or os.getcwd()
+    parser = argparse.ArgumentParser(prog='work.py serve', description="Serve the health check ingestion API")
+    parser.add_argument('--bind', default='127.0.0.1', help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=INGEST_API_PORT,
+                        help=f"port to listen on (default: {INGEST_API_PORT})")
+    parser.add_argument('--token', default=os.environ.get('HEALTH_CHECK_API_TOKEN'),
+                        help="require this bearer token (default: $HEALTH_CHECK_API_TOKEN)")
+    parser.add_argument('--zabbix-config', default=os.path.join(export_dir, 'zabbix_config.json'),
+                        help="Zabbix settings file whose metric thresholds judge the recorded conditions")
+    parser.add_argument('--max-concurrent', type=int, default=INGEST_MAX_CONCURRENT,
+                        help=f"requests handled at the same time (default: {INGEST_MAX_CONCURRENT})")
+    parser.add_argument('--db-pool-size', type=int, help=f"database connections to keep open (default: {DB_POOL_SIZE})")
+    args = parser.parse_args(argv)
+
+    db_config = dict(DEFAULT_DB_CONFIG)
+    if args.db_pool_size:
+        db_config['pool_size'] = args.db_pool_size
+    ensure_schema(db_config)
+    server = IngestServer(get_db_pool(db_config), args.bind, args.port, args.token,
+                          load_metric_registry(read_zabbix_config(args.zabbix_config)),
+                          max_concurrent=args.max_concurrent)
+    print(f"[INFO] Health check API listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
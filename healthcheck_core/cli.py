@@ -0,0 +1,139 @@
+"""Headless report generation for cron and scripts.
+
+    python work.py report --type monthly --period previous --format pdf csv --output-dir /srv/reports
+    python work.py report --type daily --period yesterday --format pdf --email-all-users
+    python work.py report --type monthly --period current --config site-a.json site-b.json
+
+Every configuration file is a JSON object; all keys are optional and
+default to the command-line values:
+
+    {"name": "site-a", "db": {"host": ..., "user": ..., "password": ..., "database": ...},
+     "zabbix_config": "zabbix_config.json", "smtp_settings": "email_sender_info.json",
+     "output_dir": "/srv/reports/site-a", "email": ["ops@example.com"], "email_all_users": false}
+
+Configurations are run in parallel; the exit status is 1 when any failed.
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from .aggregation import REPORT_TYPES, load_metric_registry
+from .reports import REPORT_FORMATS, build_report, send_email
+from .storage import DEFAULT_DB_CONFIG, ensure_schema, fetch_user_emails, get_db_pool
+from .zabbix import read_zabbix_config
+
+# Keywords accepted by --period, per report type, relative to today
+PERIOD_KEYWORDS = {
+    'daily': ('today', 'yesterday'),
+    'weekly': ('current', 'previous'),
+    'monthly': ('current', 'previous'),
+    'yearly': ('current', 'previous'),
+}
+
+
+def resolve_period(report_type, period, today=None):
+    """The report_period value for a --period keyword, or period itself when it is an explicit value.
+
+    Weeks start on Monday; 'current' is the week, month or year that
+    contains today, 'previous' the one before it.
+    """
+    today = today or datetime.now().date()
+    if period not in PERIOD_KEYWORDS.get(report_type, ()):
+        return period
+    previous = period in ('yesterday', 'previous')
+    if report_type == 'daily':
+        return f"{today - timedelta(days=1 if previous else 0):%Y-%m-%d}"
+    if report_type == 'weekly':
+        monday = today - timedelta(days=today.weekday())
+        return f"{monday - timedelta(days=7 if previous else 0):%Y-%m-%d}"
+    if report_type == 'monthly':
+        first = today.replace(day=1)
+        return f"{(first - timedelta(days=1)) if previous else first:%Y-%m}"
+    return str(today.year - 1 if previous else today.year)
+
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def run_config(job, args):
+    """Build, write and (optionally) mail the report of one configuration. Returns the written paths."""
+    name = job.get('name') or ''
+    db_config = dict(DEFAULT_DB_CONFIG, **job.get('db', {}))
+    ensure_schema(db_config)
+    db_pool = get_db_pool(db_config)
+    metrics = load_metric_registry(read_zabbix_config(job.get('zabbix_config', args.zabbix_config)))
+    report = build_report(db_pool, args.type, resolve_period(args.type, args.period), args.end, metrics)
+
+    output_dir = job.get('output_dir', args.output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    stem = f"{name} - {report.file_stem()}" if name else report.file_stem()
+    paths = []
+    for fmt in args.format:
+        path = os.path.join(output_dir, f"{stem}.{fmt}")
+        report.write(fmt, path)
+        paths.append(path)
+        print(f"[INFO] {name or report.title}: wrote {path}")
+
+    recipients = list(job.get('email', args.email or []))
+    if job.get('email_all_users', args.email_all_users):
+        recipients += [e for e in fetch_user_emails(db_pool) if e not in recipients]
+    if recipients:
+        smtp = read_json(job.get('smtp_settings', args.smtp_settings))
+        send_email(recipients, report.title, f"Please find the attached {report.title}.",
+                   [(path, os.path.basename(path)) for path in paths], smtp['from_email'], smtp['smtp_server'],
+                   smtp.get('smtp_port', 587), smtp['smtp_user'], smtp['smtp_pass'])
+        print(f"[INFO] {name or report.title}: mailed to {len(recipients)} recipients")
+    return paths
+
+
+def main(argv=None, export_dir=None):
+    """Entry point of `work.py report`. Returns the process exit status.
+
+    export_dir is where the app keeps its Zabbix and e-mail settings; it
+    provides the defaults of --zabbix-config, --smtp-settings and --output-dir.
+    """
+    export_dir = export_dir or os.getcwd()
+    parser = argparse.ArgumentParser(prog='work.py report', description="Generate health check reports without the UI")
+    parser.add_argument('--type', choices=REPORT_TYPES, default='daily', help="report type (default: daily)")
+    parser.add_argument('--period', required=True,
+                        help="YYYY-MM-DD (daily, weekly, custom start), YYYY-MM (monthly) or YYYY (yearly); "
+                             "or today/yesterday for daily and current/previous for weekly, monthly and yearly")
+    parser.add_argument('--end', help="last day (YYYY-MM-DD) of a custom report")
+    parser.add_argument('--format', nargs='+', choices=REPORT_FORMATS, default=['pdf'],
+                        help="files to write (default: pdf)")
+    parser.add_argument('--output-dir', default=export_dir, help="directory the files are written to")
+    parser.add_argument('--email', nargs='+', metavar='ADDRESS', help="mail the written files to these addresses")
+    parser.add_argument('--email-all-users', action='store_true',
+                        help="mail the written files to every registered user")
+    parser.add_argument('--smtp-settings', default=os.path.join(export_dir, 'email_sender_info.json'),
+                        help="sender and SMTP settings file, as saved by the app's e-mail dialog")
+    parser.add_argument('--zabbix-config', default=os.path.join(export_dir, 'zabbix_config.json'),
+                        help="Zabbix settings file whose metric thresholds judge the recorded conditions")
+    parser.add_argument('--config', nargs='+', metavar='FILE', help="run once per configuration file (JSON)")
+    parser.add_argument('--workers', type=int, default=4, help="configurations run at the same time (default: 4)")
+    args = parser.parse_args(argv)
+    if args.type == 'custom' and not args.end:
+        parser.error("--end is required for custom reports")
+
+    try:
+        jobs = [read_json(path) or {} for path in args.config] if args.config else [{}]
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Could not read configuration: {e}")
+        return 1
+    for path, job in zip(args.config or (), jobs):
+        job.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(args.workers, len(jobs)))) as executor:
+        futures = [(job, executor.submit(run_config, job, args)) for job in jobs]
+        for job, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[ERROR] {job.get('name') or 'Report'} failed: {e}")
+    return 1 if failed else 0
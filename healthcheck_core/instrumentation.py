@@ -0,0 +1,247 @@
+"""Lightweight timing for the app's hot paths.
+
+Code wraps work in named spans:
+
+    with instrumentation.span("zabbix.item.get"):
+        ...
+
+    @instrumentation.timed("ui.generate_report")
+    def generate_report(self): ...
+
+Every span feeds a latency histogram and a call/error count per name.
+The most recent spans are kept for a JSON trace file (Chrome trace event
+format, so it opens in chrome://tracing or Perfetto). Plain counters
+count events that have no duration. All of it is thread-safe and costs a
+lock and two clock reads per span.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Upper bounds (ms) of the latency histogram buckets; slower spans land in the last, open bucket
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+# Spans kept for the trace file
+TRACE_CAPACITY = 10000
+# Spans slower than this are printed as they finish
+SLOW_SPAN_MS = 1000
+
+
+def _round(ms):
+    return None if ms is None else round(ms, 3)
+
+
+class Histogram:
+    """Call count, error count and bucketed latency of one span name."""
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms, error=False):
+        self.count += 1
+        self.errors += int(error)
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def percentile(self, q):
+        """Upper bound (ms) of the bucket holding the q-th percentile, capped at the slowest span."""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_ms': round(self.total_ms, 3),
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'min_ms': _round(self.min_ms),
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': _round(self.percentile(50)),
+            'p95_ms': _round(self.percentile(95)),
+            'p99_ms': _round(self.percentile(99)),
+            'buckets': {(f"<={b}" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}"): n
+                        for i, (b, n) in enumerate(zip(BUCKETS_MS + (None,), self.buckets)) if n},
+        }
+
+
+class Instrumentation:
+    """Registry of span histograms, counters and recent spans."""
+    def __init__(self, trace_capacity=TRACE_CAPACITY, slow_ms=SLOW_SPAN_MS):
+        self.slow_ms = slow_ms
+        self._histograms = {}
+        self._counters = {}
+        self._spans = deque(maxlen=trace_capacity)
+        self._lock = threading.Lock()
+
+    def record(self, name, start, ms, error=None, attrs=None):
+        """Record a finished span that started at perf_counter() time start and took ms."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(ms, error is not None)
+            self._spans.append((name, start, ms, threading.current_thread().name, error, attrs))
+        if ms >= self.slow_ms:
+            print(f"[INFO] Slow: {name} took {ms:.0f} ms")
+
+    def span(self, name, **attrs):
+        """Context manager timing the enclosed block as one span of name."""
+        return _Span(self, name, attrs)
+
+    def timed(self, name=None):
+        """Decorator timing every call of a function as a span (named after the function by default)."""
+        def decorate(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def snapshot(self):
+        """{'spans': {name: histogram summary}, 'counters': {name: value}} as of now."""
+        with self._lock:
+            return {
+                'spans': {name: h.summary() for name, h in sorted(self._histograms.items())},
+                'counters': dict(sorted(self._counters.items())),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._spans.clear()
+
+    def trace(self):
+        """The recent spans and the current metrics as a Chrome trace event document."""
+        # perf_counter() has no fixed epoch; anchor it to wall time for the timestamps
+        offset = time.time() - time.perf_counter()
+        with self._lock:
+            spans = list(self._spans)
+        events = []
+        for name, start, ms, thread, error, attrs in spans:
+            args = dict(attrs or {})
+            if error is not None:
+                args['error'] = error
+            events.append({
+                'name': name, 'cat': name.replace(' ', '.').split('.', 1)[0], 'ph': 'X',
+                'ts': round((start + offset) * 1e6), 'dur': round(ms * 1000),
+                'pid': os.getpid(), 'tid': thread, 'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'metrics': self.snapshot()}
+
+    def write_trace(self, path):
+        """Write trace() to path as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.trace(), f, default=str)
+
+
+class _Span:
+    __slots__ = ('registry', 'name', 'attrs', 'start')
+
+    def __init__(self, registry, name, attrs):
+        self.registry = registry
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.start) * 1000
+        error = f"{exc_type.__name__}: {exc}" if exc_type is not None else None
+        self.registry.record(self.name, self.start, ms, error, self.attrs)
+        return False
+
+
+def query_name(sql):
+    """Span name of a SQL statement: 'db ' plus its first 80 characters with whitespace collapsed."""
+    return "db " + " ".join(str(sql).split())[:80]
+
+
+class InstrumentedCursor:
+    """DB-API cursor whose execute and executemany calls are timed per statement."""
+    def __init__(self, cursor, registry):
+        self._cursor = cursor
+        self._registry = registry
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        with self._registry.span(query_name(operation)):
+            return self._cursor.execute(operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        seq_params = list(seq_params)
+        with self._registry.span(query_name(operation), rows=len(seq_params)):
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """DB-API connection handing out InstrumentedCursors and timing commits."""
+    def __init__(self, connection, registry):
+        self._connection = connection
+        self._registry = registry
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs), self._registry)
+
+    def commit(self):
+        with self._registry.span("db.commit"):
+            return self._connection.commit()
+
+    def __enter__(self):
+        self._connection.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._connection.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+# The app-wide registry and shortcuts to it
+metrics = Instrumentation()
+span = metrics.span
+timed = metrics.timed
+count = metrics.count
+snapshot = metrics.snapshot
+reset = metrics.reset
+write_trace = metrics.write_trace
+
+
+def instrument_connection(connection, registry=metrics):
+    return InstrumentedConnection(connection, registry)
@@ -0,0 +1,352 @@
+"""Report rendering without a display: the report block model, its tagged text and the PDF layouts."""
+from . import instrumentation
+from .aggregation import format_room_stats, summarize_records
+
+# Tags used in report segments; the Tk view styles them, plain text ignores them
+REPORT_TAGS = ('title', 'header', 'ok', 'not_ok', 'reason')
+
+
+def live_condition_lines(zabbix):
+    """(text, tag) lines of a live Zabbix reading (see read_sensors)."""
+    zabbix = zabbix or {}
+    temp = zabbix.get('temp')
+    temp_status = zabbix.get('temp_status')
+    humidity = zabbix.get('humidity')
+    humidity_status = zabbix.get('humidity_status')
+    if zabbix.get('error'):
+        lines = [(f"Error: {zabbix['error']}", 'not_ok')]
+    else:
+        lines = [
+            (f"Temperature: {temp if temp is not None else 'N/A'} °C ({temp_status})",
+             'ok' if temp_status == 'OK' else 'not_ok'),
+            (f"Humidity: {humidity if humidity is not None else 'N/A'} % ({humidity_status})",
+             'ok' if humidity_status == 'OK' else 'not_ok'),
+        ]
+    # Per-room breakdown when more than the two default sensors are polled
+    if zabbix.get('sensors', 0) > 2:
+        lines.extend((line, 'ok' if status == 'OK' else 'not_ok')
+                     for line, status in format_room_stats(zabbix['rooms']))
+    return lines
+
+
+def recorded_condition_lines(conditions):
+    """(text, tag) lines of the stored Zabbix min/max/avg of a period (see ReadingStore.conditions)."""
+    if not conditions:
+        return [("No readings were recorded for this period.", None)]
+    return [
+        (f"{room} {name}: {stats['min']:g} / {stats['max']:g} / {stats['avg']:g} {stats['unit']} ({stats['status']})",
+         'ok' if stats['status'] == 'OK' else 'not_ok')
+        for room, metrics in conditions.items() for name, stats in metrics.items()
+    ]
+
+
+def report_blocks(title, data, report_type, summary=None, conditions=None, live=None):
+    """A report as a list of blocks, the one model the Text view, the text export and the PDFs render from.
+
+    Blocks are tuples whose first item is the kind:
+        ('title', title)
+        ('section', heading, [(text, tag), ...])
+        ('no_data',)
+        ('last_user', username)
+        ('checks', [result row, ...])               daily reports
+        ('totals', [(check_name, stats), ...])      range reports, stats as in fetch_range_summary
+        ('summary', [(text, tag), ...])             tag 'rate' marks the success rate
+
+    Daily reports list data, the raw result rows; range reports may pass
+    pre-aggregated totals as summary instead. conditions are the recorded
+    Zabbix conditions of the period; without them the live reading is shown.
+    """
+    blocks = [('title', title)]
+    if conditions is not None:
+        blocks.append(('section', "Recorded Zabbix Conditions (min / max / avg):",
+                       recorded_condition_lines(conditions)))
+    else:
+        blocks.append(('section', "Zabbix Data (Temperature & Humidity):", live_condition_lines(live)))
+    if not data and not (summary and summary['check_stats']):
+        blocks.append(('no_data',))
+        return blocks
+    # Find last submitter
+    last_submit = None
+    if summary:
+        last_submit = {'username': summary['last_user']}
+    elif data:
+        # Sort by timestamp if available
+        try:
+            last_submit = max(data, key=lambda r: r.get('timestamp', ''))
+        except Exception:
+            last_submit = data[-1]
+    last_user = last_submit.get('username') if last_submit and 'username' in last_submit else None
+    if last_user:
+        blocks.append(('last_user', last_user))
+    if report_type == 'daily':
+        blocks.append(('checks', data))
+        total_checks = len(data)
+        ok_checks = sum(1 for r in data if r['status'] == "OK")
+        blocks.append(('summary', [
+            (f"Total checks: {total_checks}", None),
+            (f"Passed: {ok_checks}", 'ok'),
+            (f"Failed: {total_checks - ok_checks}", 'not_ok'),
+            (f"Success rate: {ok_checks/total_checks:.1%}", 'rate'),
+        ]))
+    else:
+        if summary is None:
+            summary = summarize_records(data)
+        check_stats = summary['check_stats']
+        blocks.append(('totals', list(check_stats.items())))
+        total_checks = sum(stats['total'] for stats in check_stats.values())
+        ok_checks = sum(stats['ok'] for stats in check_stats.values())
+        blocks.append(('summary', [
+            (f"Report period covers {summary['total_days']} days", None),
+            (f"Total checks performed: {total_checks}", None),
+            (f"Total passed: {ok_checks}", 'ok'),
+            (f"Total failed: {total_checks - ok_checks}", 'not_ok'),
+            (f"Overall success rate: {ok_checks/total_checks:.1%}", 'rate'),
+        ]))
+    return blocks
+
+
+def blocks_segments(blocks):
+    """Report blocks as a list of (text, tag) segments, tag being None or one of REPORT_TAGS."""
+    segments = []
+    add = segments.append
+    for block in blocks:
+        kind = block[0]
+        if kind == 'title':
+            add((f"{block[1]}\n", 'title'))
+            add(("=" * len(block[1]) + "\n\n", 'title'))
+        elif kind == 'section':
+            add((f"{block[1]}\n", 'header'))
+            for text, tag in block[2]:
+                add((f"  {text}\n", tag))
+            add(("\n", None))
+        elif kind == 'no_data':
+            add(("No data available for this report period.\n", None))
+        elif kind == 'last_user':
+            add((f"Last submitted by: {block[1]}\n\n", 'header'))
+        elif kind == 'checks':
+            add(("Check Name".ljust(40), 'header'))
+            add(("Status".ljust(10), 'header'))
+            add(("Notes\n", 'header'))
+            add(("-" * 80 + "\n", 'header'))
+            for record in block[1]:
+                add((record['check_name'].ljust(40), None))
+                status = "OK" if record['status'] == "OK" else "NOT OK"
+                add((status.ljust(10), 'ok' if status == "OK" else 'not_ok'))
+                add((f"{record['notes'] or ''}\n", None))
+                if record['status'] == "NOT OK":
+                    add((f"  Reason: {record['reason']}\n\n", 'reason'))
+                else:
+                    add(("\n", None))
+        elif kind == 'totals':
+            add(("Check Name".ljust(40), 'header'))
+            add(("Passed".center(10), 'header'))
+            add(("Failed".center(10), 'header'))
+            add(("Last Failure Date".center(20), 'header'))
+            add(("Last Failure Reason\n", 'header'))
+            add(("-" * 100 + "\n", 'header'))
+            for check_name, stats in block[1]:
+                add((check_name.ljust(40), None))
+                add((str(stats['ok']).center(10), 'ok'))
+                add((str(stats['not_ok']).center(10), 'not_ok'))
+                if stats['last_reason']:
+                    add(((stats['last_date'] or 'N/A').center(20), None))
+                    add((stats['last_reason'] + "\n", 'reason'))
+                else:
+                    add(("N/A".center(20), None))
+                    add(("N/A\n", None))
+        elif kind == 'summary':
+            add(("\nSUMMARY:\n", 'header'))
+            for text, tag in block[1]:
+                add((f"{text}\n", tag if tag in REPORT_TAGS else None))
+    return segments
+
+
+def segments_text(segments):
+    """The plain text of report segments."""
+    return ''.join(text for text, _ in segments)
+
+
+def tagged_text(segments):
+    """The text of report segments and, per tag, the flat list of its Tk "line.column" start/end indices.
+
+    Lets a Text widget take a whole report with one insert and one tag_add per tag.
+    """
+    ranges = {}
+    line, column = 1, 0
+    for text, tag in segments:
+        start = f"{line}.{column}"
+        newlines = text.count("\n")
+        if newlines:
+            line += newlines
+            column = len(text) - text.rfind("\n") - 1
+        else:
+            column += len(text)
+        if tag:
+            ranges.setdefault(tag, []).extend((start, f"{line}.{column}"))
+    return segments_text(segments), ranges
+
+
+# PDF colors as RGB
+PDF_BLUE = (33, 150, 243)
+PDF_GREEN = (76, 175, 80)
+PDF_RED = (244, 67, 54)
+PDF_ORANGE = (255, 152, 0)
+PDF_TEXT = (44, 62, 80)
+PDF_TAG_COLORS = {'ok': PDF_GREEN, 'not_ok': PDF_RED, 'reason': PDF_ORANGE, 'rate': PDF_BLUE}
+# (heading, width in mm, align) of the report table columns
+PDF_CHECK_COLUMNS = [("Check Name", 95, 'L'), ("Status", 25, 'C'), ("Notes", 70, 'L')]
+PDF_TOTAL_COLUMNS = [("Check Name", 70, 'L'), ("Passed", 18, 'C'), ("Failed", 18, 'C'),
+                     ("Last Failure", 26, 'C'), ("Last Failure Reason", 58, 'L')]
+
+
+def pdf_text(text):
+    """text with the characters the core PDF fonts cannot encode (outside latin-1) replaced by '?'."""
+    return str(text).encode('latin-1', 'replace').decode('latin-1')
+
+
+def pdf_fit(pdf, text, width):
+    """text made latin-1 safe (see pdf_text) and shortened with '...' to fit a cell of width mm in the current font."""
+    text = pdf_text(text)
+    if pdf.get_string_width(text) <= width - 2:
+        return text
+    while text and pdf.get_string_width(text + "...") > width - 2:
+        text = text[:-1]
+    return text + "..."
+
+
+def pdf_table_row(pdf, columns, cells, colors=None, fill=False):
+    for i, ((_, width, align), cell) in enumerate(zip(columns, cells)):
+        pdf.set_text_color(*((colors or {}).get(i) or PDF_TEXT))
+        pdf.cell(width, 8, pdf_fit(pdf, cell, width), align=align, fill=fill)
+    pdf.ln(8)
+    pdf.set_text_color(*PDF_TEXT)
+
+
+def write_report_pdf(blocks, path):
+    """Write report blocks (see report_blocks) to path as a styled PDF: blue title and sections, colored totals."""
+    from fpdf import FPDF
+    with instrumentation.span("pdf.render"):
+        pdf = FPDF()
+        pdf.add_page()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.set_font("Arial", size=12)
+        pdf.set_text_color(*PDF_TEXT)
+
+        def heading(text, color=PDF_BLUE):
+            pdf.ln(2)
+            pdf.set_font("Arial", 'B', 13)
+            pdf.set_text_color(*color)
+            pdf.cell(0, 10, pdf_text(text), ln=1)
+            pdf.set_font("Arial", size=12)
+            pdf.set_text_color(*PDF_TEXT)
+
+        def table_header(columns):
+            pdf.ln(2)
+            pdf.set_font("Arial", 'B', 12)
+            pdf.set_fill_color(224, 247, 250)
+            pdf_table_row(pdf, columns, [name for name, _, _ in columns], fill=True)
+            pdf.set_font("Arial", size=12)
+
+        for block in blocks:
+            kind = block[0]
+            if kind == 'title':
+                pdf.set_font("Arial", 'B', 18)
+                pdf.set_text_color(*PDF_BLUE)
+                pdf.cell(0, 14, pdf_text(block[1]), ln=1, align='C')
+                pdf.set_draw_color(*PDF_BLUE)
+                pdf.set_line_width(1)
+                pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+                pdf.ln(6)
+                pdf.set_font("Arial", size=12)
+                pdf.set_text_color(*PDF_TEXT)
+            elif kind == 'section':
+                heading(block[1])
+                for text, tag in block[2]:
+                    pdf.set_text_color(*PDF_TAG_COLORS.get(tag, PDF_TEXT))
+                    pdf.cell(0, 8, pdf_text(f"  {text}"), ln=1)
+                pdf.set_text_color(*PDF_TEXT)
+            elif kind == 'no_data':
+                pdf.ln(2)
+                pdf.cell(0, 8, "No data available for this report period.", ln=1)
+            elif kind == 'last_user':
+                pdf.ln(2)
+                pdf.cell(0, 8, pdf_text(f"Last submitted by: {block[1]}"), ln=1)
+            elif kind == 'checks':
+                table_header(PDF_CHECK_COLUMNS)
+                for record in block[1]:
+                    ok = record['status'] == "OK"
+                    pdf_table_row(pdf, PDF_CHECK_COLUMNS,
+                                  [record['check_name'], "OK" if ok else "NOT OK", record['notes'] or ''],
+                                  {1: PDF_GREEN if ok else PDF_RED})
+                    if not ok:
+                        pdf.set_text_color(*PDF_ORANGE)
+                        pdf.multi_cell(0, 7, pdf_text(f"    Reason: {record['reason'] or ''}"))
+                        pdf.set_text_color(*PDF_TEXT)
+            elif kind == 'totals':
+                table_header(PDF_TOTAL_COLUMNS)
+                for check_name, stats in block[1]:
+                    pdf_table_row(pdf, PDF_TOTAL_COLUMNS, [
+                        check_name, stats['ok'], stats['not_ok'],
+                        (stats['last_date'] or 'N/A') if stats['last_reason'] else 'N/A', stats['last_reason'] or 'N/A'
+                    ], {1: PDF_GREEN, 2: PDF_RED, 4: PDF_ORANGE if stats['last_reason'] else None})
+            elif kind == 'summary':
+                heading("SUMMARY:", PDF_GREEN)
+                for text, tag in block[1]:
+                    pdf.set_text_color(*PDF_TAG_COLORS.get(tag, PDF_TEXT))
+                    pdf.cell(0, 8, pdf_text(text), ln=1)
+                pdf.set_text_color(*PDF_TEXT)
+
+        pdf.output(path)
+
+
+def write_summary_pdf(blocks, path):
+    """Write report blocks to path as the plain PDF mailed to users (tables list only the check names)."""
+    from fpdf import FPDF
+    with instrumentation.span("pdf.render"):
+        pdf = FPDF()
+        pdf.add_page()
+        pdf.set_auto_page_break(auto=True, margin=15)
+
+        def heading(text):
+            pdf.ln(2)
+            pdf.set_font("Arial", 'B', 12)
+            pdf.cell(0, 9, pdf_text(text), ln=1)
+            pdf.set_font("Arial", '', 12)
+            pdf.ln(1)
+
+        for block in blocks:
+            kind = block[0]
+            if kind == 'title':
+                pdf.set_font("Arial", 'B', 16)
+                pdf.cell(0, 12, pdf_text(block[1]), ln=1, align='C')
+                pdf.set_font("Arial", '', 12)
+                pdf.ln(2)
+                pdf.set_draw_color(100, 100, 100)
+                pdf.set_line_width(0.5)
+                pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+                pdf.ln(4)
+            elif kind == 'section':
+                heading(block[1])
+                for text, _ in block[2]:
+                    pdf.multi_cell(0, 8, pdf_text(f"  {text}"), align='L')
+                pdf.ln(2)
+            elif kind == 'no_data':
+                pdf.multi_cell(0, 8, "No data available for this report period.", align='L')
+            elif kind == 'last_user':
+                pdf.multi_cell(0, 8, pdf_text(f"Last submitted by: {block[1]}"), align='L')
+                pdf.ln(2)
+            elif kind in ('checks', 'totals'):
+                if kind == 'checks':
+                    names = [record['check_name'] for record in block[1]]
+                else:
+                    names = [name for name, _ in block[1]]
+                for name in names:
+                    pdf.cell(0, 8, pdf_fit(pdf, name, 190), ln=1)
+                pdf.ln(2)
+            elif kind == 'summary':
+                heading("SUMMARY:")
+                for text, _ in block[1]:
+                    pdf.multi_cell(0, 8, pdf_text(text), align='L')
+                    pdf.ln(1)
+
+        pdf.output(path)
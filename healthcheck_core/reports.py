@@ -0,0 +1,147 @@
+"""Reports without a display: building one from the database, writing it out and mailing it."""
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date
+
+from . import instrumentation
+from .aggregation import report_period, summarize_records
+from .rendering import blocks_segments, report_blocks, segments_text, write_report_pdf, write_summary_pdf
+from .storage import ReadingStore, fetch_range_summary, fetch_results
+
+# Formats Report.write can produce, by file extension
+REPORT_FORMATS = ('txt', 'pdf', 'csv', 'json')
+
+
+@dataclass
+class Report:
+    """One generated report: its period, the result rows or per-check totals, and the recorded conditions.
+
+    Daily reports carry the raw rows in data; range reports carry the
+    per-check totals in summary (see fetch_range_summary). conditions are
+    the recorded Zabbix conditions of the period, or None to show `live`.
+    The Tk view, the text, PDF and CSV/JSON exports and the e-mail all
+    render from this object, never from text shown on screen.
+    """
+    title: str
+    report_type: str
+    start_date: date
+    end_date: date
+    data: list
+    summary: dict = None
+    conditions: dict = None
+    live: dict = None
+    _blocks: list = field(default=None, init=False, repr=False, compare=False)
+
+    def blocks(self):
+        """The report as report_blocks, computed once."""
+        if self._blocks is None:
+            self._blocks = report_blocks(self.title, self.data, self.report_type, self.summary, self.conditions,
+                                         self.live)
+        return self._blocks
+
+    def segments(self):
+        return blocks_segments(self.blocks())
+
+    def text(self):
+        return segments_text(self.segments())
+
+    def totals(self):
+        """Per-check totals, from summary or computed from the raw rows."""
+        return self.summary if self.summary is not None else summarize_records(self.data)
+
+    def file_stem(self):
+        """The title made safe for a file name, as used by the app's exports."""
+        return "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in self.title)
+
+    def write(self, fmt, path):
+        """Write the report to path as 'txt', 'pdf', 'csv' or 'json'."""
+        if fmt == 'txt':
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.text())
+        elif fmt == 'pdf':
+            write_report_pdf(self.blocks(), path)
+        elif fmt == 'csv':
+            self.write_csv(path)
+        elif fmt == 'json':
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.as_dict(), f, indent=2, default=str)
+        else:
+            raise ValueError(f"unknown report format {fmt!r}")
+
+    def write_summary_pdf(self, path):
+        """The plain PDF mailed to users."""
+        write_summary_pdf(self.blocks(), path)
+
+    def write_csv(self, path):
+        """Daily reports: one row per check result. Range reports: one row of totals per check."""
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            if self.report_type == 'daily':
+                writer.writerow(['check_date', 'check_name', 'status', 'reason', 'notes', 'username', 'timestamp'])
+                for r in self.data:
+                    writer.writerow([r['check_date'], r['check_name'], r['status'], r['reason'], r['notes'],
+                                     r['username'], r['timestamp']])
+            else:
+                writer.writerow(['check_name', 'passed', 'failed', 'last_failure_date', 'last_failure_reason'])
+                for check_name, stats in self.totals()['check_stats'].items():
+                    writer.writerow([check_name, stats['ok'], stats['not_ok'], stats['last_date'] or '',
+                                     stats['last_reason'] or ''])
+
+    def as_dict(self):
+        return {
+            'title': self.title,
+            'report_type': self.report_type,
+            'start_date': self.start_date.isoformat(),
+            'end_date': self.end_date.isoformat(),
+            'totals': self.totals(),
+            'results': [{k: v for k, v in r.items() if k != 'date'} for r in self.data],
+            'conditions': self.conditions,
+        }
+
+
+def build_report(db_pool, report_type, value, end_value=None, metrics=()):
+    """Read the report of report_type for the period given as in report_period.
+
+    Daily reports read the raw rows, range reports the daily summary, and
+    both carry the Zabbix conditions recorded in the period, judged
+    against the thresholds of metrics.
+    """
+    title, start_date, end_date = report_period(report_type, value, end_value)
+    conditions = ReadingStore(db_pool).conditions(start_date, end_date, metrics)
+    if report_type == 'daily':
+        return Report(title, report_type, start_date, end_date, fetch_results(db_pool, start_date, end_date),
+                      conditions=conditions)
+    return Report(title, report_type, start_date, end_date, [],
+                  summary=fetch_range_summary(db_pool, start_date, end_date), conditions=conditions)
+
+
+def send_email(to_emails, subject, body, attachments, from_email, smtp_server, smtp_port, smtp_user, smtp_pass):
+    """Send a plain-text e-mail with file attachments over SMTP with STARTTLS.
+
+    to_emails is one address or a list. attachments is a list of
+    (path, file name shown to the recipient).
+    """
+    from email.mime.application import MIMEApplication
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+    import smtplib
+
+    if isinstance(to_emails, str):
+        to_emails = [to_emails]
+    msg = MIMEMultipart()
+    msg['From'] = from_email
+    msg['To'] = ', '.join(to_emails)
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain', 'utf-8'))
+    for path, filename in attachments:
+        with open(path, 'rb') as f:
+            part = MIMEApplication(f.read(), _subtype=os.path.splitext(filename)[1].lstrip('.') or 'octet-stream')
+        part.add_header('Content-Disposition', 'attachment', filename=filename)
+        msg.attach(part)
+    with instrumentation.span("smtp.send", server=smtp_server):
+        with smtplib.SMTP(smtp_server, int(smtp_port), timeout=15) as server:
+            server.starttls()
+            server.login(smtp_user, smtp_pass)
+            server.sendmail(from_email, to_emails, msg.as_string())
@@ -0,0 +1,1056 @@
+"""MySQL storage: connection pool, schema migrations, check results and sensor readings."""
+import threading
+import time
+from calendar import monthrange
+from datetime import datetime, timedelta
+
+import mysql.connector
+import mysql.connector.pooling
+from mysql.connector import errorcode
+
+from . import instrumentation
+from .aggregation import metric_status
+
+# Database used when no other configuration is given. An optional 'pool_size'
+# key overrides DB_POOL_SIZE for that database.
+DEFAULT_DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '123456',
+    'database': 'health_checks_db'
+}
+# Number of MySQL connections kept open per database configuration. The UI
+# borrows up to 5 at once (2 DB worker threads, the day catalog refresh, the
+# month cache prefetch and the sensor reading writes) plus up to 4 for the
+# ingestion API (INGEST_MAX_CONCURRENT); a sensor backfill uses 8 threads
+# plus one.
+DB_POOL_SIZE = 10
+
+
+class DBConnectionPool:
+    """Shared pool of MySQL connections for one database configuration.
+
+    Connections are health-checked (pinged) when they are handed out and are
+    re-established with exponential backoff when the server cannot be reached
+    or every pooled connection is busy. Calling close() on a connection
+    returns it to the pool instead of closing the socket.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db_config, pool_size=DB_POOL_SIZE, max_retries=4, backoff=0.25, max_backoff=4.0):
+        self.db_config = dict(db_config)
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pool_name = f"health_check_pool_{len(DBConnectionPool._instances)}"
+
+    @classmethod
+    def for_config(cls, db_config, pool_size=DB_POOL_SIZE):
+        """Return the pool shared by every caller using the same db_config."""
+        key = tuple(sorted(db_config.items()))
+        with cls._instances_lock:
+            pool = cls._instances.get(key)
+            if pool is None:
+                pool = cls(db_config, pool_size=pool_size)
+                cls._instances[key] = pool
+            return pool
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = mysql.connector.pooling.MySQLConnectionPool(
+                    pool_name=self._pool_name,
+                    pool_size=self.pool_size,
+                    pool_reset_session=True,
+                    **self.db_config
+                )
+            return self._pool
+
+    def get_connection(self):
+        """Check out a live connection, retrying with exponential backoff."""
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                # The pool pings the connection on checkout and reconnects it
+                # if the server dropped it while idle.
+                return instrumentation.instrument_connection(self._get_pool().get_connection())
+            except mysql.connector.errors.PoolError:
+                # Every connection is checked out; wait for one to come back
+                if attempt == self.max_retries:
+                    raise
+            except (mysql.connector.errors.InterfaceError, mysql.connector.errors.OperationalError):
+                # Server unreachable or connection dropped (e.g. WAN hiccup)
+                if attempt == self.max_retries:
+                    raise
+            instrumentation.count("db.connection_retry")
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+
+
+def get_db_pool(db_config):
+    """Return the shared connection pool for db_config, sized by its 'pool_size' key (default DB_POOL_SIZE)."""
+    db_config = dict(db_config)
+    pool_size = int(db_config.pop('pool_size', None) or DB_POOL_SIZE)
+    return DBConnectionPool.for_config(db_config, pool_size=pool_size)
+
+
+# Single fact table holding every health check result, one row per (day, check)
+RESULTS_TABLE = 'health_check_results'
+# Partition the results table by month (RANGE COLUMNS on check_date)
+RESULTS_TABLE_PARTITIONED = False
+# First month covered by its own partition, and how many months ahead to pre-create
+RESULTS_PARTITION_START = (2020, 1)
+RESULTS_PARTITION_MONTHS_AHEAD = 24
+# Legacy per-day tables (health_check_YYYYMMDD) replaced by RESULTS_TABLE
+LEGACY_DAY_TABLE_REGEXP = '^health_check_[0-9]{8}$'
+# Legacy day tables copied per INSERT ... SELECT ... UNION ALL statement
+LEGACY_COPY_BATCH = 100
+# Materialized per-day, per-check OK/NOT OK counts derived from RESULTS_TABLE
+SUMMARY_TABLE = 'health_check_daily_summary'
+
+
+def monthly_partitions_clause(start=RESULTS_PARTITION_START, months_ahead=RESULTS_PARTITION_MONTHS_AHEAD):
+    """Build a PARTITION BY RANGE COLUMNS(check_date) clause with one partition per month."""
+    year, month = start
+    today = datetime.now().date()
+    last = (today.year * 12 + today.month - 1) + months_ahead
+    partitions = []
+    while year * 12 + month - 1 <= last:
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        partitions.append(f"PARTITION p{year}{month:02d} VALUES LESS THAN ('{next_year}-{next_month:02d}-01')")
+        year, month = next_year, next_month
+    partitions.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    return "PARTITION BY RANGE COLUMNS(check_date) (\n    " + ",\n    ".join(partitions) + "\n)"
+
+
+def table_exists(cursor, table):
+    cursor.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+        (table,)
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def ensure_results_table(db_pool, partitioned=RESULTS_TABLE_PARTITIONED):
+    """Create the health_check_results table if needed. Returns True if it was just created."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        exists = table_exists(cursor, RESULTS_TABLE)
+        if not exists:
+            cursor.execute(f"""
+                CREATE TABLE {RESULTS_TABLE} (
+                    check_date DATE NOT NULL,
+                    check_name VARCHAR(100) NOT NULL,
+                    status VARCHAR(10) NOT NULL,
+                    reason TEXT,
+                    notes TEXT,
+                    username VARCHAR(50),
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    PRIMARY KEY (check_date, check_name),
+                    KEY idx_check_name_date (check_name, check_date)
+                )
+                {monthly_partitions_clause() if partitioned else ''}
+            """)
+            conn.commit()
+        cursor.close()
+    return not exists
+
+
+def ensure_summary_table(db_pool):
+    """Create the health_check_daily_summary table if needed. Returns True if it was just created."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        exists = table_exists(cursor, SUMMARY_TABLE)
+        if not exists:
+            cursor.execute(f"""
+                CREATE TABLE {SUMMARY_TABLE} (
+                    check_date DATE NOT NULL,
+                    check_name VARCHAR(100) NOT NULL,
+                    status VARCHAR(10) NOT NULL,
+                    ok_count INT NOT NULL DEFAULT 0,
+                    not_ok_count INT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (check_date, check_name)
+                )
+            """)
+            conn.commit()
+        cursor.close()
+    return not exists
+
+
+def rebuild_daily_summary(cursor, start_date=None, end_date=None):
+    """Recompute the daily summary rows of a date range (every day if no range) from the raw results.
+
+    Runs on the caller's cursor so it commits together with the write that
+    made it necessary. Returns the number of summary rows written.
+    """
+    if start_date is None:
+        where, params = "", ()
+    else:
+        where, params = "WHERE check_date BETWEEN %s AND %s", (start_date, end_date or start_date)
+    cursor.execute(f"DELETE FROM {SUMMARY_TABLE} {where}", params)
+    cursor.execute(f"""
+        INSERT INTO {SUMMARY_TABLE} (check_date, check_name, status, ok_count, not_ok_count)
+        SELECT check_date, check_name,
+               IF(SUM(status <> 'OK') > 0, 'NOT OK', 'OK'), SUM(status = 'OK'), SUM(status <> 'OK')
+        FROM {RESULTS_TABLE} {where}
+        GROUP BY check_date, check_name
+    """, params)
+    return cursor.rowcount
+
+
+def upsert_results(cursor, rows):
+    """Write result rows with one batched upsert and keep their daily summary rows in step.
+
+    rows are (check_date, check_name, status, reason, notes, username) tuples.
+    Both statements are multi-row INSERT ... ON DUPLICATE KEY UPDATE on the
+    (check_date, check_name) key, so concurrent submits never need a read
+    before the write. The caller commits.
+    """
+    cursor.executemany(f"""
+        INSERT INTO {RESULTS_TABLE} (check_date, check_name, status, reason, notes, username)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            status = VALUES(status), reason = VALUES(reason), notes = VALUES(notes),
+            username = VALUES(username), timestamp = CURRENT_TIMESTAMP
+    """, rows)
+    cursor.executemany(f"""
+        INSERT INTO {SUMMARY_TABLE} (check_date, check_name, status, ok_count, not_ok_count)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            status = VALUES(status), ok_count = VALUES(ok_count), not_ok_count = VALUES(not_ok_count)
+    """, [(row[0], row[1], row[2], int(row[2] == 'OK'), int(row[2] != 'OK')) for row in rows])
+
+
+def backfill_daily_summary(db_pool):
+    """Rebuild the whole daily summary from history. Returns the number of summary rows written."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        written = rebuild_daily_summary(cursor)
+        conn.commit()
+        cursor.close()
+    return written
+
+
+def list_legacy_day_tables(cursor):
+    """Return the names of all legacy health_check_YYYYMMDD tables, oldest first."""
+    cursor.execute(
+        "SELECT table_name FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name REGEXP %s ORDER BY table_name",
+        (LEGACY_DAY_TABLE_REGEXP,)
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def migrate_day_tables(db_pool, drop_legacy=False, batch_size=LEGACY_COPY_BATCH):
+    """Bulk-copy every legacy health_check_YYYYMMDD table into health_check_results.
+
+    The legacy tables are discovered with one information_schema query and
+    copied server-side in batches: each statement is a single
+    INSERT ... SELECT over a UNION ALL of up to batch_size tables, with the
+    day carried as a date literal. Rows that already exist in the results
+    table are overwritten, so the migration can be re-run safely. The daily
+    summary is rebuilt afterwards. Returns the number of tables copied.
+    """
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        tables = list_legacy_day_tables(cursor)
+        # Very old tables predate the username column
+        cursor.execute(
+            "SELECT table_name FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND column_name = 'username' AND table_name REGEXP %s",
+            (LEGACY_DAY_TABLE_REGEXP,)
+        )
+        with_username = {row[0] for row in cursor.fetchall()}
+        for i in range(0, len(tables), batch_size):
+            batch = tables[i:i + batch_size]
+            selects = []
+            for table in batch:
+                check_date = datetime.strptime(table.split('_')[-1], '%Y%m%d').date()
+                username_col = 'username' if table in with_username else 'NULL'
+                selects.append(
+                    f"SELECT DATE '{check_date:%Y-%m-%d}' AS check_date, check_name, status, reason, notes, "
+                    f"{username_col} AS username, timestamp FROM {table}"
+                )
+            cursor.execute(f"""
+                INSERT INTO {RESULTS_TABLE} (check_date, check_name, status, reason, notes, username, timestamp)
+                SELECT * FROM ({" UNION ALL ".join(selects)}) AS legacy
+                ON DUPLICATE KEY UPDATE
+                    status = VALUES(status), reason = VALUES(reason), notes = VALUES(notes),
+                    username = VALUES(username), timestamp = VALUES(timestamp)
+            """)
+            if drop_legacy:
+                cursor.execute(f"DROP TABLE {', '.join(batch)}")
+            conn.commit()
+        if tables:
+            rebuild_daily_summary(cursor)
+            conn.commit()
+        cursor.close()
+    return len(tables)
+
+
+SCHEMA_VERSION_TABLE = 'schema_version'
+
+
+def create_users_table(db_pool):
+    """Create the users table used by the login window."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                username VARCHAR(50) NOT NULL UNIQUE,
+                password VARCHAR(128) NOT NULL,
+                email VARCHAR(128)
+            )
+        """)
+        conn.commit()
+        cursor.close()
+
+
+def add_users_email_column(db_pool):
+    """Add users.email to databases created before registration asked for it."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND table_name = 'users' AND column_name = 'email'"
+        )
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("ALTER TABLE users ADD COLUMN email VARCHAR(128)")
+            conn.commit()
+        cursor.close()
+
+
+def create_maintenance_table(db_pool):
+    """Create the maintenance_interventions table."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS maintenance_interventions (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                date DATE NOT NULL,
+                description TEXT NOT NULL,
+                performed_by VARCHAR(64) NOT NULL
+            )
+        """)
+        conn.commit()
+        cursor.close()
+
+
+def create_summary_table(db_pool):
+    """Create the daily summary table and backfill it from any existing results."""
+    if ensure_summary_table(db_pool):
+        written = backfill_daily_summary(db_pool)
+        print(f"[INFO] Backfilled {written} rows into {SUMMARY_TABLE}")
+
+
+def copy_legacy_day_tables(db_pool):
+    """Copy the legacy day tables, unless an earlier start-up already filled the results table."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT 1 FROM {RESULTS_TABLE} LIMIT 1")
+        populated = cursor.fetchone() is not None
+        cursor.close()
+    if not populated:
+        copied = migrate_day_tables(db_pool)
+        if copied:
+            print(f"[INFO] Migrated {copied} legacy day tables into {RESULTS_TABLE}")
+
+
+# Local time-series store of the polled Zabbix readings
+SENSORS_TABLE = 'zabbix_sensors'
+READINGS_TABLE = 'sensor_readings'
+READINGS_DAILY_TABLE = 'sensor_readings_daily'
+# Raw readings older than this are dropped; their daily min/max/avg are kept
+READINGS_RAW_RETENTION_DAYS = 35
+
+
+def create_reading_store_tables(db_pool):
+    """Create the sensor, raw reading and daily reading tables."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {SENSORS_TABLE} (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                host VARCHAR(128) NOT NULL,
+                item_key VARCHAR(255) NOT NULL,
+                room VARCHAR(64),
+                name VARCHAR(64),
+                unit VARCHAR(16),
+                UNIQUE KEY uq_host_key (host, item_key)
+            )
+        """)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {READINGS_TABLE} (
+                sensor_id INT NOT NULL,
+                reading_time DATETIME NOT NULL,
+                value DOUBLE NOT NULL,
+                PRIMARY KEY (sensor_id, reading_time)
+            )
+        """)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {READINGS_DAILY_TABLE} (
+                sensor_id INT NOT NULL,
+                day DATE NOT NULL,
+                min_value DOUBLE NOT NULL,
+                max_value DOUBLE NOT NULL,
+                avg_value DOUBLE NOT NULL,
+                samples INT NOT NULL,
+                PRIMARY KEY (sensor_id, day),
+                KEY idx_day (day)
+            )
+        """)
+        conn.commit()
+        cursor.close()
+
+
+# Completed chunks of a Zabbix history backfill, so an interrupted run resumes
+BACKFILL_CHECKPOINTS_TABLE = 'zabbix_backfill_checkpoints'
+
+
+def create_backfill_checkpoints_table(db_pool):
+    """Create the table recording which host/date-range chunks a backfill has finished."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {BACKFILL_CHECKPOINTS_TABLE} (
+                host VARCHAR(128) NOT NULL,
+                chunk_start DATE NOT NULL,
+                chunk_end DATE NOT NULL,
+                source VARCHAR(16) NOT NULL,
+                rows_written INT NOT NULL,
+                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (host, chunk_start, chunk_end)
+            )
+        """)
+        conn.commit()
+        cursor.close()
+
+
+# Checks shown on the health check form, with the category they are filtered by
+CHECKS_TABLE = 'health_check_catalog'
+# Longest check name; the results and summary tables store it as VARCHAR(100)
+CHECK_NAME_MAX = 100
+# (check_name, category) of the checks a new database starts with, in form order
+DEFAULT_CHECKS = [
+    ("Verify Server Health", "Servers"),
+    ("Assess Critical Application Performance", "Applications"),
+    ("Validate Daily Backup", "Backups"),
+    ("Check Data Center Temperature and Humidity", "Data Center"),
+    ("Check Data Center Air Conditioning", "Data Center"),
+    ("Verify UPS and Power Supply", "Data Center"),
+]
+
+
+def create_check_catalog_table(db_pool):
+    """Create the check catalog and seed it with the checks the form used to hard-code."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {CHECKS_TABLE} (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                check_name VARCHAR({CHECK_NAME_MAX}) NOT NULL UNIQUE,
+                category VARCHAR(100) NOT NULL DEFAULT 'General',
+                room VARCHAR(100),
+                sort_order INT NOT NULL DEFAULT 0,
+                active TINYINT(1) NOT NULL DEFAULT 1,
+                INDEX idx_category (category)
+            )
+        """)
+        cursor.executemany(
+            f"INSERT IGNORE INTO {CHECKS_TABLE} (check_name, category, sort_order) VALUES (%s, %s, %s)",
+            [(name, category, i) for i, (name, category) in enumerate(DEFAULT_CHECKS)]
+        )
+        conn.commit()
+        cursor.close()
+
+
+def fetch_check_catalog(db_pool):
+    """The active checks as dicts of check_name, category and room, in form order."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"""
+            SELECT check_name, category, room FROM {CHECKS_TABLE}
+            WHERE active = 1 ORDER BY sort_order, check_name
+        """)
+        checks = cursor.fetchall()
+        cursor.close()
+    return checks
+
+
+def upsert_checks(db_pool, checks):
+    """Add or update catalog checks with one multi-row upsert. Returns the number of checks written.
+
+    checks are dicts of check_name and category, optionally with room,
+    sort_order and active (0 hides a check from the form, keeping its history).
+    Raises ValueError, writing nothing, if a name is longer than CHECK_NAME_MAX.
+    """
+    too_long = [c['check_name'] for c in checks if len(c['check_name']) > CHECK_NAME_MAX]
+    if too_long:
+        raise ValueError(f"check names longer than {CHECK_NAME_MAX} characters: {', '.join(too_long)}")
+    rows = [
+        (c['check_name'], c.get('category') or 'General', c.get('room') or None,
+         int(c.get('sort_order') or 0), int(c['active']) if str(c.get('active', '')).strip() else 1)
+        for c in checks
+    ]
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(f"""
+            INSERT INTO {CHECKS_TABLE} (check_name, category, room, sort_order, active)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                category = VALUES(category), room = VALUES(room),
+                sort_order = VALUES(sort_order), active = VALUES(active)
+        """, rows)
+        conn.commit()
+        cursor.close()
+    return len(rows)
+
+
+# Ordered, run-once schema changes as (version, description, step). Append new
+# entries at the end; never renumber or edit one that has shipped. Each step
+# takes the pool and must be safe to re-run on a database that predates the
+# schema_version table.
+SCHEMA_MIGRATIONS = [
+    (1, "users table", create_users_table),
+    (2, "users.email column", add_users_email_column),
+    (3, "maintenance_interventions table", create_maintenance_table),
+    (4, f"{RESULTS_TABLE} table", ensure_results_table),
+    (5, f"{SUMMARY_TABLE} table", create_summary_table),
+    (6, "copy legacy health_check_YYYYMMDD tables", copy_legacy_day_tables),
+    (7, "sensor reading store tables", create_reading_store_tables),
+    (8, f"{BACKFILL_CHECKPOINTS_TABLE} table", create_backfill_checkpoints_table),
+    (9, f"{CHECKS_TABLE} table", create_check_catalog_table),
+]
+
+
+def schema_version(db_pool):
+    """Return the highest applied migration version, creating the registry table on first use."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")
+            version = cursor.fetchone()[0] or 0
+        except mysql.connector.ProgrammingError as err:
+            if err.errno != errorcode.ER_NO_SUCH_TABLE:
+                raise
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+                    version INT NOT NULL PRIMARY KEY,
+                    description VARCHAR(200) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.commit()
+            version = 0
+        cursor.close()
+    return version
+
+
+def apply_schema_migrations(db_pool, migrations=SCHEMA_MIGRATIONS):
+    """Run the migrations newer than the recorded schema version, in order.
+
+    On an up-to-date database this is a single SELECT. Returns the list of
+    versions applied.
+    """
+    current = schema_version(db_pool)
+    applied = []
+    for version, description, step in migrations:
+        if version <= current:
+            continue
+        step(db_pool)
+        with db_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"INSERT IGNORE INTO {SCHEMA_VERSION_TABLE} (version, description) VALUES (%s, %s)",
+                (version, description)
+            )
+            conn.commit()
+            cursor.close()
+        print(f"[INFO] Applied schema migration {version}: {description}")
+        applied.append(version)
+    return applied
+
+
+def create_database(db_config):
+    """Create the configured database on the server if it does not exist yet."""
+    conn = mysql.connector.connect(
+        host=db_config['host'],
+        user=db_config['user'],
+        password=db_config['password']
+    )
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_config['database']}")
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
+
+def ensure_schema(db_config):
+    """Bring the database of db_config up to the latest schema, at most once per process.
+
+    The database itself is only created when connecting reports it missing.
+    Returns the list of migration versions applied.
+    """
+    key = tuple(sorted(db_config.items()))
+    with _schema_lock:
+        if key in _schema_ready:
+            return []
+        db_pool = get_db_pool(db_config)
+        try:
+            applied = apply_schema_migrations(db_pool)
+        except mysql.connector.Error as err:
+            if err.errno != errorcode.ER_BAD_DB_ERROR:
+                raise
+            create_database(db_config)
+            applied = apply_schema_migrations(db_pool)
+        _schema_ready.add(key)
+    return applied
+
+
+class DayCatalog:
+    """In-memory set of the days that have health check results.
+
+    Loaded once from the server, then kept current by the app on submit,
+    copy, delete and clear, so "does this day have data?" is a set lookup.
+    reload() re-reads the server to pick up writes from other instances.
+    """
+    def __init__(self, db_pool):
+        self.db_pool = db_pool
+        self.days = set()
+        self.loaded_at = None
+        self._lock = threading.Lock()
+
+    def reload(self):
+        """Re-read the set of days from the server. Returns True if it changed."""
+        with self.db_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            # Loose index scan over the (check_date, check_name) primary key
+            cursor.execute(f"SELECT DISTINCT check_date FROM {RESULTS_TABLE}")
+            days = {row[0] for row in cursor.fetchall()}
+            cursor.close()
+        with self._lock:
+            changed = days != self.days
+            self.days = days
+            self.loaded_at = datetime.now()
+        return changed
+
+    def ensure_loaded(self):
+        """Load the catalog on first use if the start-up load has not finished yet."""
+        if self.loaded_at is None:
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"[ERROR] Could not load day catalog: {e}")
+
+    def __contains__(self, day):
+        self.ensure_loaded()
+        return day in self.days
+
+    def add(self, day):
+        with self._lock:
+            self.days.add(day)
+
+    def discard(self, day):
+        with self._lock:
+            self.days.discard(day)
+
+    def clear(self):
+        with self._lock:
+            self.days.clear()
+
+    def days_between(self, start_date, end_date):
+        """Sorted list of the days with data between two dates (inclusive)."""
+        self.ensure_loaded()
+        return sorted(day for day in self.days if start_date <= day <= end_date)
+
+    def has_days_between(self, start_date, end_date):
+        self.ensure_loaded()
+        return any(start_date <= day <= end_date for day in self.days)
+
+
+def adjacent_months(year, month):
+    """Return the (year, month) pairs before and after the given month."""
+    previous = (year - 1, 12) if month == 1 else (year, month - 1)
+    following = (year + 1, 1) if month == 12 else (year, month + 1)
+    return [previous, following]
+
+
+class MonthProblemCache:
+    """Problem days (days with at least one NOT OK check) of each month, cached per month.
+
+    A month costs one query on the daily summary, and none at all when the
+    day catalog knows it has no data. Months can be prefetched in the
+    background so calendar navigation is served from memory.
+    """
+    def __init__(self, db_pool, day_catalog):
+        self.db_pool = db_pool
+        self.day_catalog = day_catalog
+        self.months = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def get(self, year, month):
+        """Return the problem days of a month, from the cache or with one query."""
+        with self._lock:
+            if (year, month) in self.months:
+                return self.months[(year, month)]
+        days = self._load(year, month)
+        with self._lock:
+            self.months[(year, month)] = days
+        return days
+
+    def cached(self, year, month):
+        """Return the problem days of a month if they are cached, else None."""
+        with self._lock:
+            return self.months.get((year, month))
+
+    def _load(self, year, month):
+        first_day = datetime(year, month, 1).date()
+        last_day = datetime(year, month, monthrange(year, month)[1]).date()
+        if not self.day_catalog.has_days_between(first_day, last_day):
+            return frozenset()  # Nothing recorded this month
+        with self.db_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT DISTINCT check_date FROM {SUMMARY_TABLE}
+                WHERE check_date BETWEEN %s AND %s AND not_ok_count > 0
+            """, (first_day, last_day))
+            days = frozenset(row[0] for row in cursor.fetchall())
+            cursor.close()
+        return days
+
+    def prefetch(self, months):
+        """Load the given (year, month) pairs that are not cached yet in a background thread."""
+        with self._lock:
+            missing = [m for m in months if m not in self.months and m not in self._pending]
+            self._pending.update(missing)
+        if not missing:
+            return
+
+        def load():
+            for year, month in missing:
+                try:
+                    self.get(year, month)
+                except Exception as e:
+                    print(f"[ERROR] Prefetching problem days of {year}-{month:02d} failed: {e}")
+                finally:
+                    with self._lock:
+                        self._pending.discard((year, month))
+        threading.Thread(target=load, daemon=True).start()
+
+    def invalidate(self, day=None):
+        """Forget the month containing day, or every month if day is None."""
+        with self._lock:
+            if day is None:
+                self.months.clear()
+            else:
+                self.months.pop((day.year, day.month), None)
+
+
+class ReadingStore:
+    """Append-only store of polled sensor readings with daily min/max/avg.
+
+    Each reading is one narrow (sensor_id, reading_time, value) row. The
+    daily table is updated in the same transaction with an incremental
+    upsert, so period queries only read one row per sensor and day, never
+    the raw rows and never Zabbix. prune() drops raw rows past the
+    retention window.
+    """
+    def __init__(self, db_pool):
+        self.db_pool = db_pool
+        # (host, item_key) -> (sensor_id, room, name, unit)
+        self._sensors = {}
+        self._lock = threading.Lock()
+
+    def sensor_ids(self, cursor, metrics):
+        """Map each metric's (host, key) to its sensor id, registering new sensors and metadata changes."""
+        with self._lock:
+            changed = [
+                m for m in metrics
+                if self._sensors.get((m['host'], m['key']), (None,))[1:] != (m['room'], m['name'], m['unit'])
+            ]
+        if changed:
+            cursor.executemany(f"""
+                INSERT INTO {SENSORS_TABLE} (host, item_key, room, name, unit) VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE room = VALUES(room), name = VALUES(name), unit = VALUES(unit)
+            """, [(m['host'], m['key'], m['room'], m['name'], m['unit']) for m in changed])
+            cursor.execute(f"SELECT id, host, item_key, room, name, unit FROM {SENSORS_TABLE}")
+            with self._lock:
+                self._sensors = {(host, key): (sensor_id, room, name, unit)
+                                 for sensor_id, host, key, room, name, unit in cursor.fetchall()}
+        with self._lock:
+            return {(m['host'], m['key']): self._sensors[(m['host'], m['key'])][0] for m in metrics}
+
+    def append(self, readings, taken_at=None):
+        """Store the readings of one poll (readings without a value are skipped). Returns the rows written."""
+        taken_at = (taken_at or datetime.now()).replace(microsecond=0)
+        readings = [r for r in readings if r['value'] is not None]
+        if not readings:
+            return 0
+        with self.db_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            ids = self.sensor_ids(cursor, readings)
+            rows = list({ids[(r['host'], r['key'])]: (ids[(r['host'], r['key'])], taken_at, r['value'])
+                         for r in readings}.values())
+            written = self.insert_rows(cursor, rows)
+            conn.commit()
+            cursor.close()
+        return written
+
+    def insert_rows(self, cursor, rows):
+        """Insert (sensor_id, reading_time, value) rows and fold the new ones into the daily table.
+
+        Rows already stored are ignored, so overlapping batches are harmless.
+        Runs on the caller's cursor; the caller commits. Returns the rows written.
+        """
+        cursor.executemany(
+            f"INSERT IGNORE INTO {READINGS_TABLE} (sensor_id, reading_time, value) VALUES (%s, %s, %s)",
+            rows
+        )
+        written = cursor.rowcount
+        if written != len(rows):
+            # Some rows were already stored; re-derive the days they touch instead of double counting
+            self.rebuild_daily(cursor, {(sensor_id, when.date()) for sensor_id, when, _ in rows})
+            return written
+        daily = {}
+        for sensor_id, when, value in rows:
+            low, high, total, count = daily.get((sensor_id, when.date()), (value, value, 0.0, 0))
+            daily[(sensor_id, when.date())] = (min(low, value), max(high, value), total + value, count + 1)
+        # avg_value is assigned before samples, so it still sees the old sample count
+        cursor.executemany(f"""
+            INSERT INTO {READINGS_DAILY_TABLE} (sensor_id, day, min_value, max_value, avg_value, samples)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                min_value = LEAST(min_value, VALUES(min_value)),
+                max_value = GREATEST(max_value, VALUES(max_value)),
+                avg_value = (avg_value * samples + VALUES(avg_value) * VALUES(samples)) / (samples + VALUES(samples)),
+                samples = samples + VALUES(samples)
+        """, [(sensor_id, day, low, high, total / count, count)
+              for (sensor_id, day), (low, high, total, count) in daily.items()])
+        return written
+
+    def rebuild_daily(self, cursor, sensor_days):
+        """Recompute the daily rows of the given (sensor_id, day) pairs from the raw readings."""
+        cursor.executemany(f"""
+            INSERT INTO {READINGS_DAILY_TABLE} (sensor_id, day, min_value, max_value, avg_value, samples)
+            SELECT sensor_id, DATE(reading_time), MIN(value), MAX(value), AVG(value), COUNT(*)
+            FROM {READINGS_TABLE}
+            WHERE sensor_id = %s AND reading_time >= %s AND reading_time < %s + INTERVAL 1 DAY
+            GROUP BY sensor_id, DATE(reading_time)
+            ON DUPLICATE KEY UPDATE
+                min_value = VALUES(min_value), max_value = VALUES(max_value),
+                avg_value = VALUES(avg_value), samples = VALUES(samples)
+        """, [(sensor_id, day, day) for sensor_id, day in sorted(sensor_days)])
+
+    def replace_daily(self, cursor, rows):
+        """Write (sensor_id, day, min, max, avg, samples) rows to the daily table, replacing existing days."""
+        cursor.executemany(f"""
+            INSERT INTO {READINGS_DAILY_TABLE} (sensor_id, day, min_value, max_value, avg_value, samples)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                min_value = VALUES(min_value), max_value = VALUES(max_value),
+                avg_value = VALUES(avg_value), samples = VALUES(samples)
+        """, rows)
+
+    def prune(self, retention_days=READINGS_RAW_RETENTION_DAYS, batch_size=10000):
+        """Delete raw readings older than the retention window, in batches. Returns the rows deleted."""
+        cutoff = datetime.now().date() - timedelta(days=retention_days)
+        deleted = 0
+        with self.db_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            while True:
+                cursor.execute(f"DELETE FROM {READINGS_TABLE} WHERE reading_time < %s LIMIT {int(batch_size)}",
+                               (cutoff,))
+                conn.commit()
+                deleted += cursor.rowcount
+                if cursor.rowcount < batch_size:
+                    break
+            cursor.close()
+        return deleted
+
+    def conditions(self, start_date, end_date, metrics=()):
+        """Recorded min/max/avg per room and metric over a date range, from the daily table.
+
+        Returns {room: {name: {unit, sensors, min, max, avg, samples, status}}}
+        like aggregate_by_room. status is judged against the thresholds of
+        the given metric registry (sensors no longer registered are 'OK').
+        """
+        thresholds = {(m['host'], m['key']): m for m in metrics}
+        with self.db_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT s.host, s.item_key, s.room, s.name, s.unit,
+                       MIN(d.min_value), MAX(d.max_value), SUM(d.avg_value * d.samples) / SUM(d.samples), SUM(d.samples)
+                FROM {READINGS_DAILY_TABLE} d JOIN {SENSORS_TABLE} s ON s.id = d.sensor_id
+                WHERE d.day BETWEEN %s AND %s
+                GROUP BY s.id, s.host, s.item_key, s.room, s.name, s.unit
+                ORDER BY s.room, s.name
+            """, (start_date, end_date))
+            sensors = cursor.fetchall()
+            cursor.close()
+        rooms = {}
+        for host, key, room, name, unit, low, high, avg, samples in sensors:
+            stats = rooms.setdefault(room, {}).setdefault(name, {
+                'unit': unit, 'sensors': 0, 'min': low, 'max': high, 'weighted': 0.0, 'samples': 0, 'status': 'OK'
+            })
+            stats['sensors'] += 1
+            stats['min'] = min(stats['min'], low)
+            stats['max'] = max(stats['max'], high)
+            stats['weighted'] += float(avg) * int(samples)
+            stats['samples'] += int(samples)
+            metric = thresholds.get((host, key))
+            if metric and (metric_status(metric, low) != 'OK' or metric_status(metric, high) != 'OK'):
+                stats['status'] = 'NOT OK'
+        for metrics_of_room in rooms.values():
+            for stats in metrics_of_room.values():
+                stats['avg'] = round(stats.pop('weighted') / stats['samples'], 2)
+        return rooms
+
+    def daily_series(self, room, name, start_date, end_date):
+        """Daily (day, min, max, avg) of one room metric over a date range, for trends."""
+        with self.db_pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT d.day, MIN(d.min_value), MAX(d.max_value), SUM(d.avg_value * d.samples) / SUM(d.samples)
+                FROM {READINGS_DAILY_TABLE} d JOIN {SENSORS_TABLE} s ON s.id = d.sensor_id
+                WHERE s.room = %s AND s.name = %s AND d.day BETWEEN %s AND %s
+                GROUP BY d.day ORDER BY d.day
+            """, (room, name, start_date, end_date))
+            series = cursor.fetchall()
+            cursor.close()
+        return series
+
+
+def fetch_results(db_pool, start_date, end_date):
+    """All health check results between two dates (inclusive), read with one indexed range scan.
+
+    Each row is a dict of the result columns plus 'date' as YYYY-MM-DD.
+    """
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"""
+            SELECT check_date, check_name, status, reason, notes, username, timestamp
+            FROM {RESULTS_TABLE}
+            WHERE check_date BETWEEN %s AND %s
+            ORDER BY check_date, check_name
+        """, (start_date, end_date))
+        report_data = cursor.fetchall()
+        cursor.close()
+    for record in report_data:
+        record['date'] = record['check_date'].strftime('%Y-%m-%d')
+    return report_data
+
+
+def fetch_day_summary(db_pool, day):
+    """Per-check status and OK/NOT OK counts of one day, read from the daily summary rollup."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"""
+            SELECT check_name, status, ok_count, not_ok_count FROM {SUMMARY_TABLE}
+            WHERE check_date = %s ORDER BY check_name
+        """, (day,))
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows
+
+
+def fetch_range_summary(db_pool, start_date, end_date):
+    """Per-check pass/fail totals for a date range, read from the daily summary rollup.
+
+    Returns {'check_stats': {check_name: {total, ok, not_ok, last_reason,
+    last_date}}, 'total_days': int, 'last_user': str or None}, the shape
+    summarize_records builds from raw rows.
+    """
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"""
+            SELECT check_name, SUM(ok_count) AS ok, SUM(not_ok_count) AS not_ok
+            FROM {SUMMARY_TABLE}
+            WHERE check_date BETWEEN %s AND %s
+            GROUP BY check_name ORDER BY check_name
+        """, (start_date, end_date))
+        check_stats = {
+            row['check_name']: {
+                'total': int(row['ok']) + int(row['not_ok']),
+                'ok': int(row['ok']),
+                'not_ok': int(row['not_ok']),
+                'last_reason': None,
+                'last_date': None
+            }
+            for row in cursor.fetchall()
+        }
+        cursor.execute(
+            f"SELECT COUNT(DISTINCT check_date) AS days FROM {SUMMARY_TABLE} WHERE check_date BETWEEN %s AND %s",
+            (start_date, end_date)
+        )
+        total_days = cursor.fetchone()['days']
+        # Failures are rare, so the last failure reasons come straight from the raw rows
+        cursor.execute(f"""
+            SELECT check_name, check_date, reason FROM {RESULTS_TABLE}
+            WHERE check_date BETWEEN %s AND %s AND status <> 'OK'
+            ORDER BY check_date
+        """, (start_date, end_date))
+        for row in cursor.fetchall():
+            if row['check_name'] in check_stats:
+                check_stats[row['check_name']]['last_reason'] = row['reason']
+                check_stats[row['check_name']]['last_date'] = row['check_date'].strftime('%Y-%m-%d')
+        cursor.execute(f"""
+            SELECT username FROM {RESULTS_TABLE}
+            WHERE check_date BETWEEN %s AND %s
+            ORDER BY check_date DESC, timestamp DESC LIMIT 1
+        """, (start_date, end_date))
+        last = cursor.fetchone()
+        cursor.close()
+    return {
+        'check_stats': check_stats,
+        'total_days': total_days,
+        'last_user': last['username'] if last else None
+    }
+
+
+def fetch_saved_days(db_pool):
+    """(check_date, record count, last update) of every saved day, newest first."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        # Record count and last update for every day, in one indexed scan
+        cursor.execute(f"""
+            SELECT check_date, COUNT(*), MAX(timestamp) FROM {RESULTS_TABLE}
+            GROUP BY check_date ORDER BY check_date DESC
+        """)
+        days = cursor.fetchall()
+        cursor.close()
+    return days
+
+
+def save_day_results(db_pool, day, form_rows, username=None):
+    """Upsert {check_name: (status, reason, notes)} as the results of day, in one transaction."""
+    rows = [
+        (day, check_name, status, reason, notes, username)
+        for check_name, (status, reason, notes) in form_rows.items()
+    ]
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        upsert_results(cursor, rows)
+        conn.commit()
+        cursor.close()
+
+
+def fetch_user_emails(db_pool):
+    """E-mail addresses of every registered user that has one."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT email FROM users WHERE email IS NOT NULL AND email != ''")
+        emails = [row[0] for row in cursor.fetchall() if row[0]]
+        cursor.close()
+    return emails
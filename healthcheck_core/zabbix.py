@@ -0,0 +1,594 @@
+"""Zabbix JSON-RPC access: client, metric polling, history backfill and the cached snapshot."""
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from . import instrumentation
+from .aggregation import aggregate_by_room, metric_status
+from .storage import BACKFILL_CHECKPOINTS_TABLE
+
+
+class ZabbixError(Exception):
+    """Error returned by the Zabbix JSON-RPC API."""
+
+
+# Consecutive timeouts/connection errors that open the Zabbix circuit breaker,
+# and seconds it stays open before one trial request is let through
+ZABBIX_BREAKER_FAILURES = 3
+ZABBIX_BREAKER_RESET = 120
+
+
+class CircuitBreaker:
+    """Fail fast while a server keeps timing out.
+
+    After `failures` consecutive failures the breaker opens and allow()
+    refuses every request for reset_after seconds. Then one trial request
+    is let through: success closes the breaker, failure opens it again.
+    """
+    def __init__(self, failures=ZABBIX_BREAKER_FAILURES, reset_after=ZABBIX_BREAKER_RESET):
+        self.failures = failures
+        self.reset_after = reset_after
+        self.failed = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self.opened_at < self.reset_after:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failed = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failed += 1
+            if self._trial or self.failed >= self.failures:
+                if self.opened_at is None:
+                    print(f"[ERROR] Zabbix unreachable after {self.failed} failures; "
+                          f"pausing requests for {self.reset_after}s")
+                self.opened_at = time.monotonic()
+                self._trial = False
+
+
+class ZabbixClient:
+    """JSON-RPC client for one Zabbix server.
+
+    All calls go through one requests.Session, so they reuse a kept-alive
+    connection. The server version is read once with apiinfo.version:
+    Zabbix 6.4+ gets the token in an "Authorization: Bearer" header and
+    logs in with "username", older servers get the "auth" request field
+    and "user". With an API token (Zabbix 5.4+) no login is needed.
+    Otherwise user.login runs once and its session token is reused until
+    the server rejects it, after which the client logs in again and retries
+    the call once. Requests to a server that keeps timing out or answering
+    with HTTP errors are refused by a CircuitBreaker without touching the network.
+    """
+    def __init__(self, url, username=None, password=None, api_token=None, timeout=10):
+        self.url = url
+        self.username = username
+        self.password = password
+        self.api_token = api_token or None
+        self.timeout = timeout
+        self._session = None
+        self._auth = None
+        self._version = None
+        self._request_id = 0
+        self._lock = threading.Lock()
+        self._login_lock = threading.Lock()
+        self._version_lock = threading.Lock()
+        self.breaker = CircuitBreaker()
+
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            self._session.headers['Content-Type'] = 'application/json-rpc'
+            # Enough pooled connections for the parallel poller
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=ZABBIX_POLL_WORKERS)
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+        return self._session
+
+    def _post(self, method, params, auth=None):
+        with self._lock:
+            self._request_id += 1
+            payload = {"jsonrpc": "2.0", "method": method, "params": params, "id": self._request_id}
+        headers = None
+        if auth:
+            # Zabbix 6.4+ reads the token from the header, and 7.2 no longer accepts the "auth" field
+            if self.bearer_auth:
+                headers = {'Authorization': f"Bearer {auth}"}
+            else:
+                payload["auth"] = auth
+        if not self.breaker.allow():
+            instrumentation.count("zabbix.breaker_refused")
+            raise ZabbixError("Zabbix server unreachable, waiting before retrying")
+        import requests
+        try:
+            with instrumentation.span(f"zabbix.{method}"):
+                r = self.session.post(self.url, json=payload, headers=headers, timeout=self.timeout)
+            # A server answering 502/503 is as unavailable as one that times out
+            r.raise_for_status()
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError, requests.exceptions.HTTPError):
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        body = r.json()
+        if 'error' in body:
+            error = body['error']
+            raise ZabbixError(f"{error.get('message', 'Zabbix error')} {error.get('data', '')}".strip())
+        return body.get('result')
+
+    @property
+    def version(self):
+        """The server's API version as a tuple of ints, read once with apiinfo.version."""
+        with self._version_lock:
+            if self._version is None:
+                version = self._post("apiinfo.version", [])
+                self._version = tuple(int(part) for part in str(version).split('.')[:2] if part.isdigit())
+            return self._version
+
+    @property
+    def bearer_auth(self):
+        """True for Zabbix 6.4+, which takes the token in an Authorization header and logs in with "username"."""
+        return self.version >= (6, 4)
+
+    def _token(self):
+        """The API token, or the cached session token (logging in if there is none yet)."""
+        if self.api_token:
+            return self.api_token
+        with self._login_lock:
+            if self._auth is None:
+                user_field = "username" if self.bearer_auth else "user"
+                auth = self._post("user.login", {user_field: self.username, "password": self.password})
+                if not auth:
+                    raise ZabbixError("Zabbix authentication failed")
+                self._auth = auth
+            return self._auth
+
+    @staticmethod
+    def _is_auth_error(error):
+        message = str(error).lower()
+        return 're-login' in message or 'not authori' in message or 'session terminated' in message
+
+    def call(self, method, params):
+        """Call an authenticated API method and return its result."""
+        auth = self._token()
+        try:
+            return self._post(method, params, auth)
+        except ZabbixError as e:
+            if self.api_token or not self._is_auth_error(e):
+                raise
+            # The session token expired: log in again once
+            with self._lock:
+                if self._auth == auth:
+                    self._auth = None
+            return self._post(method, params, self._token())
+
+    def latest_values(self, host, keys):
+        """Last value of each item key on host as {key: float or None}, fetched with one item.get."""
+        items = self.call("item.get", {
+            "output": ["key_", "lastvalue"],
+            "host": host,
+            "filter": {"key_": list(keys)}
+        })
+        values = dict.fromkeys(keys)
+        for item in items or []:
+            try:
+                values[item['key_']] = float(item['lastvalue'])
+            except (KeyError, TypeError, ValueError):
+                pass
+        return values
+
+    def items(self, host, keys):
+        """Item id and value type of each item key on host, as {key: (itemid, value_type)}."""
+        items = self.call("item.get", {
+            "output": ["itemid", "key_", "value_type"],
+            "host": host,
+            "filter": {"key_": list(keys)}
+        })
+        return {item['key_']: (item['itemid'], int(item['value_type'])) for item in items or []}
+
+    def history(self, itemids, value_type, time_from, time_till, page_size=None):
+        """Raw values of items with time_from <= clock < time_till as (itemid, clock, value), oldest first.
+
+        history.get is paged by clock, page_size rows at a time. A page
+        restarts at the last clock of the previous one, so the rows of that
+        second can come back twice; callers insert with INSERT IGNORE.
+        """
+        page_size = page_size or BACKFILL_PAGE_SIZE
+        rows = []
+        while time_from < time_till:
+            page = self.call("history.get", {
+                "output": ["itemid", "clock", "value"],
+                "history": value_type,
+                "itemids": list(itemids),
+                "time_from": time_from,
+                "time_till": time_till - 1,
+                "sortfield": "clock",
+                "sortorder": "ASC",
+                "limit": page_size
+            }) or []
+            rows.extend((row['itemid'], int(row['clock']), float(row['value'])) for row in page)
+            if len(page) < page_size:
+                break
+            # A full page of one second would never advance; skip past it
+            time_from = max(int(page[-1]['clock']), time_from + 1)
+        return rows
+
+    def trends(self, itemids, time_from, time_till):
+        """Hourly trends of items with time_from <= clock < time_till as (itemid, clock, num, min, avg, max)."""
+        trends = self.call("trend.get", {
+            "output": ["itemid", "clock", "num", "value_min", "value_avg", "value_max"],
+            "itemids": list(itemids),
+            "time_from": time_from,
+            "time_till": time_till - 1
+        })
+        return [(row['itemid'], int(row['clock']), int(row['num']),
+                 float(row['value_min']), float(row['value_avg']), float(row['value_max']))
+                for row in trends or []]
+
+    def close(self):
+        """Log out (for password logins) and close the pooled connections."""
+        try:
+            if self._auth and not self.api_token:
+                self._post("user.logout", [], self._auth)
+        except Exception:
+            pass
+        self._auth = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+# Worker threads used to poll Zabbix hosts in parallel
+ZABBIX_POLL_WORKERS = 8
+
+# Zabbix history backfill. Zabbix keeps raw history for ZABBIX_HISTORY_DAYS
+# (trends much longer), so older days are read from the hourly trends. Days
+# per request chunk, rows per history.get page and rows per bulk insert:
+ZABBIX_HISTORY_DAYS = 7
+BACKFILL_HISTORY_CHUNK_DAYS = 1
+BACKFILL_TREND_CHUNK_DAYS = 31
+BACKFILL_PAGE_SIZE = 10000
+BACKFILL_INSERT_BATCH = 5000
+# Chunks are counted from this date, so their boundaries do not depend on the day a backfill runs
+BACKFILL_CHUNK_EPOCH = date(2000, 1, 1)
+
+
+def poll_metrics(client, metrics, max_workers=ZABBIX_POLL_WORKERS):
+    """Read every metric: one item.get per host, with the hosts queried in parallel.
+
+    Returns one reading per metric, the metric dict plus value, status and
+    error. A host that fails only affects its own metrics.
+    """
+    by_host = {}
+    for metric in metrics:
+        by_host.setdefault(metric['host'], []).append(metric)
+    if not by_host:
+        return []
+    readings = []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(by_host))) as pool:
+        futures = {
+            host: pool.submit(client.latest_values, host, [m['key'] for m in host_metrics])
+            for host, host_metrics in by_host.items()
+        }
+        for host, future in futures.items():
+            try:
+                values, error = future.result(), None
+            except Exception as e:
+                values, error = {}, f"{host}: {e}"
+            for metric in by_host[host]:
+                value = values.get(metric['key'])
+                readings.append(dict(metric, value=value, status=metric_status(metric, value), error=error))
+    return readings
+
+
+# Default seconds between automatic Zabbix refreshes, and the longest
+# backoff delay after consecutive failed refreshes
+ZABBIX_REFRESH_INTERVAL = 60
+ZABBIX_REFRESH_MAX_BACKOFF = 900
+
+
+DEFAULT_ZABBIX_CONFIG = {
+    'url': 'http://your-zabbix-server/zabbix/api_jsonrpc.php',
+    'username': 'api_user',
+    'password': 'api_password',
+    # Zabbix 5.4+ API token; when set, username and password are not used. How it is
+    # sent (header or "auth" field) follows the server version, see ZabbixClient
+    'api_token': '',
+    'host': 'YourHostName',
+    'temp_key': 'sensor.temp',
+    'humidity_key': 'sensor.humidity',
+    # Seconds between automatic refreshes
+    'refresh_interval': ZABBIX_REFRESH_INTERVAL
+}
+
+
+def read_zabbix_config(path):
+    """The Zabbix settings saved at path, or the defaults if there is no readable file."""
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except Exception:
+        pass
+    return dict(DEFAULT_ZABBIX_CONFIG)
+
+
+def chunk_floor(day, days):
+    """First day of the days-long chunk containing day, counting chunks from BACKFILL_CHUNK_EPOCH."""
+    return day - timedelta(days=(day - BACKFILL_CHUNK_EPOCH).days % days)
+
+
+def backfill_chunks(hosts, start_date, end_date, history_days=ZABBIX_HISTORY_DAYS, today=None):
+    """Split a date range into (host, source, chunk_start, chunk_end) request chunks, end exclusive.
+
+    Days within the last history_days come from 'history', one
+    BACKFILL_HISTORY_CHUNK_DAYS chunk at a time; older days come from
+    'trend' in chunks of BACKFILL_TREND_CHUNK_DAYS. Chunks start on fixed
+    dates (see chunk_floor), cut short only by the range and the start of
+    the history window, so runs on different days mostly cut the same chunks.
+    """
+    today = today or datetime.now().date()
+    history_from = today - timedelta(days=history_days)
+    end = end_date + timedelta(days=1)
+    chunks = []
+    for host in hosts:
+        day = start_date
+        while day < end:
+            if day < history_from:
+                source, days, limit = 'trend', BACKFILL_TREND_CHUNK_DAYS, min(history_from, end)
+            else:
+                source, days, limit = 'history', BACKFILL_HISTORY_CHUNK_DAYS, end
+            until = min(chunk_floor(day, days) + timedelta(days=days), limit)
+            chunks.append((host, source, day, until))
+            day = until
+    return chunks
+
+
+def completed_backfill_days(db_pool, start_date, end_date):
+    """The days of a date range already backfilled, as {host: set of days}, from the checkpoints."""
+    with db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT host, chunk_start, chunk_end FROM {BACKFILL_CHECKPOINTS_TABLE} "
+            "WHERE chunk_end > %s AND chunk_start <= %s",
+            (start_date, end_date)
+        )
+        done = {}
+        for host, chunk_start, chunk_end in cursor.fetchall():
+            days = done.setdefault(host, set())
+            day = chunk_start
+            while day < chunk_end:
+                days.add(day)
+                day += timedelta(days=1)
+        cursor.close()
+    return done
+
+
+def backfill_chunk(client, store, host, source, chunk_start, chunk_end, items, sensor_ids):
+    """Fetch one chunk from Zabbix and store it with its checkpoint in one transaction.
+
+    items maps each key to (itemid, value_type) and sensor_ids maps each key
+    to its sensor id. History is stored as raw readings (which also updates
+    the daily table); trends only feed the daily table. A chunk that runs
+    into today is stored without a checkpoint, so the next run reads the
+    rest of the day. Returns the rows written.
+    """
+    time_from = int(datetime.combine(chunk_start, datetime.min.time()).timestamp())
+    time_till = int(datetime.combine(chunk_end, datetime.min.time()).timestamp())
+    sensor_of = {items[key][0]: sensor_ids[key] for key in items}
+    if source == 'history':
+        by_type = {}
+        for itemid, value_type in items.values():
+            by_type.setdefault(value_type, []).append(itemid)
+        rows = []
+        for value_type, itemids in by_type.items():
+            rows.extend(
+                (sensor_of[itemid], datetime.fromtimestamp(clock), value)
+                for itemid, clock, value in client.history(itemids, value_type, time_from, time_till)
+            )
+    else:
+        # Fold the hourly trends into days: min of minimums, max of maximums, avg weighted by sample count
+        daily = {}
+        for itemid, clock, num, low, avg, high in client.trends(list(sensor_of), time_from, time_till):
+            key = (sensor_of[itemid], datetime.fromtimestamp(clock).date())
+            d_low, d_high, total, count = daily.get(key, (low, high, 0.0, 0))
+            daily[key] = (min(d_low, low), max(d_high, high), total + avg * num, count + num)
+        rows = [(sensor_id, day, low, high, total / count, count)
+                for (sensor_id, day), (low, high, total, count) in sorted(daily.items()) if count]
+    written = 0
+    with store.db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        for i in range(0, len(rows), BACKFILL_INSERT_BATCH):
+            batch = rows[i:i + BACKFILL_INSERT_BATCH]
+            if source == 'history':
+                written += store.insert_rows(cursor, batch)
+            else:
+                store.replace_daily(cursor, batch)
+                written += len(batch)
+        if chunk_end <= datetime.now().date():
+            cursor.execute(f"""
+                INSERT INTO {BACKFILL_CHECKPOINTS_TABLE} (host, chunk_start, chunk_end, source, rows_written)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE source = VALUES(source), rows_written = VALUES(rows_written),
+                    completed_at = CURRENT_TIMESTAMP
+            """, (host, chunk_start, chunk_end, source, written))
+        conn.commit()
+        cursor.close()
+    return written
+
+
+def backfill_sensor_history(client, store, metrics, start_date, end_date,
+                            history_days=ZABBIX_HISTORY_DAYS, max_workers=ZABBIX_POLL_WORKERS, progress=None):
+    """Load the Zabbix history of the registered metrics from start_date to end_date (inclusive).
+
+    The range is split per host into chunks (see backfill_chunks) that are
+    fetched in parallel and bulk-inserted, each committed together with its
+    checkpoint. Chunks whose days were all checkpointed by an earlier run
+    are skipped, so an interrupted backfill picks up where it stopped. progress(done, total)
+    is called after each chunk. Returns the rows written.
+    """
+    by_host = {}
+    for metric in metrics:
+        by_host.setdefault(metric['host'], []).append(metric)
+    with store.db_pool.get_connection() as conn:
+        cursor = conn.cursor()
+        ids = store.sensor_ids(cursor, metrics)
+        conn.commit()
+        cursor.close()
+    items, sensor_ids = {}, {}
+    for host, host_metrics in by_host.items():
+        keys = [m['key'] for m in host_metrics]
+        items[host] = client.items(host, keys)
+        for key in keys:
+            if key not in items[host]:
+                print(f"[ERROR] Backfill: no Zabbix item {key} on {host}")
+        sensor_ids[host] = {key: ids[(host, key)] for key in items[host]}
+    done = completed_backfill_days(store.db_pool, start_date, end_date)
+    chunks = [(host, source, chunk_start, chunk_end)
+              for host, source, chunk_start, chunk_end
+              in backfill_chunks([h for h in by_host if items[h]], start_date, end_date, history_days)
+              if not all(chunk_start + timedelta(days=i) in done.get(host, ())
+                         for i in range((chunk_end - chunk_start).days))]
+    written = 0
+    if not chunks:
+        return written
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+        futures = [pool.submit(backfill_chunk, client, store, host, source, chunk_start, chunk_end,
+                               items[host], sensor_ids[host])
+                   for host, source, chunk_start, chunk_end in chunks]
+        for finished, future in enumerate(futures, 1):
+            written += future.result()
+            if progress:
+                progress(finished, len(chunks))
+    return written
+
+
+# Seconds a Zabbix reading is served from memory before a background refetch
+ZABBIX_SNAPSHOT_TTL = 60
+
+
+def refresh_delay(interval, failures, max_delay=ZABBIX_REFRESH_MAX_BACKOFF):
+    """Seconds until the next refresh: interval, or after failures an exponential backoff with jitter.
+
+    The backoff doubles per consecutive failure up to max_delay and is
+    drawn from its upper half, so clients that failed together spread out.
+    """
+    if failures <= 0:
+        return interval
+    delay = min(max_delay, interval * 2 ** failures)
+    return random.uniform(delay / 2, delay)
+
+
+class ZabbixSnapshot:
+    """Last Zabbix temperature/humidity reading, refetched in the background once it is older than ttl.
+
+    Readers get the cached reading immediately (None before the first fetch
+    completes) and never wait on the network. At most one fetch runs at a
+    time. When it completes, every subscriber is called with the new reading
+    through notify, which must hand the call to the Tk thread.
+    """
+    def __init__(self, fetch, notify, ttl=ZABBIX_SNAPSHOT_TTL):
+        self.fetch = fetch
+        self.notify = notify
+        self.ttl = ttl
+        self.data = None
+        self.fetched_at = None
+        self._fetching = False
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    @property
+    def stale(self):
+        return self.fetched_at is None or time.monotonic() - self.fetched_at > self.ttl
+
+    def get(self):
+        """Return the cached reading, starting a background refresh if it is stale."""
+        if self.stale:
+            self.refresh()
+        return self.data
+
+    def refresh(self, force=False):
+        """Fetch a new reading in the background if the cached one is stale (or always with force).
+
+        Returns True if a fetch was started or is already running.
+        """
+        with self._lock:
+            if self._fetching:
+                return True
+            if not force and not self.stale:
+                return False
+            self._fetching = True
+
+        def run():
+            try:
+                data = self.fetch()
+            except Exception as e:
+                data = {'temp': None, 'temp_status': 'NOT OK', 'humidity': None,
+                        'humidity_status': 'NOT OK', 'error': str(e)}
+            with self._lock:
+                self.data = data
+                self.fetched_at = time.monotonic()
+                self._fetching = False
+            for callback in self._subscribers:
+                self.notify(callback, data)
+        threading.Thread(target=run, daemon=True).start()
+        return True
+
+
+def read_sensors(client, metrics, store=None):
+    """Poll every metric and return the reading shown by the app and reports.
+
+    Besides the per-room aggregates, the reading keeps the overall
+    temperature and humidity (averaged over all sensors, NOT OK if any
+    sensor is). With a ReadingStore the polled values are also recorded.
+    """
+    readings = poll_metrics(client, metrics)
+    if store is not None:
+        try:
+            store.append(readings)
+        except Exception as e:
+            print(f"[ERROR] Could not store Zabbix readings: {e}")
+    errors = sorted({r['error'] for r in readings if r['error']})
+
+    def overall(name):
+        sensors = [r for r in readings if str(r['name']).lower() == name]
+        values = [r['value'] for r in sensors if r['value'] is not None]
+        value = round(sum(values) / len(values), 2) if values else None
+        status = 'OK' if sensors and all(r['status'] == 'OK' for r in sensors) else 'NOT OK'
+        return value, status
+
+    temp, temp_status = overall('temperature')
+    humidity, humidity_status = overall('humidity')
+    return {
+        'temp': temp,
+        'temp_status': temp_status,
+        'humidity': humidity,
+        'humidity_status': humidity_status,
+        'error': '; '.join(errors) or None,
+        'rooms': aggregate_by_room(readings),
+        'sensors': len(readings)
+    }
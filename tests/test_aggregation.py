@@ -0,0 +1,90 @@
+"""Report periods, range chunking and form bookkeeping, without Tk or a database."""
+from datetime import date
+
+import pytest
+
+from healthcheck_core.aggregation import (InvalidReportRange, changed_rows, merge_range_summaries, missing_reasons,
+                                          report_period, year_chunks)
+
+
+@pytest.mark.parametrize('report_type, value, end_value, expected', [
+    ('daily', '2026-10-18', None,
+     ("Daily Health Check Report - 2026-10-18", date(2026, 10, 18), date(2026, 10, 18))),
+    ('weekly', '2026-10-12', None,
+     ("Weekly Health Check Report - 2026-10-12 to 2026-10-18", date(2026, 10, 12), date(2026, 10, 18))),
+    ('monthly', '2024-02', None,
+     ("Monthly Health Check Report - 2024-02", date(2024, 2, 1), date(2024, 2, 29))),
+    ('yearly', '2025', None,
+     ("Yearly Health Check Report - 2025", date(2025, 1, 1), date(2025, 12, 31))),
+    ('custom', '2026-09-28', '2026-10-03',
+     ("Custom Health Check Report - 2026-09-28 to 2026-10-03", date(2026, 9, 28), date(2026, 10, 3))),
+    ('custom', '2026-10-03', '2026-10-03',
+     ("Custom Health Check Report - 2026-10-03 to 2026-10-03", date(2026, 10, 3), date(2026, 10, 3))),
+])
+def test_report_period(report_type, value, end_value, expected):
+    assert report_period(report_type, value, end_value) == expected
+
+
+def test_report_period_inverted_custom_range():
+    with pytest.raises(InvalidReportRange):
+        report_period('custom', '2026-10-04', '2026-10-03')
+
+
+@pytest.mark.parametrize('report_type, value, end_value', [
+    ('daily', '18/10/2026', None),
+    ('monthly', '2026-13', None),
+    ('yearly', 'last', None),
+    ('custom', '2026-10-01', None),
+    ('hourly', '2026-10-18', None),
+])
+def test_report_period_bad_input(report_type, value, end_value):
+    with pytest.raises(ValueError):
+        report_period(report_type, value, end_value)
+
+
+def test_year_chunks():
+    assert year_chunks(date(2025, 3, 1), date(2025, 3, 1)) == [(date(2025, 3, 1), date(2025, 3, 1))]
+    assert year_chunks(date(2025, 1, 1), date(2025, 12, 31)) == [(date(2025, 1, 1), date(2025, 12, 31))]
+    assert year_chunks(date(2024, 6, 15), date(2026, 2, 1)) == [
+        (date(2024, 6, 15), date(2024, 12, 31)),
+        (date(2025, 1, 1), date(2025, 12, 31)),
+        (date(2026, 1, 1), date(2026, 2, 1)),
+    ]
+    assert year_chunks(date(2026, 2, 1), date(2026, 1, 1)) == []
+
+
+def stats(total, ok, not_ok, last_reason=None, last_date=None):
+    return {'total': total, 'ok': ok, 'not_ok': not_ok, 'last_reason': last_reason, 'last_date': last_date}
+
+
+def test_merge_range_summaries():
+    merged = merge_range_summaries([
+        {'check_stats': {'Backups': stats(3, 2, 1, 'Tape full', date(2024, 12, 30)), 'UPS': stats(3, 3, 0)},
+         'total_days': 3, 'last_user': 'alice'},
+        {'check_stats': {'Backups': stats(2, 2, 0), 'Air': stats(2, 1, 1, 'Filter', date(2025, 1, 2))},
+         'total_days': 2, 'last_user': None},
+    ])
+    assert list(merged['check_stats']) == ['Air', 'Backups', 'UPS']
+    # The last failure is the latest one, even when the later period had none
+    assert merged['check_stats']['Backups'] == stats(5, 4, 1, 'Tape full', date(2024, 12, 30))
+    assert merged['check_stats']['Air'] == stats(2, 1, 1, 'Filter', date(2025, 1, 2))
+    assert merged['total_days'] == 5
+    assert merged['last_user'] == 'alice'
+
+
+def test_merge_range_summaries_of_nothing():
+    assert merge_range_summaries([]) == {'check_stats': {}, 'total_days': 0, 'last_user': None}
+
+
+def test_changed_rows():
+    saved = {'A': ('OK', None, ''), 'B': ('NOT OK', 'Fan', '')}
+    form = {'A': ('OK', None, ''), 'B': ('NOT OK', 'Fan', 'replaced'), 'C': ('OK', None, '')}
+    assert changed_rows(form, saved) == {'B': ('NOT OK', 'Fan', 'replaced'), 'C': ('OK', None, '')}
+    assert changed_rows(saved, saved) == {}
+    assert changed_rows(form, {}) == form
+
+
+def test_missing_reasons():
+    form = {'A': ('OK', None, ''), 'B': ('NOT OK', '', ''), 'C': ('NOT OK', 'Fan', ''), 'D': ('NOT OK', None, 'x')}
+    assert missing_reasons(form) == ['B', 'D']
+    assert missing_reasons({}) == []
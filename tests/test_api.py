@@ -0,0 +1,139 @@
+"""Submission validation and the error replies of the ingestion API."""
+import http.client
+import json
+from datetime import date
+
+import pytest
+
+from healthcheck_core.api import INGEST_MAX_BODY, INGEST_MAX_CONCURRENT, IngestServer, InvalidSubmission, parse_results
+
+TODAY = date(2026, 10, 18)
+
+
+def errors_of(payload):
+    with pytest.raises(InvalidSubmission) as info:
+        parse_results(payload, today=TODAY)
+    return info.value.errors
+
+
+def test_parse_results_with_defaults():
+    rows = parse_results({'date': '2026-10-17', 'username': 'nagios', 'results': [
+        {'check_name': ' Printers ', 'status': 'not ok', 'reason': 'Paper jam'},
+        {'check_name': 'Backups', 'status': 'OK', 'username': 'cron', 'date': '2026-10-16'},
+    ]}, today=TODAY)
+    assert rows == [
+        (date(2026, 10, 17), 'Printers', 'NOT OK', 'Paper jam', '', 'nagios'),
+        (date(2026, 10, 16), 'Backups', 'OK', '', '', 'cron'),
+    ]
+
+
+def test_parse_results_keeps_last_entry_and_defaults_to_today():
+    rows = parse_results([{'check_name': 'A', 'status': 'NOT OK', 'reason': 'x'},
+                          {'check_name': 'A', 'status': 'OK'}], today=TODAY)
+    assert rows == [(TODAY, 'A', 'OK', '', '', None)]
+
+
+@pytest.mark.parametrize('payload', [None, [], {}, {'results': 'A'}, {'results': []}])
+def test_parse_results_needs_a_list(payload):
+    assert errors_of(payload) == ["expected a non-empty list of results"]
+
+
+def test_parse_results_missing_fields():
+    errors = errors_of([{}, 'A'])
+    assert "result 0: check_name is required (at most 100 characters)" in errors
+    assert any(e.startswith("result 0: status must be one of") for e in errors)
+    assert "result 1: expected an object" in errors
+
+
+def test_parse_results_bad_status_and_date():
+    errors = errors_of([{'check_name': 'A', 'status': 'MAYBE'},
+                        {'check_name': 'B', 'status': 'OK', 'date': '18/10/2026'}])
+    assert errors == ["result 0: status must be one of OK, NOT OK", "result 1: date must be YYYY-MM-DD"]
+
+
+def test_parse_results_not_ok_needs_reason():
+    assert errors_of([{'check_name': 'A', 'status': 'NOT OK', 'reason': '  '}]) == [
+        "result 0: a NOT OK result needs a reason"]
+
+
+def test_parse_results_length_limits():
+    assert parse_results([{'check_name': 'c' * 100, 'status': 'OK', 'username': 'u' * 50}], today=TODAY)
+    errors = errors_of([{'check_name': 'c' * 101, 'status': 'OK'},
+                        {'check_name': 'A', 'status': 'OK', 'username': 'u' * 51},
+                        {'check_name': 'B', 'status': 'OK', 'username': 42}])
+    assert errors == [
+        "result 0: check_name is required (at most 100 characters)",
+        "result 1: username must be a string of at most 50 characters",
+        "result 2: username must be a string of at most 50 characters",
+    ]
+
+
+@pytest.fixture
+def server():
+    # No database: every request below is refused before one is needed
+    with IngestServer(None, port=0, token='secret') as server:
+        yield server
+
+
+def request(server, method, path, body=None, headers=None):
+    host, port = server.httpd.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        conn.putrequest(method, path)
+        for name, value in (headers or {}).items():
+            conn.putheader(name, value)
+        conn.endheaders(body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b'null')
+    finally:
+        conn.close()
+
+
+AUTH = {'Authorization': 'Bearer secret'}
+
+
+def test_health_needs_the_token(server):
+    assert request(server, 'GET', '/api/health')[0] == 401
+    assert request(server, 'GET', '/api/health', headers={'Authorization': 'Bearer wrong'})[0] == 401
+    assert request(server, 'GET', '/api/health', headers=AUTH) == (200, {'status': 'ok'})
+
+
+def test_unknown_endpoint(server):
+    assert request(server, 'GET', '/api/nothing', headers=AUTH)[0] == 404
+
+
+def test_invalid_submission_is_400_with_details(server):
+    body = json.dumps([{'check_name': 'A', 'status': 'NOT OK'}]).encode()
+    status, reply = request(server, 'POST', '/api/results', body,
+                            dict(AUTH, **{'Content-Length': str(len(body))}))
+    assert status == 400
+    assert reply == {'error': "invalid submission", 'details': ["result 0: a NOT OK result needs a reason"]}
+
+
+def test_invalid_json_is_400(server):
+    status, reply = request(server, 'POST', '/api/results', b'{', dict(AUTH, **{'Content-Length': '1'}))
+    assert (status, reply['error']) == (400, "request body is not valid JSON")
+
+
+@pytest.mark.parametrize('length', ['-1', 'abc'])
+def test_bad_content_length_is_400(server, length):
+    status, reply = request(server, 'POST', '/api/results', None, dict(AUTH, **{'Content-Length': length}))
+    assert (status, reply['error']) == (400, "invalid Content-Length")
+
+
+def test_oversized_body_is_413(server):
+    status, _ = request(server, 'POST', '/api/results', None,
+                        dict(AUTH, **{'Content-Length': str(INGEST_MAX_BODY + 1)}))
+    assert status == 413
+
+
+def test_busy_server_is_503(server, monkeypatch):
+    monkeypatch.setattr('healthcheck_core.api.INGEST_QUEUE_TIMEOUT', 0.1)
+    for _ in range(INGEST_MAX_CONCURRENT):
+        server.slots.acquire()
+    try:
+        assert request(server, 'GET', '/api/health', headers=AUTH)[0] == 503
+    finally:
+        for _ in range(INGEST_MAX_CONCURRENT):
+            server.slots.release()
+    assert request(server, 'GET', '/api/health', headers=AUTH)[0] == 200
@@ -0,0 +1,150 @@
+"""The report block model and the text the Tk view and text export render from it."""
+from datetime import date, datetime
+
+from healthcheck_core.rendering import blocks_segments, report_blocks, segments_text, tagged_text
+from healthcheck_core.reports import Report
+
+DAILY_ROWS = [
+    {'check_name': 'Backups', 'status': 'OK', 'reason': None, 'notes': '', 'username': 'alice',
+     'timestamp': datetime(2026, 10, 18, 8)},
+    {'check_name': 'UPS', 'status': 'NOT OK', 'reason': 'Battery', 'notes': 'ticket 7', 'username': 'bob',
+     'timestamp': datetime(2026, 10, 18, 9)},
+]
+CONDITIONS = {'DC1': {'Temperature': {'unit': '°C', 'min': 21.0, 'max': 27.5, 'avg': 23.25, 'status': 'OK'}}}
+RANGE_SUMMARY = {
+    'check_stats': {
+        'Backups': {'total': 30, 'ok': 29, 'not_ok': 1, 'last_reason': 'Tape', 'last_date': '2026-09-12'},
+        'UPS': {'total': 30, 'ok': 30, 'not_ok': 0, 'last_reason': None, 'last_date': None},
+    },
+    'total_days': 30,
+    'last_user': 'carol',
+}
+
+
+def test_daily_report_segments():
+    blocks = report_blocks('Daily', DAILY_ROWS, 'daily', conditions=CONDITIONS)
+    assert [block[0] for block in blocks] == ['title', 'section', 'last_user', 'checks', 'summary']
+    assert blocks_segments(blocks) == [
+        ('Daily\n', 'title'),
+        ('=====\n\n', 'title'),
+        ('Recorded Zabbix Conditions (min / max / avg):\n', 'header'),
+        ('  DC1 Temperature: 21 / 27.5 / 23.25 °C (OK)\n', 'ok'),
+        ('\n', None),
+        ('Last submitted by: bob\n\n', 'header'),
+        ('Check Name'.ljust(40), 'header'),
+        ('Status'.ljust(10), 'header'),
+        ('Notes\n', 'header'),
+        ('-' * 80 + '\n', 'header'),
+        ('Backups'.ljust(40), None),
+        ('OK'.ljust(10), 'ok'),
+        ('\n', None),
+        ('\n', None),
+        ('UPS'.ljust(40), None),
+        ('NOT OK'.ljust(10), 'not_ok'),
+        ('ticket 7\n', None),
+        ('  Reason: Battery\n\n', 'reason'),
+        ('\nSUMMARY:\n', 'header'),
+        ('Total checks: 2\n', None),
+        ('Passed: 1\n', 'ok'),
+        ('Failed: 1\n', 'not_ok'),
+        # 'rate' only colors the PDF; the text view leaves it plain
+        ('Success rate: 50.0%\n', None),
+    ]
+
+
+def test_range_report_segments():
+    blocks = report_blocks('Monthly', [], 'monthly', summary=RANGE_SUMMARY, conditions={})
+    assert [block[0] for block in blocks] == ['title', 'section', 'last_user', 'totals', 'summary']
+    assert blocks[-1][1][-1] == ('Overall success rate: 98.3%', 'rate')
+    assert blocks_segments(blocks) == [
+        ('Monthly\n', 'title'),
+        ('=======\n\n', 'title'),
+        ('Recorded Zabbix Conditions (min / max / avg):\n', 'header'),
+        ('  No readings were recorded for this period.\n', None),
+        ('\n', None),
+        ('Last submitted by: carol\n\n', 'header'),
+        ('Check Name'.ljust(40), 'header'),
+        ('Passed'.center(10), 'header'),
+        ('Failed'.center(10), 'header'),
+        ('Last Failure Date'.center(20), 'header'),
+        ('Last Failure Reason\n', 'header'),
+        ('-' * 100 + '\n', 'header'),
+        ('Backups'.ljust(40), None),
+        ('29'.center(10), 'ok'),
+        ('1'.center(10), 'not_ok'),
+        ('2026-09-12'.center(20), None),
+        ('Tape\n', 'reason'),
+        ('UPS'.ljust(40), None),
+        ('30'.center(10), 'ok'),
+        ('0'.center(10), 'not_ok'),
+        ('N/A'.center(20), None),
+        ('N/A\n', None),
+        ('\nSUMMARY:\n', 'header'),
+        ('Report period covers 30 days\n', None),
+        ('Total checks performed: 60\n', None),
+        ('Total passed: 59\n', 'ok'),
+        ('Total failed: 1\n', 'not_ok'),
+        ('Overall success rate: 98.3%\n', None),
+    ]
+
+
+def test_empty_report_segments():
+    blocks = report_blocks('Weekly', [], 'weekly', summary={'check_stats': {}, 'total_days': 0, 'last_user': None},
+                           conditions={})
+    assert blocks_segments(blocks) == [
+        ('Weekly\n', 'title'),
+        ('======\n\n', 'title'),
+        ('Recorded Zabbix Conditions (min / max / avg):\n', 'header'),
+        ('  No readings were recorded for this period.\n', None),
+        ('\n', None),
+        ('No data available for this report period.\n', None),
+    ]
+
+
+def test_live_error_report_segments():
+    blocks = report_blocks('Live', [], 'daily', live={'error': 'timeout'})
+    assert blocks_segments(blocks) == [
+        ('Live\n', 'title'),
+        ('====\n\n', 'title'),
+        ('Zabbix Data (Temperature & Humidity):\n', 'header'),
+        ('  Error: timeout\n', 'not_ok'),
+        ('\n', None),
+        ('No data available for this report period.\n', None),
+    ]
+
+
+def test_tagged_text_ranges():
+    segments = blocks_segments(report_blocks('Live', [], 'daily', live={'error': 'timeout'}))
+    text, ranges = tagged_text(segments)
+    assert text == segments_text(segments)
+    assert ranges == {'title': ['1.0', '2.0', '2.0', '4.0'], 'header': ['4.0', '5.0'], 'not_ok': ['5.0', '6.0']}
+
+    segments = blocks_segments(report_blocks('Daily', DAILY_ROWS, 'daily', conditions=CONDITIONS))
+    ranges = tagged_text(segments)[1]
+    assert ranges['ok'] == ['5.0', '6.0', '11.40', '11.50', '19.0', '20.0']
+    assert ranges['not_ok'] == ['13.40', '13.50', '20.0', '21.0']
+    assert ranges['reason'] == ['14.0', '16.0']
+
+
+def text_offset(text, index):
+    line, column = map(int, index.split('.'))
+    return sum(len(part) + 1 for part in text.split('\n')[:line - 1]) + column
+
+
+def test_tagged_text_ranges_cover_their_segments():
+    for blocks in (report_blocks('Daily', DAILY_ROWS, 'daily', conditions=CONDITIONS),
+                   report_blocks('Monthly', [], 'monthly', summary=RANGE_SUMMARY, conditions={})):
+        segments = blocks_segments(blocks)
+        text, ranges = tagged_text(segments)
+        for tag, indices in ranges.items():
+            tagged = [text[text_offset(text, start):text_offset(text, end)]
+                      for start, end in zip(indices[::2], indices[1::2])]
+            assert tagged == [segment for segment, segment_tag in segments if segment_tag == tag]
+
+
+def test_report_text_and_exports_share_the_blocks():
+    report = Report('Daily', 'daily', date(2026, 10, 18), date(2026, 10, 18), DAILY_ROWS, conditions=CONDITIONS)
+    assert report.blocks() is report.blocks()
+    assert report.segments() == blocks_segments(report.blocks())
+    assert report.text() == segments_text(blocks_segments(report_blocks('Daily', DAILY_ROWS, 'daily',
+                                                                        conditions=CONDITIONS)))
@@ -0,0 +1,237 @@
+"""ZabbixClient, polling and history backfill against the fake Zabbix server."""
+import threading
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from fake_zabbix import FakeZabbixServer
+from healthcheck_core.aggregation import load_metric_registry
+from healthcheck_core.zabbix import (BACKFILL_CHUNK_EPOCH, BACKFILL_TREND_CHUNK_DAYS, ZabbixClient, ZabbixError,
+                                     backfill_chunks, backfill_sensor_history, poll_metrics)
+
+
+class FakeCursor:
+    """Answers the checkpoint queries of the backfill from FakePool.checkpoints."""
+    def __init__(self, pool):
+        self.pool = pool
+        self.rows = []
+
+    def execute(self, sql, params=()):
+        if sql.lstrip().startswith('SELECT host, chunk_start, chunk_end'):
+            self.rows = [c for c in self.pool.checkpoints if c[2] > params[0] and c[1] <= params[1]]
+        elif 'zabbix_backfill_checkpoints' in sql:
+            self.pool.checkpoints.append(tuple(params[:3]))
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self):
+        return FakeCursor(self.pool)
+
+    def commit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class FakePool:
+    def __init__(self):
+        self.checkpoints = []
+
+    def get_connection(self):
+        return FakeConnection(self)
+
+
+class FakeStore:
+    """The part of ReadingStore the backfill uses, keeping rows in memory."""
+    def __init__(self):
+        self.db_pool = FakePool()
+        self.readings = set()
+        self.daily = {}
+
+    def sensor_ids(self, cursor, metrics):
+        return {(m['host'], m['key']): i for i, m in enumerate(metrics, 1)}
+
+    def insert_rows(self, cursor, rows):
+        new = set(rows) - self.readings
+        self.readings |= new
+        return len(new)
+
+    def replace_daily(self, cursor, rows):
+        for sensor_id, day, low, high, avg, samples in rows:
+            self.daily[(sensor_id, day)] = (low, high, avg, samples)
+
+
+@pytest.fixture
+def server():
+    with FakeZabbixServer(hosts=3) as server:
+        yield server
+
+
+def test_login_once_and_reuse_token(server):
+    client = ZabbixClient(server.url, 'user', 'pass')
+    client.latest_values('env-01', ['sensor.temp'])
+    client.latest_values('env-02', ['sensor.temp'])
+    client.items('env-03', ['sensor.humidity'])
+    assert server.api.calls['user.login'] == 1
+    assert server.api.calls['item.get'] == 3
+    client.close()
+
+
+def test_login_again_after_session_expires(server):
+    client = ZabbixClient(server.url, 'user', 'pass')
+    client.latest_values('env-01', ['sensor.temp'])
+    server.api.tokens.clear()
+    values = client.latest_values('env-01', ['sensor.temp'])
+    assert values['sensor.temp'] is not None
+    assert server.api.calls['user.login'] == 2
+
+
+@pytest.mark.parametrize('version', ['5.4.0', '6.0.20', '6.4.0', '7.2.1'])
+def test_auth_scheme_follows_server_version(version):
+    with FakeZabbixServer(hosts=1, version=version, api_token='token') as server:
+        client = ZabbixClient(server.url, 'user', 'pass')
+        assert client.latest_values('env-01', ['sensor.temp'])['sensor.temp'] is not None
+        client.items('env-01', ['sensor.temp'])
+        assert client.bearer_auth == (version >= '6.4')
+        token_client = ZabbixClient(server.url, api_token='token')
+        assert token_client.latest_values('env-01', ['sensor.humidity'])['sensor.humidity'] is not None
+        assert server.api.calls['apiinfo.version'] == 2
+        assert server.api.calls['user.login'] == 1
+
+
+def test_unauthenticated_calls_are_rejected(server):
+    client = ZabbixClient(server.url)
+    with pytest.raises(ZabbixError, match='Not authorised'):
+        client._post('item.get', {'host': 'env-01'})
+
+
+def test_breaker_opens_after_timeouts_and_fails_fast():
+    with FakeZabbixServer(hosts=1, latency=0.5, api_token='token') as server:
+        client = ZabbixClient(server.url, api_token='token', timeout=0.1)
+        for _ in range(client.breaker.failures):
+            with pytest.raises(requests.exceptions.Timeout):
+                client.latest_values('env-01', ['sensor.temp'])
+        assert client.breaker.is_open
+        with pytest.raises(ZabbixError, match='unreachable'):
+            client.latest_values('env-01', ['sensor.temp'])
+        # Only the timed-out calls reached the server
+        assert sum(server.api.calls.values()) == client.breaker.failures
+
+
+def test_breaker_opens_on_http_errors():
+    requests_seen = []
+
+    class Unavailable(BaseHTTPRequestHandler):
+        def do_POST(self):
+            requests_seen.append(self.path)
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Unavailable)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        client = ZabbixClient(f"http://127.0.0.1:{httpd.server_address[1]}/api_jsonrpc.php", api_token='token')
+        for _ in range(client.breaker.failures):
+            with pytest.raises(requests.exceptions.HTTPError):
+                client.latest_values('env-01', ['sensor.temp'])
+        assert client.breaker.is_open
+        with pytest.raises(ZabbixError, match='unreachable'):
+            client.latest_values('env-01', ['sensor.temp'])
+        assert len(requests_seen) == client.breaker.failures
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_poll_metrics_reads_every_host(server):
+    client = ZabbixClient(server.url, 'user', 'pass')
+    metrics = load_metric_registry({'metrics': server.api.metric_registry()})
+    metrics.append({'room': 'lab', 'host': 'env-99', 'key': 'sensor.temp', 'name': 'Temperature', 'unit': '°C',
+                    'min': None, 'max': None})
+    readings = poll_metrics(client, metrics)
+    assert len(readings) == len(metrics)
+    # One item.get per host
+    assert server.api.calls['item.get'] == 4
+    known = [r for r in readings if r['host'] != 'env-99']
+    assert all(r['value'] is not None and r['error'] is None for r in known)
+    missing = next(r for r in readings if r['host'] == 'env-99')
+    assert missing['value'] is None and missing['status'] == 'NOT OK'
+
+
+def test_backfill_chunks_do_not_depend_on_the_run_day():
+    start, end = date(2026, 3, 1), date(2026, 9, 30)
+    first = backfill_chunks(['env-01'], start, end, today=date(2026, 10, 18))
+    later = backfill_chunks(['env-01'], start, end, today=date(2026, 10, 25))
+    trend = [c for c in first if c[1] == 'trend']
+    assert trend[0][2] == start and first[-1][3] == end + timedelta(days=1)
+    for (_, _, chunk_start, chunk_end), (_, _, next_start, _) in zip(first, first[1:]):
+        assert chunk_end == next_start
+    assert all((c[2] - BACKFILL_CHUNK_EPOCH).days % BACKFILL_TREND_CHUNK_DAYS == 0 for c in trend[1:])
+    # Whole trend chunks come out the same whichever day the backfill runs
+    assert trend[:-1] == [c for c in later if c[1] == 'trend'][:len(trend) - 1]
+
+
+def test_backfill_chunks_history_window():
+    today = date(2026, 10, 18)
+    chunks = backfill_chunks(['env-01', 'env-02'], today - timedelta(days=10), today, history_days=7, today=today)
+    history = [c for c in chunks if c[0] == 'env-01' and c[1] == 'history']
+    assert [c[2] for c in history] == [today - timedelta(days=d) for d in range(7, -1, -1)]
+    assert all(c[3] - c[2] == timedelta(days=1) for c in history)
+    assert {c[0] for c in chunks} == {'env-01', 'env-02'}
+
+
+def test_backfill_skips_checkpointed_chunks(server):
+    client = ZabbixClient(server.url, 'user', 'pass')
+    store = FakeStore()
+    metrics = load_metric_registry({'metrics': server.api.metric_registry()[:4]})
+    today = datetime.now().date()
+    start, end = today - timedelta(days=9), today - timedelta(days=1)
+
+    progress = []
+    written = backfill_sensor_history(client, store, metrics, start, end,
+                                      progress=lambda done, total: progress.append((done, total)))
+    assert written > 0 and store.readings and store.daily
+    assert progress and progress[-1][0] == progress[-1][1]
+    checkpointed = {(host, chunk_start, chunk_end) for host, chunk_start, chunk_end in store.db_pool.checkpoints}
+    assert checkpointed == {(c[0], c[2], c[3]) for c in backfill_chunks(['env-01', 'env-02'], start, end)}
+
+    calls = dict(server.api.calls)
+    assert backfill_sensor_history(client, store, metrics, start, end) == 0
+    assert server.api.calls.get('history.get') == calls.get('history.get')
+    assert server.api.calls.get('trend.get') == calls.get('trend.get')
+
+
+def test_backfill_leaves_today_unchecked(server):
+    client = ZabbixClient(server.url, 'user', 'pass')
+    store = FakeStore()
+    metrics = load_metric_registry({'metrics': server.api.metric_registry()[:2]})
+    today = datetime.now().date()
+
+    backfill_sensor_history(client, store, metrics, today - timedelta(days=1), today)
+    assert [c[1:] for c in store.db_pool.checkpoints] == [(today - timedelta(days=1), today)]
+
+    history_calls = server.api.calls['history.get']
+    backfill_sensor_history(client, store, metrics, today - timedelta(days=1), today)
+    # Only today's chunk is read again
+    assert server.api.calls['history.get'] == history_calls + 1
+    assert len(store.db_pool.checkpoints) == 1
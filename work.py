@@ -1,4 +1,9 @@
+import time
+# Reference point of the start-up timing report
+PROCESS_START = time.perf_counter()
+
 import hashlib
+import importlib
 
 # --- Login Window for authentication ---
 class LoginWindow:
@@ -6,6 +11,7 @@ class LoginWindow:
         self.root = root
         self.db_config = db_config
         self.on_success = on_success
+        self.db_pool = get_db_pool(db_config)
         self.root.title("Login - System Health Monitor")
         self.root.geometry("400x300")
         self.frame = ttk.Frame(self.root, padding=30)
@@ -38,13 +44,11 @@ class LoginWindow:
             self.message_label.config(text="Please enter username and password.")
             return
         try:
-            import mysql.connector
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor()
-            cursor.execute("SELECT password FROM users WHERE username=%s", (username,))
-            row = cursor.fetchone()
-            cursor.close()
-            conn.close()
+            with self.db_pool.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT password FROM users WHERE username=%s", (username,))
+                row = cursor.fetchone()
+                cursor.close()
             if row and row[0] == self.hash_password(password):
                 self.on_success(username)
             else:
@@ -66,40 +70,23 @@ class LoginWindow:
             self.message_label.config(text="Please enter a valid email address.")
             return
         try:
-            import mysql.connector
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor()
-            cursor.execute("SELECT id FROM users WHERE username=%s", (username,))
-            if cursor.fetchone():
-                self.message_label.config(text="Username already exists.")
-                cursor.close()
-                conn.close()
-                return
-            # Check if email already exists
-            try:
+            with self.db_pool.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id FROM users WHERE username=%s", (username,))
+                if cursor.fetchone():
+                    self.message_label.config(text="Username already exists.")
+                    cursor.close()
+                    return
+                # Check if email already exists
                 cursor.execute("SELECT id FROM users WHERE email=%s", (email,))
                 if cursor.fetchone():
                     self.message_label.config(text="Gmail address already registered.")
                     cursor.close()
-                    conn.close()
                     return
-            except Exception:
-                pass  # If column doesn't exist, will error below
-            hashed = self.hash_password(password)
-            # Try to insert with email, fallback if column missing
-            try:
+                hashed = self.hash_password(password)
                 cursor.execute("INSERT INTO users (username, password, email) VALUES (%s, %s, %s)", (username, hashed, email))
-            except Exception as e:
-                # If error due to missing email column, add it
-                if "Unknown column 'email'" in str(e):
-                    cursor.execute("ALTER TABLE users ADD COLUMN email VARCHAR(128)")
-                    conn.commit()
-                    cursor.execute("INSERT INTO users (username, password, email) VALUES (%s, %s, %s)", (username, hashed, email))
-                else:
-                    raise
-            conn.commit()
-            cursor.close()
-            conn.close()
+                conn.commit()
+                cursor.close()
             self.message_label.config(text="Registration successful! Please login.", foreground="green")
         except Exception as e:
             self.message_label.config(text=f"Register error: {e}")
@@ -109,13 +96,183 @@ import mysql.connector
 from datetime import datetime, timedelta
 import csv
 import os
-from fpdf import FPDF
-from calendar import monthrange
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import requests
-from tkcalendar import DateEntry
+import threading
+import queue
 import json
+from healthcheck_core import instrumentation
+from healthcheck_core.api import IngestServer
+from healthcheck_core.aggregation import (
+    InvalidReportRange, changed_rows, format_room_stats, load_metric_registry, merge_range_summaries,
+    missing_reasons, report_period, year_chunks
+)
+from healthcheck_core.rendering import tagged_text
+from healthcheck_core.reports import Report, send_email
+from healthcheck_core.storage import (
+    CHECKS_TABLE, DB_POOL_SIZE, DEFAULT_DB_CONFIG, READINGS_TABLE, RESULTS_TABLE, SUMMARY_TABLE, DayCatalog,
+    MonthProblemCache, ReadingStore, adjacent_months, backfill_daily_summary, ensure_schema, fetch_check_catalog,
+    fetch_day_summary, fetch_range_summary, fetch_results, fetch_saved_days, fetch_user_emails, get_db_pool,
+    list_legacy_day_tables, migrate_day_tables, rebuild_daily_summary, save_day_results, upsert_checks
+)
+from healthcheck_core.zabbix import (
+    ZABBIX_REFRESH_INTERVAL, ZabbixClient, ZabbixSnapshot, backfill_sensor_history, read_sensors,
+    read_zabbix_config, refresh_delay
+)
+# matplotlib, fpdf, requests and tkcalendar are slow to import and only needed
+# by some tabs and exports, so they are imported where they are used.
+
+
+class StartupTimer:
+    """Wall-clock breakdown of a start-up sequence, reported as one [INFO] line."""
+    def __init__(self, start=None):
+        self.start = self.last = start if start is not None else time.perf_counter()
+        self.phases = []
+
+    def mark(self, phase):
+        """Record the time spent since the previous mark under phase."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self, what):
+        breakdown = ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.phases)
+        print(f"[INFO] {what} in {(self.last - self.start) * 1000:.0f} ms ({breakdown})")
+
+
+# Cold start of the process, from the first line of this module to the login window
+startup_timer = StartupTimer(PROCESS_START)
+startup_timer.mark("imports")
+
+
+def preload_chart_modules():
+    """Import matplotlib's Tk canvas ahead of the first dashboard chart.
+
+    Called from a worker thread so the import (and the font cache build on a
+    fresh machine) does not stall the Tk thread. Returns False if matplotlib
+    is not installed.
+    """
+    try:
+        importlib.import_module('matplotlib.figure')
+        importlib.import_module('matplotlib.backends.backend_tkagg')
+    except ImportError:
+        return False
+    return True
+
+
+# How often the day catalog re-reads the server to pick up other instances' writes
+DAY_CATALOG_REFRESH_MS = 60000
+
+
+# Threads serving the database job queue, so one long report does not hold up quick refreshes
+DB_WORKER_THREADS = 2
+# How often the Tk main loop collects the results of finished database jobs
+DB_WORKER_POLL_MS = 50
+
+
+class JobCancelled(Exception):
+    """Raised inside a database job once it has been cancelled."""
+
+
+class DBJob:
+    """One unit of work queued on a DBWorker. work(job) may report progress and should check for cancellation."""
+    def __init__(self, worker, work, on_done, on_error, on_progress):
+        self.worker = worker
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop the job at its next check_cancelled(); none of its callbacks run afterwards."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def report_progress(self, done, total):
+        """Called by the job; on_progress(done, total) runs on the Tk thread."""
+        if self.on_progress:
+            self.worker.call_soon(self.on_progress, done, total)
+
+
+def callback_name(func):
+    """Readable name of a job or callback for timings, e.g. 'HealthCheckApp.generate_report.<locals>.fetch'."""
+    return getattr(func, '__qualname__', None) or repr(func)
+
+
+class DBWorker:
+    """Database executor: a job queue served by worker threads, with results handed back to Tk.
+
+    Tk widgets may only be touched from the main loop, so workers never call
+    back directly. They put the callbacks on an outbox that the main loop
+    drains every DB_WORKER_POLL_MS with root.after.
+    """
+    def __init__(self, root, threads=DB_WORKER_THREADS, poll_ms=DB_WORKER_POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.jobs = queue.Queue()
+        self.outbox = queue.Queue()
+        for i in range(threads):
+            threading.Thread(target=self._serve, name=f"db-worker-{i}", daemon=True).start()
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, work, on_done=None, on_error=None, on_progress=None):
+        """Queue work(job) and return the job.
+
+        on_done(result), on_error(exception) and on_progress(done, total) run
+        on the Tk thread. Without on_error, failures are printed.
+        """
+        job = DBJob(self, work, on_done, on_error, on_progress)
+        self.jobs.put(job)
+        return job
+
+    def call_soon(self, func, *args):
+        """Run func(*args) on the Tk thread at the next poll. Safe to call from any thread."""
+        self.outbox.put((func, args))
+
+    def _serve(self):
+        while True:
+            job = self.jobs.get()
+            if job.cancelled:
+                continue
+            try:
+                with instrumentation.span(f"job {callback_name(job.work)}"):
+                    result = job.work(job)
+            except JobCancelled:
+                continue
+            except Exception as e:
+                if job.cancelled:
+                    continue
+                if job.on_error:
+                    self.call_soon(job.on_error, e)
+                else:
+                    print(f"[ERROR] Database job failed: {e}")
+                continue
+            if job.on_done and not job.cancelled:
+                self.call_soon(job.on_done, result)
+
+    def _poll(self):
+        while True:
+            try:
+                func, args = self.outbox.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                with instrumentation.span(f"ui {callback_name(func)}"):
+                    func(*args)
+            except Exception as e:
+                print(f"[ERROR] Database job callback failed: {e}")
+        self.root.after(self.poll_ms, self._poll)
+
+
+# Folder of the exports and the saved settings files
+DEFAULT_EXPORT_DIR = r"C:\Users\ROG\Documents\dates"
+
 
 class ToolTip:
     """Create a tooltip for a given widget"""
@@ -146,25 +303,234 @@ class ToolTip:
         if tw:
             tw.destroy()
 
+
+def form_text(parent, height):
+    """A Text box styled like the health check form's reason and notes fields"""
+    return tk.Text(
+        parent,
+        height=height,
+        width=40,
+        bg='white',
+        fg='#2c3e50',
+        font=('Segoe UI', 9),
+        padx=5,
+        pady=5,
+        highlightbackground='#bdc3c7',
+        highlightthickness=1
+    )
+
+
+class CheckRow:
+    """One pooled row of CheckListView, re-bound to whichever check is scrolled under it"""
+    def __init__(self, view):
+        self.view = view
+        self.name = None
+        self.frame = ttk.Frame(view.canvas, style='TFrame', padding=(0, 4))
+        self.frame.columnconfigure(1, weight=1)
+        self.frame.columnconfigure(2, weight=1)
+        self.var = tk.IntVar(value=1)
+        self.check = ttk.Checkbutton(self.frame, variable=self.var, style='Check.TCheckbutton', command=self.toggled)
+        self.check.grid(row=0, column=0, sticky='w', padx=(0, 10))
+        self.category_label = ttk.Label(self.frame, style='TLabel', foreground='#7f8c8d')
+        self.category_label.grid(row=1, column=0, sticky='nw', padx=(24, 10))
+        notes_frame = ttk.Frame(self.frame, style='TFrame')
+        ttk.Label(notes_frame, text="Additional notes:", style='TLabel').pack(anchor=tk.W)
+        self.notes = form_text(notes_frame, 2)
+        self.notes.pack(fill=tk.X)
+        notes_frame.grid(row=0, column=1, rowspan=2, sticky='ew', padx=5)
+        # Created the first time this row shows a NOT OK check
+        self.reason_frame = None
+        self.reason = None
+        self.y = None
+        self.window = view.canvas.create_window(0, 0, window=self.frame, anchor='nw', state='hidden')
+        for widget in (self.frame, self.check, self.category_label, notes_frame, self.notes):
+            view.bind_wheel(widget)
+
+    def ensure_reason(self):
+        if self.reason is None:
+            self.reason_frame = ttk.Frame(self.frame, style='TFrame')
+            ttk.Label(self.reason_frame, text="Reason for issue:", style='TLabel').pack(anchor=tk.W)
+            self.reason = form_text(self.reason_frame, 2)
+            self.reason.pack(fill=tk.X)
+            self.view.bind_wheel(self.reason_frame)
+            self.view.bind_wheel(self.reason)
+        self.reason_frame.grid(row=0, column=2, rowspan=2, sticky='ew', padx=5)
+
+    def bind(self, check, y):
+        """Show check at canvas height y"""
+        values = self.view.values[check['check_name']]
+        self.name = check['check_name']
+        self.check.config(text=self.name)
+        self.category_label.config(text=check.get('category') or '')
+        self.var.set(1 if values['ok'] else 0)
+        self.notes.delete('1.0', tk.END)
+        self.notes.insert('1.0', values['notes'])
+        if values['ok']:
+            if self.reason_frame is not None:
+                self.reason_frame.grid_remove()
+        else:
+            self.ensure_reason()
+            self.reason.delete('1.0', tk.END)
+            self.reason.insert('1.0', values['reason'])
+        self.y = y
+        self.view.canvas.coords(self.window, 0, y)
+        self.view.canvas.itemconfigure(self.window, height=self.view.ROW_HEIGHT, state='normal')
+
+    def unbind(self):
+        self.name = None
+        self.view.canvas.itemconfigure(self.window, state='hidden')
+
+    def flush(self):
+        """Copy the text typed into this row back into the view's values"""
+        values = self.view.values.get(self.name)
+        if values is None:
+            return
+        values['notes'] = self.notes.get('1.0', 'end-1c')
+        if not values['ok'] and self.reason is not None:
+            values['reason'] = self.reason.get('1.0', 'end-1c')
+
+    def toggled(self):
+        self.flush()
+        values = self.view.values[self.name]
+        values['ok'] = self.var.get() == 1
+        if values['ok']:
+            if self.reason_frame is not None:
+                self.reason_frame.grid_remove()
+        else:
+            self.ensure_reason()
+            self.reason.delete('1.0', tk.END)
+            self.reason.insert('1.0', values['reason'])
+            self.reason.focus_set()
+
+
+class CheckListView:
+    """Scrolling health check form that only has widgets for the rows on screen.
+
+    The state of every check lives in self.values ({check_name: {ok,
+    reason, notes}}); a small pool of CheckRow widgets is re-bound to the
+    visible slice on every scroll, so hundreds of checks cost no more to
+    build than a screenful. Reason editors are created when a row first
+    shows a NOT OK check.
+    """
+    ROW_HEIGHT = 78
+
+    def __init__(self, parent):
+        self.canvas = tk.Canvas(parent, bg='#f0f8ff', highlightthickness=0, yscrollincrement=self.ROW_HEIGHT)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        # Catalog checks, the ones passing the category filter and their form values
+        self.checks = []
+        self.shown = []
+        self.category = None
+        self.values = {}
+        self.rows = []
+        self.canvas.bind('<Configure>', lambda e: self.layout())
+        self.bind_wheel(self.canvas)
+
+    def bind_wheel(self, widget):
+        """Scroll the list with the mouse wheel over widget (instead of, for Text, the widget itself)"""
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            widget.bind(sequence, self.on_wheel)
+
+    def on_wheel(self, event):
+        step = -1 if event.num == 4 or event.delta > 0 else 1
+        self.yview('scroll', step * 3, 'units')
+        return "break"
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.layout()
+
+    @staticmethod
+    def blank():
+        return {'ok': True, 'reason': '', 'notes': ''}
+
+    def set_checks(self, checks):
+        """Show a new catalog, keeping the values already entered for checks that remain in it"""
+        self.flush()
+        self.checks = list(checks)
+        self.values = {c['check_name']: self.values.get(c['check_name']) or self.blank() for c in self.checks}
+        self.set_category(self.category if self.category in self.categories() else None)
+
+    def categories(self):
+        return sorted({c.get('category') or '' for c in self.checks})
+
+    def set_category(self, category):
+        """Show only the checks of category (all checks if None)"""
+        self.flush()
+        self.category = category
+        self.shown = [c for c in self.checks if category is None or (c.get('category') or '') == category]
+        self.canvas.configure(scrollregion=(0, 0, 0, len(self.shown) * self.ROW_HEIGHT))
+        self.canvas.yview_moveto(0)
+        self.layout()
+
+    def layout(self):
+        """Bind the pooled rows to the checks currently scrolled into view"""
+        height = max(self.canvas.winfo_height(), self.ROW_HEIGHT)
+        width = self.canvas.winfo_width()
+        first = int(self.canvas.canvasy(0) // self.ROW_HEIGHT)
+        needed = min(height // self.ROW_HEIGHT + 2, len(self.shown))
+        while len(self.rows) < needed:
+            self.rows.append(CheckRow(self))
+        # Save what was typed before any row moves to another check
+        self.flush()
+        for i, row in enumerate(self.rows):
+            index = first + i
+            if i < needed and index < len(self.shown):
+                check = self.shown[index]
+                if row.name != check['check_name'] or row.y != index * self.ROW_HEIGHT:
+                    row.bind(check, index * self.ROW_HEIGHT)
+                self.canvas.itemconfigure(row.window, width=width)
+            elif row.name is not None:
+                row.unbind()
+
+    def flush(self):
+        for row in self.rows:
+            row.flush()
+
+    def redraw(self):
+        """Re-bind every row from self.values, dropping what the widgets show"""
+        for row in self.rows:
+            row.name = None
+        self.layout()
+
+    def set_rows(self, rows):
+        """Fill in {check_name: (status, reason, notes)}; checks not loaded yet keep them for when they are"""
+        self.flush()
+        for name, (status, reason, notes) in rows.items():
+            self.values[name] = {'ok': status == 'OK', 'reason': reason or '', 'notes': notes or ''}
+        self.redraw()
+
+    def reset(self):
+        """Every check back to OK with no reason or notes"""
+        self.values = {name: self.blank() for name in self.values}
+        self.redraw()
+
+    def read_rows(self):
+        """{check_name: (status, reason, notes)} of every catalog check, filtered out or not"""
+        self.flush()
+        return {
+            c['check_name']: (
+                "OK" if self.values[c['check_name']]['ok'] else "NOT OK",
+                None if self.values[c['check_name']]['ok'] else self.values[c['check_name']]['reason'].strip(),
+                self.values[c['check_name']]['notes'].strip()
+            )
+            for c in self.checks
+        }
+
+    def show(self, name):
+        """Scroll check name into view, clearing the category filter if it hides it"""
+        if not any(c['check_name'] == name for c in self.shown):
+            self.set_category(None)
+        index = next((i for i, c in enumerate(self.shown) if c['check_name'] == name), 0)
+        self.yview('moveto', index / max(len(self.shown), 1))
+
+
 class HealthCheckApp:
-    def ensure_maintenance_table(self):
-        """Ensure the maintenance_interventions table exists."""
-        try:
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS maintenance_interventions (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    date DATE NOT NULL,
-                    description TEXT NOT NULL,
-                    performed_by VARCHAR(64) NOT NULL
-                )
-            """)
-            conn.commit()
-            cursor.close()
-            conn.close()
-        except Exception:
-            pass
+    # Sidebar tab indices, in create_widgets order
+    TAB_CHECK_FORM, TAB_VIEW_TABLES, TAB_REPORTS, TAB_MAINTENANCE, TAB_DASHBOARD = range(5)
 
     def create_maintenance_tab(self, parent=None):
         """Create the Maintenance Interventions tab UI."""
@@ -193,15 +559,14 @@ class HealthCheckApp:
                 messagebox.showwarning("Missing Data", "Please fill all fields.", parent=self.root)
                 return
             try:
-                conn = mysql.connector.connect(**self.db_config)
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO maintenance_interventions (date, description, performed_by)
-                    VALUES (%s, %s, %s)
-                """, (date_val, desc_val, by_val))
-                conn.commit()
-                cursor.close()
-                conn.close()
+                with self.db_pool.get_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("""
+                        INSERT INTO maintenance_interventions (date, description, performed_by)
+                        VALUES (%s, %s, %s)
+                    """, (date_val, desc_val, by_val))
+                    conn.commit()
+                    cursor.close()
                 messagebox.showinfo("Success", "Intervention added.", parent=self.root)
                 date_entry.delete(0, tk.END)
                 date_entry.insert(0, datetime.now().strftime('%Y-%m-%d'))
@@ -233,31 +598,30 @@ class HealthCheckApp:
             if not messagebox.askyesno("Confirm", "Delete selected intervention?", parent=self.root):
                 return
             try:
-                conn = mysql.connector.connect(**self.db_config)
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM maintenance_interventions WHERE id=%s", (iid,))
-                conn.commit()
-                cursor.close()
-                conn.close()
+                with self.db_pool.get_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("DELETE FROM maintenance_interventions WHERE id=%s", (iid,))
+                    conn.commit()
+                    cursor.close()
                 refresh_table()
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete: {e}", parent=self.root)
         del_btn = ttk.Button(main_frame, text="Delete Selected", style='Clear.TButton', command=delete_selected)
         del_btn.pack(pady=8, anchor='e')
 
-        def refresh_table():
-            for row in tree.get_children():
-                tree.delete(row)
-            try:
-                conn = mysql.connector.connect(**self.db_config)
+        def fetch_rows():
+            with self.db_pool.get_connection() as conn:
                 cursor = conn.cursor(dictionary=True)
                 cursor.execute("SELECT * FROM maintenance_interventions ORDER BY date DESC, id DESC")
-                for row in cursor.fetchall():
-                    tree.insert('', tk.END, values=(row['id'], row['date'], row['description'], row['performed_by']))
+                rows = cursor.fetchall()
                 cursor.close()
-                conn.close()
-            except Exception as e:
-                pass
+            return rows
+        def show_rows(rows):
+            tree.delete(*tree.get_children())
+            for row in rows:
+                tree.insert('', tk.END, values=(row['id'], row['date'], row['description'], row['performed_by']))
+        def refresh_table():
+            self.db_worker.submit(lambda job: fetch_rows(), show_rows)
         refresh_table()
         return tab
     def get_email_sender_info_path(self):
@@ -277,108 +641,110 @@ class HealthCheckApp:
                 return json.load(f)
         except Exception:
             return {}
-    def delete_selected_table(self):
-        """Delete the selected health check table from the database."""
+    def get_selected_day(self):
+        """Return the date of the day selected in the View Tables list, or None."""
         selected_item = self.tables_tree.selection()
         if not selected_item:
-            messagebox.showwarning("No Selection", "Please select a table to delete", parent=self.root)
-            return
-        table_name = self.tables_tree.item(selected_item)['values'][0]
-        if not table_name.startswith('health_check_'):
-            messagebox.showwarning("Invalid Table", "You can only delete health check tables.", parent=self.root)
+            return None
+        return datetime.strptime(str(self.tables_tree.item(selected_item)['values'][0]), '%Y-%m-%d').date()
+
+    def delete_selected_table(self):
+        """Delete all health check results of the selected day from the database."""
+        day = self.get_selected_day()
+        if not day:
+            messagebox.showwarning("No Selection", "Please select a day to delete", parent=self.root)
             return
         if not messagebox.askyesno(
             "Confirm Delete",
-            f"Are you sure you want to delete table '{table_name}'? This cannot be undone.",
+            f"Are you sure you want to delete all health checks of {day:%Y-%m-%d}? This cannot be undone.",
             parent=self.root
         ):
             return
-        try:
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor()
-            cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-            conn.commit()
-            cursor.close()
-            conn.close()
-            messagebox.showinfo("Delete Successful", f"Table '{table_name}' has been deleted.", parent=self.root)
+
+        def delete(job):
+            with self.db_pool.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"DELETE FROM {RESULTS_TABLE} WHERE check_date = %s", (day,))
+                cursor.execute(f"DELETE FROM {SUMMARY_TABLE} WHERE check_date = %s", (day,))
+                conn.commit()
+                cursor.close()
+
+        def deleted(_):
+            self.day_catalog.discard(day)
+            if day == self.current_day:
+                self.saved_form_rows = {}
+            self.problem_cache.invalidate(day)
+            messagebox.showinfo("Delete Successful", f"Health checks of {day:%Y-%m-%d} have been deleted.", parent=self.root)
             self.refresh_tables_list()
             if hasattr(self, 'update_dashboard'):
                 self.update_dashboard()
-        except Exception as e:
-            messagebox.showerror("Delete Failed", f"Error deleting table: {e}", parent=self.root)
+
+        def failed(e):
+            messagebox.showerror("Delete Failed", f"Error deleting day: {e}", parent=self.root)
+
+        self.db_worker.submit(delete, deleted, on_error=failed)
+
     def copy_yesterday_to_today(self):
-        """Copy yesterday's health check table to today's table (structure and data), and fill the form with yesterday's values."""
+        """Copy yesterday's health check results to today, and fill the form with yesterday's values."""
         from datetime import datetime, timedelta
-        try:
-            today = datetime.now().date()
-            yesterday = today - timedelta(days=1)
-            today_table = f"health_check_{today.strftime('%Y%m%d')}"
-            yesterday_table = f"health_check_{yesterday.strftime('%Y%m%d')}"
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor()
-            # Check if yesterday's table exists
-            cursor.execute(f"SHOW TABLES LIKE '{yesterday_table}'")
-            if not cursor.fetchone():
-                messagebox.showwarning("Table Not Found", f"Yesterday's table ({yesterday_table}) does not exist.", parent=self.root)
-                cursor.close()
-                conn.close()
-                return
-            # Check if today's table already exists
-            cursor.execute(f"SHOW TABLES LIKE '{today_table}'")
-            if cursor.fetchone():
-                messagebox.showwarning("Table Exists", f"Today's table ({today_table}) already exists.", parent=self.root)
+        today = datetime.now().date()
+        yesterday = today - timedelta(days=1)
+        # Check if yesterday has results and today does not
+        if yesterday not in self.day_catalog:
+            messagebox.showwarning("Day Not Found", f"Yesterday's health checks ({yesterday:%Y-%m-%d}) do not exist.", parent=self.root)
+            return
+        if today in self.day_catalog:
+            messagebox.showwarning("Day Exists", f"Today's health checks ({today:%Y-%m-%d}) already exist.", parent=self.root)
+            return
+
+        def copy(job):
+            with self.db_pool.get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                # Fetch yesterday's data for the form
+                cursor.execute(f"SELECT * FROM {RESULTS_TABLE} WHERE check_date = %s", (yesterday,))
+                yesterday_data = {row['check_name']: row for row in cursor.fetchall()}
+                # Copy data server-side
+                cursor.execute(f"""
+                    INSERT INTO {RESULTS_TABLE} (check_date, check_name, status, reason, notes, username)
+                    SELECT %s, check_name, status, reason, notes, username FROM {RESULTS_TABLE} WHERE check_date = %s
+                """, (today, yesterday))
+                rebuild_daily_summary(cursor, today)
+                conn.commit()
                 cursor.close()
-                conn.close()
-                return
-            # Copy structure
-            cursor.execute(f"CREATE TABLE {today_table} LIKE {yesterday_table}")
-            # Copy data
-            cursor.execute(f"INSERT INTO {today_table} SELECT * FROM {yesterday_table}")
-            conn.commit()
-            # Now fetch yesterday's data to fill the form
-            cursor.close()
-            conn.close()
-            # Fetch yesterday's data for the form
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(f"SELECT * FROM {yesterday_table}")
-            yesterday_data = {row['check_name']: row for row in cursor.fetchall()}
-            cursor.close()
-            conn.close()
-            # Fill the form fields
-            for i, label in enumerate(self.check_labels):
-                row = yesterday_data.get(label)
-                if row:
-                    status = row.get('status', 'OK')
-                    self.check_vars[i].set(1 if status == 'OK' else 0)
-                    # Show/hide reason box as needed
-                    self.toggle_reason(self.check_vars[i], i)
-                    if status == 'NOT OK':
-                        self.reason_entries[i].delete('1.0', tk.END)
-                        self.reason_entries[i].insert('1.0', row.get('reason', ''))
-                    else:
-                        self.reason_entries[i].delete('1.0', tk.END)
-                    self.notes_entries[i].delete('1.0', tk.END)
-                    self.notes_entries[i].insert('1.0', row.get('notes', ''))
-                else:
-                    self.check_vars[i].set(1)
-                    self.toggle_reason(self.check_vars[i], i)
-                    self.reason_entries[i].delete('1.0', tk.END)
-                    self.notes_entries[i].delete('1.0', tk.END)
-            messagebox.showinfo("Copy Successful", f"Copied {yesterday_table} to {today_table} and filled the form with yesterday's data.", parent=self.root)
-            # Refresh tables list and dashboard
-            self.refresh_tables_list()
-            if hasattr(self, 'update_dashboard'):
-                self.update_dashboard()
-        except Exception as e:
-            messagebox.showerror("Copy Failed", f"Error copying table: {e}", parent=self.root)
+            return yesterday_data
+
+        def failed(e):
+            messagebox.showerror("Copy Failed", f"Error copying day: {e}", parent=self.root)
+
+        self.db_worker.submit(copy, lambda data: self.on_yesterday_copied(today, yesterday, data), on_error=failed)
+
+    def on_yesterday_copied(self, today, yesterday, yesterday_data):
+        """Update the catalog and fill the form once copy_yesterday_to_today's rows are saved"""
+        self.day_catalog.add(today)
+        self.problem_cache.invalidate(today)
+        # Fill the form fields
+        self.ensure_tab(self.TAB_CHECK_FORM)
+        copied_rows = {
+            name: (row['status'], (row['reason'] or '').strip() if row['status'] == 'NOT OK' else None,
+                   (row['notes'] or '').strip())
+            for name, row in yesterday_data.items()
+        }
+        self.check_list.reset()
+        self.check_list.set_rows(copied_rows)
+        # The copied rows are now today's saved state
+        self.saved_form_rows = copied_rows
+        self.day_table_label.config(text=f"Today's checks: {today:%Y-%m-%d}")
+        messagebox.showinfo("Copy Successful", f"Copied {yesterday:%Y-%m-%d} to {today:%Y-%m-%d} and filled the form with yesterday's data.", parent=self.root)
+        # Refresh tables list and dashboard
+        self.refresh_tables_list()
+        if hasattr(self, 'update_dashboard'):
+            self.update_dashboard()
     def export_report_pdf(self):
-        report_text = self.report_text.get(1.0, tk.END)
-        if not report_text.strip():
+        report = self.current_report
+        if report is None:
             messagebox.showwarning("Empty Report", "There is no report to export.")
             return
-        first_line = report_text.split('\n')[0]
-        safe_filename = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in first_line)
+        safe_filename = report.file_stem()
         file_path = filedialog.asksaveasfilename(
             initialdir=self.export_dir,
             initialfile=f"{safe_filename}.pdf",
@@ -388,69 +754,7 @@ class HealthCheckApp:
         if not file_path:
             return
         try:
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_auto_page_break(auto=True, margin=15)
-
-            # Modern Title
-            lines = report_text.splitlines()
-            if lines:
-                pdf.set_font("Arial", 'B', 18)
-                pdf.set_text_color(33, 150, 243)  # Blue
-                pdf.cell(0, 14, lines[0], ln=1, align='C')
-                pdf.set_draw_color(33, 150, 243)
-                pdf.set_line_width(1)
-                pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-                pdf.ln(6)
-                start_idx = 1
-            else:
-                start_idx = 0
-
-            pdf.set_font("Arial", size=12)
-            pdf.set_text_color(44, 62, 80)  # Dark text
-
-            # Section headers and content
-            for idx, line in enumerate(lines[start_idx:]):
-                # Section headers
-                if line.strip().endswith(":"):
-                    pdf.ln(2)
-                    pdf.set_font("Arial", 'B', 13)
-                    pdf.set_text_color(33, 150, 243)
-                    pdf.cell(0, 10, line.strip(), ln=1)
-                    pdf.set_font("Arial", size=12)
-                    pdf.set_text_color(44, 62, 80)
-                # Summary or separator
-                elif line.strip().startswith("SUMMARY") or (set(line.strip()) == {'-'} and len(line.strip()) > 5):
-                    pdf.ln(2)
-                    pdf.set_font("Arial", 'B', 12)
-                    pdf.set_text_color(76, 175, 80)  # Green
-                    pdf.cell(0, 8, line.strip(), ln=1)
-                    pdf.set_font("Arial", size=12)
-                    pdf.set_text_color(44, 62, 80)
-                # Highlight OK/Failed
-                elif "Passed:" in line or "Failed:" in line or "Success rate:" in line:
-                    if "Passed:" in line:
-                        pdf.set_text_color(76, 175, 80)  # Green
-                    elif "Failed:" in line:
-                        pdf.set_text_color(244, 67, 54)  # Red
-                    elif "Success rate:" in line:
-                        pdf.set_text_color(33, 150, 243)  # Blue
-                    pdf.cell(0, 8, line.strip(), ln=1)
-                    pdf.set_text_color(44, 62, 80)
-                # Table header
-                elif ("Check Name" in line and "Status" in line) or ("Check Name" in line and "Passed" in line):
-                    pdf.ln(2)
-                    pdf.set_font("Arial", 'B', 12)
-                    pdf.set_fill_color(224, 247, 250)
-                    pdf.cell(0, 8, line.strip(), ln=1, fill=True)
-                    pdf.set_font("Arial", size=12)
-                # Table row
-                elif line.strip() and not line.strip().startswith("="):
-                    pdf.cell(0, 8, line, ln=1)
-                else:
-                    pdf.ln(2)
-
-            pdf.output(file_path)
+            report.write('pdf', file_path)
             messagebox.showinfo(
                 "Export Successful",
                 f"PDF report exported to:\n{file_path}",
@@ -462,43 +766,25 @@ class HealthCheckApp:
                 f"Error exporting PDF report:\n{str(e)}",
                 parent=self.root
             )
-    def ensure_username_column(self):
-        """Add username column to all health_check tables if missing."""
-        try:
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor()
-            cursor.execute("SHOW TABLES")
-            tables = [row[0] for row in cursor.fetchall() if row[0].startswith('health_check_')]
-            for table in tables:
-                cursor.execute(f"SHOW COLUMNS FROM {table} LIKE 'username'")
-                if not cursor.fetchone():
-                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN username VARCHAR(50) AFTER notes")
-            conn.commit()
-            cursor.close()
-            conn.close()
-        except Exception as e:
-            print(f"[ERROR] Could not ensure username column: {e}")
-    def __init__(self, root, username=None):
+    def __init__(self, root, username=None, db_config=None, export_dir=None, api_port=None):
         self.root = root
         self.root.title("System Health Monitor")
         self.root.geometry("1280x960")
         # Modern light blue/white theme
+        timer = StartupTimer()
         self.style = ttk.Style()
         self.style.theme_use('clam')
         self.configure_modern_styles()
         # Database configuration
-        self.db_config = {
-            'host': 'localhost',
-            'user': 'root',
-            'password': '123456',
-            'database': 'health_checks_db'
-        }
+        self.db_config = db_config or dict(DEFAULT_DB_CONFIG)
+        # Shared connection pool used by every database call in the app
+        self.db_pool = get_db_pool(self.db_config)
 
         # Store logged-in username (if any)
         self.username = username
 
         # Default export directory
-        self.export_dir = r"C:\Users\ROG\Documents\dates"
+        self.export_dir = export_dir or DEFAULT_EXPORT_DIR
         os.makedirs(self.export_dir, exist_ok=True)
 
         # Zabbix config file path
@@ -506,18 +792,106 @@ class HealthCheckApp:
 
         # Load Zabbix configuration
         self.zabbix_config = self.load_zabbix_config()
-        self.zabbix_data = None
-
-        # Current day table name
-        self.current_day_table = None
+        # Zabbix API client, kept across fetches for connection and token reuse
+        self.zabbix_client = None
+        self.zabbix_client_settings = None
+
+        # Day the health check form currently writes to
+        self.current_day = datetime.now().date()
+        # Form rows as last saved for current_day, {check_name: (status, reason, notes)}
+        self.saved_form_rows = {}
+        # In-memory set of the days that have results
+        self.day_catalog = DayCatalog(self.db_pool)
+        # Problem days per month for the dashboard calendar
+        self.problem_cache = MonthProblemCache(self.db_pool, self.day_catalog)
+        # Every polled Zabbix reading, with daily min/max/avg for past periods
+        self.reading_store = ReadingStore(self.db_pool)
+        # Runs the database work of UI callbacks off the Tk thread
+        self.db_worker = DBWorker(self.root)
+        # Latest Zabbix reading, shared by the Health Check tab, the dashboard and reports
+        self.zabbix_snapshot = ZabbixSnapshot(self.fetch_zabbix_reading, self.db_worker.call_soon)
+        self.zabbix_snapshot.subscribe(self.on_zabbix_reading)
+        # Pending automatic Zabbix refresh and the failed refreshes in a row
+        self.zabbix_refresh_after = None
+        self.zabbix_failures = 0
+        # Report currently being generated, if any, and the Report shown on the Reports tab
+        self.report_job = None
+        self.current_report = None
+        # Embedded ingestion API (started with api_port) and its pending view refresh
+        self.ingest_server = None
+        self.ingest_refresh_after = None
+        self.ingested_days = set()
 
         self.initialize_database()
-        self.ensure_username_column()
-        self.ensure_maintenance_table()
-        self.check_for_existing_day_table()
+        timer.mark("db bootstrap")
+        # Load the day catalog in the background; anything that needs it first loads it on demand
+        self.refresh_day_catalog(reschedule=False)
+        self.prune_readings()
         self.create_widgets()
+        timer.mark("widgets")
         self.update_zabbix_data()
         self.update_clock()
+        self.root.after(DAY_CATALOG_REFRESH_MS, self.refresh_day_catalog)
+        if api_port:
+            self.start_ingest_api(api_port)
+        self.report_startup_time(timer, "Main window ready")
+
+    def report_startup_time(self, timer, what):
+        """Report timer once Tk has drawn the window (idle callbacks run after the first paint)."""
+        def report():
+            timer.mark("first paint")
+            timer.report(what)
+        self.root.after_idle(report)
+
+    @property
+    def zabbix_data(self):
+        """The cached Zabbix reading (None until the first fetch completes)"""
+        return self.zabbix_snapshot.get()
+
+    def run_in_background(self, work, on_done, on_error=None):
+        """Run work() on its own daemon thread and hand its result to on_done on the Tk thread.
+
+        For slow network calls that should not occupy a database worker;
+        database work goes through self.db_worker.
+        """
+        def run():
+            try:
+                result = work()
+            except Exception as e:
+                if on_error:
+                    self.db_worker.call_soon(on_error, e)
+                else:
+                    print(f"[ERROR] Background task failed: {e}")
+                return
+            self.db_worker.call_soon(on_done, result)
+        threading.Thread(target=run, daemon=True).start()
+
+    def prune_readings(self):
+        """Drop raw Zabbix readings past the retention window in the background (daily values are kept)."""
+        def pruned(deleted):
+            if deleted:
+                print(f"[INFO] Pruned {deleted} raw readings from {READINGS_TABLE}")
+        self.db_worker.submit(
+            lambda job: self.reading_store.prune(),
+            pruned,
+            on_error=lambda e: print(f"[ERROR] Pruning readings failed: {e}")
+        )
+
+    def refresh_day_catalog(self, reschedule=True):
+        """Re-read the day catalog in the background to pick up other instances' writes."""
+        def refreshed(changed):
+            # Repaint the calendar if another instance changed the data
+            if changed:
+                self.problem_cache.invalidate()
+                if hasattr(self, 'dash_calendar'):
+                    self.update_dashboard_calendar()
+        self.db_worker.submit(
+            lambda job: self.day_catalog.reload(),
+            refreshed,
+            on_error=lambda e: print(f"[ERROR] Day catalog refresh failed: {e}")
+        )
+        if reschedule:
+            self.root.after(DAY_CATALOG_REFRESH_MS, self.refresh_day_catalog)
 
     def configure_styles(self):
         # Use modern ttk style for a clean look
@@ -625,41 +999,12 @@ class HealthCheckApp:
         style.configure('TabSelected.TButton', background=accent, foreground='white', font=('Segoe UI', 12, 'bold'), borderwidth=0, relief='flat', padding=10)
 
     def initialize_database(self):
+        """Apply pending schema migrations (a no-op if the login window already did)."""
         try:
-            conn = mysql.connector.connect(
-                host=self.db_config['host'],
-                user=self.db_config['user'],
-                password=self.db_config['password']
-            )
-            cursor = conn.cursor()
-            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.db_config['database']}")
-            conn.commit()
-            conn.database = self.db_config['database']
-            cursor.close()
-            conn.close()
+            ensure_schema(self.db_config)
         except mysql.connector.Error as err:
             messagebox.showerror("Database Error", f"Error initializing database: {err}")
 
-    def check_for_existing_day_table(self):
-        """Check if there's already a table for today's date and set current_day_table"""
-        today = datetime.now().strftime("%Y%m%d")
-        self.current_day_table = f"health_check_{today}"
-
-        try:
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor()
-            cursor.execute(f"SHOW TABLES LIKE '{self.current_day_table}'")
-            result = cursor.fetchone()
-            cursor.close()
-            conn.close()
-
-            if result:
-                return True
-            return False
-        except mysql.connector.Error as err:
-            messagebox.showerror("Database Error", f"Error checking for existing table: {err}")
-            return False
-
     def create_widgets(self):
         # Main layout: sidebar + content
         main_frame = ttk.Frame(self.root, style='TFrame')
@@ -677,6 +1022,8 @@ class HealthCheckApp:
         # Tab buttons and frames
         self.tab_frames = {}
         self.tab_buttons = {}
+        self.tab_builders = {}
+        self.built_tabs = set()
         tab_defs = [
             ("🏥 Health Check", self.create_check_form_tab),
             ("📋 View Tables", self.create_view_tables_tab),
@@ -693,15 +1040,27 @@ class HealthCheckApp:
             )
             btn.pack(fill=tk.X, pady=6, padx=12, ipadx=8, ipady=8)
             self.tab_buttons[i] = btn
-            # Create tab frame but don't pack yet
-            frame = ttk.Frame(self.content_frame, style='TFrame')
-            self.tab_frames[i] = frame
-            # Call the tab creation function with the frame as parent
-            create_func(parent=frame)
-        # Select the dashboard tab (index 4) by default
-        self.select_tab(4)
+            # Create an empty tab frame; its widgets are built the first time it is shown
+            self.tab_frames[i] = ttk.Frame(self.content_frame, style='TFrame')
+            self.tab_builders[i] = create_func
+        diagnostics_btn = ttk.Button(sidebar, text="⏱ Diagnostics", style='Tab.TButton',
+                                     command=self.open_diagnostics_dialog)
+        diagnostics_btn.pack(side=tk.BOTTOM, fill=tk.X, pady=6, padx=12, ipadx=8, ipady=8)
+        ToolTip(diagnostics_btn, "Timings of database queries, Zabbix calls, PDF/e-mail and UI actions")
+        # Select the dashboard tab by default
+        self.select_tab(self.TAB_DASHBOARD)
+
+    def tab_built(self, idx):
+        return idx in self.built_tabs
+
+    def ensure_tab(self, idx):
+        """Build the widgets of a tab if that has not happened yet."""
+        if idx not in self.built_tabs:
+            self.built_tabs.add(idx)
+            self.tab_builders[idx](parent=self.tab_frames[idx])
 
     def select_tab(self, idx):
+        self.ensure_tab(idx)
         # Hide all frames
         for frame in self.tab_frames.values():
             frame.pack_forget()
@@ -716,6 +1075,33 @@ class HealthCheckApp:
                 btn.state(['!pressed'])
                 btn.configure(style='Tab.TButton')
 
+    # Category filter entry that shows every check
+    ALL_CATEGORIES = "All categories"
+
+    def load_check_catalog(self):
+        """Load the active checks into the form in the background"""
+        self.db_worker.submit(
+            lambda job: fetch_check_catalog(self.db_pool),
+            self.show_check_catalog,
+            on_error=lambda err: print(f"[ERROR] Loading the check catalog failed: {err}")
+        )
+
+    def show_check_catalog(self, checks):
+        self.check_list.set_checks(checks)
+        self.check_category['values'] = [self.ALL_CATEGORIES] + self.check_list.categories()
+        if self.check_list.category is None:
+            self.check_category.set(self.ALL_CATEGORIES)
+        self.update_check_count()
+
+    def filter_checks(self):
+        category = self.check_category.get()
+        self.check_list.set_category(None if category == self.ALL_CATEGORIES else category)
+        self.update_check_count()
+
+    def update_check_count(self):
+        shown, total = len(self.check_list.shown), len(self.check_list.checks)
+        self.check_count_label.config(text=f"{total} checks" if shown == total else f"{shown} of {total} checks")
+
     def create_check_form_tab(self, parent=None):
         tab1 = parent or ttk.Frame(self.notebook, style='TFrame')
 
@@ -731,10 +1117,10 @@ class HealthCheckApp:
         self.clock_label = ttk.Label(header_frame, style='TLabel')
         self.clock_label.pack(side=tk.RIGHT)
 
-        # Current day table indicator
+        # Current day indicator
         self.day_table_label = ttk.Label(
             header_frame,
-            text=f"Today's table: {self.current_day_table if self.current_day_table else 'Not created yet'}",
+            text=f"Today's checks: {self.current_day:%Y-%m-%d}",
             style='TLabel'
         )
         self.day_table_label.pack(side=tk.RIGHT, padx=20)
@@ -743,114 +1129,36 @@ class HealthCheckApp:
         main_frame = ttk.Frame(tab1, style='TFrame')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
 
-        # Checkboxes frame with canvas and scrollbar
-        canvas = tk.Canvas(main_frame, bg='#f0f8ff', highlightthickness=0)
-        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
-        self.scrollable_frame = ttk.Frame(canvas, style='TFrame')
-
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(
-                scrollregion=canvas.bbox("all")
-            )
-        )
-
-        canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        # Checkbox labels
-        self.check_labels = [
-            "Verify Server Health",
-            "Assess Critical Application Performance",
-            "Validate Daily Backup",
-            "Check Data Center Temperature and Humidity",
-            "Check Data Center Air Conditioning",
-            "Verify UPS and Power Supply"
-        ]
-
-        self.check_vars = []
-        self.reason_entries = []
-        self.notes_entries = []
-
-        # Create checkboxes and reason text areas
-        for i, label_text in enumerate(self.check_labels):
-            # Item frame
-            item_frame = ttk.Frame(self.scrollable_frame, style='TFrame')
-            item_frame.pack(fill=tk.X, pady=8)
-
-            # Checkbox with custom style
-            var = tk.IntVar(value=1)
-            self.check_vars.append(var)
-            check = ttk.Checkbutton(
-                item_frame,
-                text=label_text,
-                variable=var,
-                style='Check.TCheckbutton',
-                command=lambda v=var, i=i: self.toggle_reason(v, i)
-            )
-            check.pack(anchor=tk.W)
-
-            # Reason frame (hidden by default)
-            reason_frame = ttk.Frame(item_frame, style='TFrame')
-            reason_label = ttk.Label(reason_frame, text="Reason for issue:", style='TLabel')
-            reason_label.pack(anchor=tk.W)
-            reason_text = tk.Text(
-                reason_frame,
-                height=3,
-                width=60,
-                bg='white',
-                fg='#2c3e50',
-                font=('Segoe UI', 9),
-                padx=5,
-                pady=5,
-                highlightbackground='#bdc3c7',
-                highlightthickness=1
-            )
-            reason_text.pack(fill=tk.X)
-            self.reason_entries.append(reason_text)
-
-            # Notes frame (always visible)
-            notes_frame = ttk.Frame(item_frame, style='TFrame')
-            notes_label = ttk.Label(notes_frame, text="Additional notes:", style='TLabel')
-            notes_label.pack(anchor=tk.W)
-            notes_text = tk.Text(
-                notes_frame,
-                height=2,
-                width=60,
-                bg='white',
-                fg='#2c3e50',
-                font=('Segoe UI', 9),
-                padx=5,
-                pady=5,
-                highlightbackground='#bdc3c7',
-                highlightthickness=1
-            )
-            notes_text.pack(fill=tk.X)
-            self.notes_entries.append(notes_text)
-
-            notes_frame.pack(fill=tk.X, pady=(5, 0))
-            reason_frame.pack_forget()  # Initially hidden
-
-            # Separator
-            if i < len(self.check_labels) - 1:
-                ttk.Separator(item_frame, orient='horizontal').pack(fill=tk.X, pady=5)
+        # Category filter over the check catalog
+        filter_frame = ttk.Frame(main_frame, style='TFrame')
+        filter_frame.pack(fill=tk.X, pady=(0, 8))
+        ttk.Label(filter_frame, text="Category:", style='TLabel').pack(side=tk.LEFT)
+        self.check_category = ttk.Combobox(filter_frame, state='readonly', width=30, values=[self.ALL_CATEGORIES])
+        self.check_category.set(self.ALL_CATEGORIES)
+        self.check_category.pack(side=tk.LEFT, padx=8)
+        self.check_category.bind('<<ComboboxSelected>>', lambda e: self.filter_checks())
+        self.check_count_label = ttk.Label(filter_frame, text="Loading checks...", style='TLabel')
+        self.check_count_label.pack(side=tk.LEFT, padx=8)
+
+        # Checks come from the catalog table; only the rows on screen get widgets
+        list_frame = ttk.Frame(main_frame, style='TFrame')
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        self.check_list = CheckListView(list_frame)
+        self.load_check_catalog()
 
         # Button frame at bottom
         button_frame = ttk.Frame(tab1, style='TFrame')
         button_frame.pack(side=tk.BOTTOM, pady=20)
 
         # Submit button
-        submit_btn = ttk.Button(
+        self.submit_btn = ttk.Button(
             button_frame,
             text="Submit Health Check",
             style='Submit.TButton',
             command=self.on_submit
         )
-        submit_btn.pack(side=tk.LEFT, padx=10, ipadx=20, ipady=5)
-        ToolTip(submit_btn, "Submit the health check data for today.")
+        self.submit_btn.pack(side=tk.LEFT, padx=10, ipadx=20, ipady=5)
+        ToolTip(self.submit_btn, "Submit the health check data for today.")
 
         # Clear database button
         clear_btn = ttk.Button(
@@ -897,6 +1205,9 @@ class HealthCheckApp:
         self.zabbix_loading_label = ttk.Label(tab1, text="", style='TLabel', foreground='blue')
         self.zabbix_loading_label.pack(fill=tk.X, padx=20, pady=(0, 5))
 
+        # Show the reading fetched before this tab was first opened
+        self.show_zabbix_data()
+
     def create_view_tables_tab(self, parent=None):
         tab2 = parent or ttk.Frame(self.notebook, style='TFrame')
 
@@ -916,20 +1227,20 @@ class HealthCheckApp:
             style='Submit.TButton'
         )
         refresh_btn.pack(side=tk.RIGHT)
-        ToolTip(refresh_btn, "Refresh the list of saved health check tables.")
+        ToolTip(refresh_btn, "Refresh the list of saved health check days.")
 
         # Main content frame
         content_frame = ttk.Frame(tab2, style='TFrame')
         content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
 
-        # Treeview to display tables
-        self.tables_tree = ttk.Treeview(content_frame, columns=('name', 'records', 'date'), show='headings')
-        self.tables_tree.heading('name', text='Table Name')
-        self.tables_tree.heading('records', text='Records Count')
+        # Treeview to display saved days
+        self.tables_tree = ttk.Treeview(content_frame, columns=('date', 'records', 'updated'), show='headings')
         self.tables_tree.heading('date', text='Date')
-        self.tables_tree.column('name', width=200)
-        self.tables_tree.column('records', width=100, anchor='center')
+        self.tables_tree.heading('records', text='Records Count')
+        self.tables_tree.heading('updated', text='Last Updated')
         self.tables_tree.column('date', width=150, anchor='center')
+        self.tables_tree.column('records', width=100, anchor='center')
+        self.tables_tree.column('updated', width=200, anchor='center')
 
         # Scrollbar
         scrollbar = ttk.Scrollbar(content_frame, orient="vertical", command=self.tables_tree.yview)
@@ -951,7 +1262,7 @@ class HealthCheckApp:
             command=self.export_to_csv
         )
         export_btn.pack(side=tk.LEFT, padx=5, ipadx=10, ipady=3)
-        ToolTip(export_btn, "Export the selected table data to a CSV file.")
+        ToolTip(export_btn, "Export the selected day's data to a CSV file.")
 
         # Copy yesterday to today button
         copy_btn = ttk.Button(
@@ -961,24 +1272,25 @@ class HealthCheckApp:
             command=self.copy_yesterday_to_today
         )
         copy_btn.pack(side=tk.LEFT, padx=5, ipadx=10, ipady=3)
-        ToolTip(copy_btn, "Copy yesterday's health check table as today's table (structure and data). Useful if checks are the same.")
+        ToolTip(copy_btn, "Copy yesterday's health check results as today's results. Useful if checks are the same.")
 
         # Delete selected table button
         delete_btn = ttk.Button(
             btn_frame,
-            text="Delete Selected Table",
+            text="Delete Selected Day",
             style='Clear.TButton',
             command=self.delete_selected_table
         )
         delete_btn.pack(side=tk.LEFT, padx=5, ipadx=10, ipady=3)
-        ToolTip(delete_btn, "Delete the selected health check table from the database.")
+        ToolTip(delete_btn, "Delete the selected day's health checks from the database.")
 
-        # Load tables initially
+        # Load days initially
         self.refresh_tables_list()
 
     def create_reports_tab(self, parent=None):
         """Create the reports tab with date selection options"""
         tab3 = parent or ttk.Frame(self.notebook, style='TFrame')
+        from tkcalendar import DateEntry
 
         # Header frame
         header_frame = ttk.Frame(tab3, style='TFrame')
@@ -1111,6 +1423,20 @@ class HealthCheckApp:
         generate_btn.grid(row=5, column=0, columnspan=2, pady=10, ipadx=10, ipady=5)
         ToolTip(generate_btn, "Generate a report for the selected period.")
 
+        # Progress and cancel for long reports (shown while one is being generated)
+        self.report_progress = ttk.Progressbar(date_frame, mode='determinate', length=240)
+        self.report_progress.grid(row=6, column=0, columnspan=2, padx=10, pady=(0, 5), sticky='w')
+        self.report_progress.grid_remove()
+        self.cancel_report_btn = ttk.Button(
+            date_frame,
+            text="Cancel",
+            style='Clear.TButton',
+            command=self.cancel_report
+        )
+        self.cancel_report_btn.grid(row=6, column=1, padx=10, pady=(0, 5), sticky='e')
+        self.cancel_report_btn.grid_remove()
+        ToolTip(self.cancel_report_btn, "Stop generating the current report.")
+
         # Report display area
         self.report_text = tk.Text(
             content_frame,
@@ -1126,6 +1452,11 @@ class HealthCheckApp:
             highlightthickness=1
         )
         self.report_text.pack(fill=tk.BOTH, expand=True, pady=10)
+        self.report_text.tag_config('title', font=('Segoe UI', 14, 'bold'), justify='center')
+        self.report_text.tag_config('header', font=('Segoe UI', 10, 'bold'))
+        self.report_text.tag_config('ok', foreground='green')
+        self.report_text.tag_config('not_ok', foreground='red')
+        self.report_text.tag_config('reason', foreground='orange')
 
         # Export report buttons
         btn_frame = ttk.Frame(content_frame)
@@ -1170,7 +1501,7 @@ class HealthCheckApp:
         ToolTip(send_all_btn, "Send the displayed report to all registered users' emails.")
     def send_report_to_all_users(self):
         """Send the current report to all users' emails from the users table."""
-        if not self.report_text.get(1.0, tk.END).strip():
+        if self.current_report is None:
             messagebox.showwarning("Empty Report", "There is no report to send.", parent=self.root)
             return
         # Ask for sender SMTP info
@@ -1224,13 +1555,7 @@ class HealthCheckApp:
             })
             # Fetch all user emails from DB
             try:
-                import mysql.connector
-                conn = mysql.connector.connect(**self.db_config)
-                cursor = conn.cursor()
-                cursor.execute("SELECT email FROM users WHERE email IS NOT NULL AND email != ''")
-                emails = [row[0] for row in cursor.fetchall() if row[0]]
-                cursor.close()
-                conn.close()
+                emails = fetch_user_emails(self.db_pool)
             except Exception as e:
                 status_label.config(text=f"DB error: {e}")
                 return
@@ -1256,7 +1581,7 @@ class HealthCheckApp:
         """Open a dialog to enter email and SMTP details, then send the report."""
         import tkinter as tk
         from tkinter import simpledialog
-        if not self.report_text.get(1.0, tk.END).strip():
+        if self.current_report is None:
             messagebox.showwarning("Empty Report", "There is no report to send.")
             return
         dialog = tk.Toplevel(self.root)
@@ -1331,101 +1656,17 @@ class HealthCheckApp:
     def send_report_via_email(self, to_emails, from_email, smtp_server, smtp_port, smtp_user, smtp_pass):
         """Send the current report as a PDF via SMTP email. to_emails can be a list of addresses."""
 
-        from email.mime.multipart import MIMEMultipart
-        from email.mime.application import MIMEApplication
-        from email.mime.text import MIMEText
         import tempfile
-        import smtplib
-        import os
 
         # Generate PDF with only check name, no column names or colors
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=True, margin=15)
-
-        report_text = self.report_text.get(1.0, tk.END)
-        lines = report_text.splitlines()
-        subject = lines[0] if lines and lines[0].strip() else "Health Check Report"
-        # Add title (bold, larger)
-        if lines:
-            pdf.set_font("Arial", 'B', 16)
-            pdf.cell(0, 12, lines[0], ln=1, align='C')
-            pdf.set_font("Arial", '', 12)
-            pdf.ln(2)
-            if len(lines) > 1 and lines[1].strip().startswith('='):
-                pdf.set_draw_color(100, 100, 100)
-                pdf.set_line_width(0.5)
-                pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-                pdf.ln(4)
-                start_idx = 2
-            else:
-                start_idx = 1
-        else:
-            start_idx = 0
-
-        in_table = False
-        for idx, line in enumerate(lines[start_idx:]):
-            stripped = line.strip()
-            # Section headers
-            if stripped.endswith(":") or stripped.endswith("SUMMARY:"):
-                pdf.ln(2)
-                pdf.set_font("Arial", 'B', 12)
-                pdf.cell(0, 9, line, ln=1)
-                pdf.set_font("Arial", '', 12)
-                pdf.ln(1)
-                in_table = False
-            # Table header (skip column names)
-            elif (stripped.startswith("Check Name") and "Status" in line and "Notes" in line) or (stripped.startswith("Check Name") and "Passed" in line):
-                in_table = True
-                continue
-            # Table row: just print the check name (first column)
-            elif in_table and stripped and not stripped.startswith("-") and not stripped.startswith("SUMMARY") and not stripped.startswith("Reason:") and not stripped.startswith("Last Failure"):
-                check_name_raw = line[:20].rstrip()
-                pdf.set_font("Arial", '', 12)
-                pdf.cell(0, 8, check_name_raw, ln=1)
-            # Reason line (skip)
-            elif in_table and stripped.startswith("Reason:"):
-                continue
-            # End of table
-            elif in_table and (stripped.startswith("-") or stripped == ""):
-                pdf.ln(2)
-                in_table = False
-            # Skip table header lines outside table (for extra safety)
-            elif (stripped.startswith("Check Name") and ("Status" in line or "Passed" in line)):
-                continue
-            # Other lines
-            elif stripped == "":
-                pdf.ln(2)
-            else:
-                pdf.set_font("Arial", '', 12)
-                pdf.multi_cell(0, 8, line, align='L')
-                pdf.ln(1)
-        # (Old unreachable code removed)
-
+        report = self.current_report
+        subject = report.title or "Health Check Report"
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_pdf:
-            pdf.output(tmp_pdf.name)
             pdf_path = tmp_pdf.name
-
-        # Compose email with PDF attachment
-        msg = MIMEMultipart()
-        msg['From'] = from_email
-        msg['To'] = ', '.join(to_emails) if isinstance(to_emails, list) else to_emails
-        msg['Subject'] = subject
-        msg.attach(MIMEText("Please find the attached health check report as a PDF.", 'plain', 'utf-8'))
-
-        with open(pdf_path, 'rb') as f:
-            part = MIMEApplication(f.read(), _subtype='pdf')
-            part.add_header('Content-Disposition', 'attachment', filename=f"{subject}.pdf")
-            msg.attach(part)
-
         try:
-            with smtplib.SMTP(smtp_server, int(smtp_port), timeout=15) as server:
-                server.starttls()
-                server.login(smtp_user, smtp_pass)
-                # If to_emails is a string, convert to list
-                if isinstance(to_emails, str):
-                    to_emails = [to_emails]
-                server.sendmail(from_email, to_emails, msg.as_string())
+            report.write_summary_pdf(pdf_path)
+            send_email(to_emails, subject, "Please find the attached health check report as a PDF.",
+                       [(pdf_path, f"{subject}.pdf")], from_email, smtp_server, smtp_port, smtp_user, smtp_pass)
         finally:
             if os.path.exists(pdf_path):
                 os.remove(pdf_path)
@@ -1456,54 +1697,37 @@ class HealthCheckApp:
             self.custom_range_frame.pack(fill=tk.X)
 
     def refresh_tables_list(self):
-        """Refresh the list of tables in the database"""
-        self.tables_tree.delete(*self.tables_tree.get_children())
-
-        try:
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor()
-
-            # Get all tables
-            cursor.execute("SHOW TABLES")
-            tables = [table[0] for table in cursor.fetchall() if table[0].startswith('health_check_')]
-
-            # Get record count for each table and extract date
-            for table in tables:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                count = cursor.fetchone()[0]
-
-                # Extract date from table name
-                try:
-                    date_str = table.split('_')[-1]
-                    date_obj = datetime.strptime(date_str, "%Y%m%d").date()
-                    formatted_date = date_obj.strftime("%Y-%m-%d")
-                except:
-                    formatted_date = "Unknown"
-
-                self.tables_tree.insert('', 'end', values=(table, count, formatted_date))
-
-            cursor.close()
-            conn.close()
+        """Reload the list of saved days in the background (no-op until the tab is built)"""
+        if not self.tab_built(self.TAB_VIEW_TABLES):
+            return
+        self.db_worker.submit(
+            lambda job: fetch_saved_days(self.db_pool),
+            self.show_saved_days,
+            on_error=lambda err: messagebox.showerror("Database Error", f"Error fetching saved days: {err}")
+        )
 
-        except mysql.connector.Error as err:
-            messagebox.showerror("Database Error", f"Error fetching tables: {err}")
+    def show_saved_days(self, days):
+        self.tables_tree.delete(*self.tables_tree.get_children())
+        for check_date, count, updated in days:
+            self.tables_tree.insert('', 'end', values=(
+                check_date.strftime("%Y-%m-%d"),
+                count,
+                updated.strftime("%Y-%m-%d %H:%M:%S") if updated else ''
+            ))
 
     def export_to_csv(self):
-        """Export selected table to CSV"""
-        selected_item = self.tables_tree.selection()
-        if not selected_item:
-            messagebox.showwarning("No Selection", "Please select a table to export")
+        """Export selected day to CSV"""
+        day = self.get_selected_day()
+        if not day:
+            messagebox.showwarning("No Selection", "Please select a day to export")
             return
 
-        table_name = self.tables_tree.item(selected_item)['values'][0]
-
-        # Default filename
-        default_filename = os.path.join(self.export_dir, f"{table_name}.csv")
+        export_name = f"health_check_{day:%Y%m%d}"
 
         # Let user choose location
         file_path = filedialog.asksaveasfilename(
             initialdir=self.export_dir,
-            initialfile=f"{table_name}.csv",
+            initialfile=f"{export_name}.csv",
             defaultextension=".csv",
             filetypes=[("CSV Files", "*.csv"), ("All Files", "*.*")]
         )
@@ -1511,13 +1735,17 @@ class HealthCheckApp:
         if not file_path:
             return  # User cancelled
 
-        try:
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor(dictionary=True)
+        def export(job):
+            with self.db_pool.get_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
 
-            # Get data from table
-            cursor.execute(f"SELECT * FROM {table_name}")
-            data = cursor.fetchall()
+                # Get the day's data
+                cursor.execute(f"""
+                    SELECT check_date, check_name, status, reason, notes, username, timestamp
+                    FROM {RESULTS_TABLE} WHERE check_date = %s ORDER BY check_name
+                """, (day,))
+                data = cursor.fetchall()
+                cursor.close()
 
             # Write to CSV (with header row)
             with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
@@ -1527,165 +1755,149 @@ class HealthCheckApp:
                     writer.writeheader()
                     writer.writerows(data)
 
-            cursor.close()
-            conn.close()
-
+        def exported(_):
             messagebox.showinfo(
                 "Export Successful",
-                f"Table '{table_name}' exported to:\n{file_path}",
+                f"Health checks of {day:%Y-%m-%d} exported to:\n{file_path}",
                 parent=self.root
             )
 
-        except Exception as e:
+        def failed(e):
             messagebox.showerror(
                 "Export Failed",
-                f"Error exporting table:\n{str(e)}",
+                f"Error exporting day:\n{str(e)}",
                 parent=self.root
             )
 
-    def toggle_reason(self, var, index):
-        """Show/hide reason text based on checkbox state"""
-        if var.get() == 0:  # Unchecked
-            self.reason_entries[index].master.pack(fill=tk.X, pady=5)
-        else:
-            self.reason_entries[index].master.pack_forget()
+        self.db_worker.submit(export, exported, on_error=failed)
 
     def update_clock(self):
         try:
             now = datetime.now()
-            date_time = now.strftime("%a, %b %d %Y\n%I:%M:%S %p")
-            self.clock_label.config(text=date_time)
-
-            # Check if the day has changed
-            today_table_name = self.generate_table_name()
-            if self.current_day_table and self.current_day_table != today_table_name:
-                self.current_day_table = today_table_name
-                self.create_new_table(self.current_day_table)
-                self.day_table_label.config(text=f"Today's table: {self.current_day_table}")
-                # Clear the form for the new day
-                for var in self.check_vars:
-                    var.set(1)
-                for reason_entry in self.reason_entries:
-                    reason_entry.delete("1.0", tk.END)
-                for notes_entry in self.notes_entries:
-                    notes_entry.delete("1.0", tk.END)
-                messagebox.showinfo("New Day", "A new day has begun. A new table has been created.", parent=self.root)
-
+            form_built = self.tab_built(self.TAB_CHECK_FORM)
+            if form_built:
+                date_time = now.strftime("%a, %b %d %Y\n%I:%M:%S %p")
+                self.clock_label.config(text=date_time)
 
+            self.check_day_rollover(now.date())
             self.root.after(1000, self.update_clock)  # Schedule next update
         except Exception as e:
             print(f"[ERROR] Clock update failed: {e}")
 
-    def generate_table_name(self):
-        """Generate a table name based on current date (YYYYMMDD)"""
-        now = datetime.now()
-        return f"health_check_{now.strftime('%Y%m%d')}"
-
-    def create_new_table(self, table_name):
-        """Create a new table with the given name, including username column"""
-        try:
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor()
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS {table_name} (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    check_name VARCHAR(100) NOT NULL,
-                    status VARCHAR(10) NOT NULL,
-                    reason TEXT,
-                    notes TEXT,
-                    username VARCHAR(50),
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                )
-            """)
-            conn.commit()
-            cursor.close()
-            conn.close()
-            return True
-        except mysql.connector.Error as err:
-            messagebox.showerror("Database Error", f"Error creating table: {err}")
+    def check_day_rollover(self, today=None):
+        """Switch current_day to today and reset the form if the day has changed. Returns True if it did."""
+        today = today or datetime.now().date()
+        if self.current_day == today:
             return False
-
+        self.current_day = today
+        self.saved_form_rows = {}
+        if self.tab_built(self.TAB_CHECK_FORM):
+            self.day_table_label.config(text=f"Today's checks: {self.current_day:%Y-%m-%d}")
+            # Clear the form for the new day and pick up catalog changes
+            self.check_list.reset()
+            self.load_check_catalog()
+        # Another instance may already have submitted for the new day
+        self.refresh_day_catalog(reschedule=False)
+        self.prune_readings()
+        messagebox.showinfo("New Day", "A new day has begun. The form has been reset for today's checks.", parent=self.root)
+        return True
+
+    def read_form_rows(self):
+        """Current form values as {check_name: (status, reason, notes)}"""
+        return self.check_list.read_rows()
+
+    @instrumentation.timed("ui.on_submit")
     def on_submit(self):
-        """Handle form submission - save to current day's table. Keep form filled after submit."""
-        today_table_name = self.generate_table_name()
-        self.current_day_table = today_table_name # Ensure current_day_table is always up-to-date
-
-        # Explicitly check and create table if it doesn't exist
-        if not self.check_for_existing_day_table():
-            if not self.create_new_table(self.current_day_table):
-                return # Stop if table creation fails
+        """Handle form submission - save today's changed results. Keep form filled after submit."""
+        if self.check_day_rollover():
+            # The form was filled in yesterday and has just been reset
+            return
 
-        try:
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor(dictionary=True)
-
-            # First check if we have existing records for today
-            cursor.execute(f"SELECT * FROM {self.current_day_table}")
-            existing_rows = {row['check_name']: row for row in cursor.fetchall()}
-
-            for check_var, label, reason_entry, notes_entry in zip(
-                self.check_vars, self.check_labels, self.reason_entries, self.notes_entries
-            ):
-                status = "OK" if check_var.get() == 1 else "NOT OK"
-                reason = reason_entry.get("1.0", "end-1c").strip() if status == "NOT OK" else None
-                notes = notes_entry.get("1.0", "end-1c").strip()
-                username = self.username if hasattr(self, 'username') else None
-
-                if status == "NOT OK" and not reason:
-                    messagebox.showwarning("Missing Explanation",
-                                         f"Please explain why '{label}' is not functioning")
-                    conn.rollback()
-                    cursor.close()
-                    conn.close()
-                    return
+        form_rows = self.read_form_rows()
+        for label in missing_reasons(form_rows):
+            self.check_list.show(label)
+            if self.check_list.category is None:
+                self.check_category.set(self.ALL_CATEGORIES)
+            self.update_check_count()
+            messagebox.showwarning("Missing Explanation",
+                                 f"Please explain why '{label}' is not functioning")
+            return
 
-                if label in existing_rows:
-                    row = existing_rows[label]
-                    # Only update if something changed
-                    if (
-                        row['status'] != status or
-                        (row['reason'] or '') != (reason or '') or
-                        (row['notes'] or '') != (notes or '')
-                    ):
-                        cursor.execute(
-                            f"""UPDATE {self.current_day_table}
-                            SET status = %s, reason = %s, notes = %s, username = %s, timestamp = CURRENT_TIMESTAMP
-                            WHERE check_name = %s""",
-                            (status, reason, notes, username, label))
-                else:
-                    # Insert new record
-                    cursor.execute(
-                        f"""INSERT INTO {self.current_day_table}
-                        (check_name, status, reason, notes, username)
-                        VALUES (%s, %s, %s, %s, %s)""",
-                        (label, status, reason, notes, username)
-                    )
+        # Only rows that changed since the last successful save are written
+        dirty_rows = changed_rows(form_rows, self.saved_form_rows)
+        if not dirty_rows:
+            messagebox.showinfo("No Changes", "Nothing has changed since the last submit.", parent=self.root)
+            return
+        username = self.username if hasattr(self, 'username') else None
 
-            conn.commit()
-            cursor.close()
-            conn.close()
+        day = self.current_day
 
-            self.day_table_label.config(text=f"Today's table: {self.current_day_table}")
+        def save(job):
+            save_day_results(self.db_pool, day, dirty_rows, username)
 
-            messagebox.showinfo(
-                "Success",
-                f"Health check saved to table: {self.current_day_table}",
-                parent=self.root
-            )
+        def failed(err):
+            self.submit_btn.state(["!disabled"])
+            messagebox.showerror("Database Error", f"Error saving to database: {err}")
 
-            # Do NOT clear the form after submit; keep values as is
-            # Only clear on day change (see update_clock)
+        # Saved on a database worker; the button stays disabled until it is done
+        self.submit_btn.state(["disabled"])
+        self.db_worker.submit(save, lambda _: self.on_submit_saved(day, dirty_rows), on_error=failed)
 
-            # Switch to view tab and refresh list
-            self.select_tab(1)
-            self.refresh_tables_list()
-            # Also update dashboard so per-check status updates immediately
+    def start_ingest_api(self, port):
+        """Serve the ingestion API next to the UI; submitted results refresh the views like a form submit."""
+        try:
+            self.ingest_server = IngestServer(
+                self.db_pool, port=port, token=os.environ.get('HEALTH_CHECK_API_TOKEN'),
+                metrics=load_metric_registry(self.zabbix_config),
+                on_write=lambda days: self.db_worker.call_soon(self.on_results_ingested, days)
+            ).start()
+            print(f"[INFO] Health check API listening on {self.ingest_server.url}")
+        except OSError as e:
+            print(f"[ERROR] Could not start the health check API on port {port}: {e}")
+
+    def on_results_ingested(self, days):
+        """Note the days written through the API and refresh the views once the burst is over"""
+        for day in days:
+            self.day_catalog.add(day)
+            self.problem_cache.invalidate(day)
+        self.ingested_days.update(days)
+        if self.ingest_refresh_after is None:
+            self.ingest_refresh_after = self.root.after(1000, self.refresh_after_ingest)
+
+    def refresh_after_ingest(self):
+        self.ingest_refresh_after = None
+        days, self.ingested_days = self.ingested_days, set()
+        self.refresh_tables_list()
+        if self.current_day in days:
             self.update_dashboard()
-        except mysql.connector.Error as err:
-            messagebox.showerror("Database Error", f"Error saving to database: {err}")
+
+    def on_submit_saved(self, day, dirty_rows):
+        """Update the UI once on_submit's rows are saved"""
+        self.submit_btn.state(["!disabled"])
+        if day == self.current_day:
+            self.saved_form_rows.update(dirty_rows)
+        self.day_catalog.add(day)
+        self.problem_cache.invalidate(day)
+
+        self.day_table_label.config(text=f"Today's checks: {self.current_day:%Y-%m-%d}")
+
+        messagebox.showinfo(
+            "Success",
+            f"Health check saved for {day:%Y-%m-%d} ({len(dirty_rows)} changed checks)",
+            parent=self.root
+        )
+
+        # Do NOT clear the form after submit; keep values as is
+        # Only clear on day change (see update_clock)
+
+        # Switch to view tab and refresh list (building the tab loads it)
+        self.refresh_tables_list()
+        self.select_tab(self.TAB_VIEW_TABLES)
+        # Also update dashboard so per-check status updates immediately
+        self.update_dashboard()
 
     def clear_database(self):
-        """Delete all health check tables from the database"""
+        """Delete all health check data from the database"""
         if not messagebox.askyesno(
             "Confirm Clear",
             "This will delete ALL health check data!\nAre you sure?",
@@ -1693,316 +1905,152 @@ class HealthCheckApp:
         ):
             return
 
-        try:
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor()
+        def clear(job):
+            with self.db_pool.get_connection() as conn:
+                cursor = conn.cursor()
 
-            # Get all tables in the database
-            cursor.execute("SHOW TABLES")
-            tables = [table[0] for table in cursor.fetchall()]
+                cursor.execute(f"SELECT COUNT(DISTINCT check_date) FROM {RESULTS_TABLE}")
+                deleted_count = cursor.fetchone()[0]
+                cursor.execute(f"DELETE FROM {RESULTS_TABLE}")
+                cursor.execute(f"DELETE FROM {SUMMARY_TABLE}")
 
-            # Delete all health check tables
-            deleted_count = 0
-            for table in tables:
-                if table.startswith('health_check_'):
+                # Also drop any legacy per-day tables so a later migration cannot bring them back
+                for table in list_legacy_day_tables(cursor):
                     cursor.execute(f"DROP TABLE {table}")
-                    deleted_count += 1
 
-            conn.commit()
-            cursor.close()
-            conn.close()
+                conn.commit()
+                cursor.close()
+            return deleted_count
 
-            # Reset current day table
-            self.current_day_table = None
-            self.day_table_label.config(text="Today's table: Not created yet")
+        def cleared(deleted_count):
+            self.day_catalog.clear()
+            self.saved_form_rows = {}
+            self.problem_cache.invalidate()
 
             messagebox.showinfo(
                 "Success",
-                f"Deleted {deleted_count} health check tables",
+                f"Deleted health check data of {deleted_count} days",
                 parent=self.root
             )
 
             # Refresh tables list
             self.refresh_tables_list()
 
-        except mysql.connector.Error as err:
+        def failed(err):
             messagebox.showerror("Database Error", f"Error clearing database: {err}")
 
+        self.db_worker.submit(clear, cleared, on_error=failed)
+
+    def resolve_report_period(self, report_type):
+        """Return (title, start_date, end_date) for the selected report type, or None if the input is invalid"""
+        inputs = {
+            'daily': (self.single_date_entry, None, "Invalid Date", "Please enter a valid date in YYYY-MM-DD format"),
+            'weekly': (self.week_entry, None, "Invalid Date", "Please enter a valid date in YYYY-MM-DD format"),
+            'monthly': (self.month_entry, None, "Invalid Month", "Please enter a valid month in YYYY-MM format"),
+            'yearly': (self.year_entry, None, "Invalid Year", "Please enter a valid 4-digit year"),
+            'custom': (self.start_date_entry, self.end_date_entry, "Invalid Date",
+                       "Please enter valid dates in YYYY-MM-DD format"),
+        }
+        if report_type not in inputs:
+            return None
+        entry, end_entry, error_title, error_message = inputs[report_type]
+        try:
+            return report_period(report_type, entry.get(), end_entry.get() if end_entry else None)
+        except InvalidReportRange:
+            messagebox.showerror("Invalid Range", "Start date must be before end date")
+        except ValueError:
+            messagebox.showerror(error_title, error_message)
+        return None
+
+    @instrumentation.timed("ui.generate_report")
     def generate_report(self):
         """Generate a report based on the selected type and date range"""
         report_type = self.report_type.get()
+        period = self.resolve_report_period(report_type)
+        if not period:
+            return
+        report_title, start_date, end_date = period
 
-        try:
-            if report_type == 'daily':
-                date_str = self.single_date_entry.get()
-                try:
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-                except ValueError:
-                    messagebox.showerror("Invalid Date", "Please enter a valid date in YYYY-MM-DD format")
-                    return
-
-                table_name = f"health_check_{date_obj.strftime('%Y%m%d')}"
-                report_title = f"Daily Health Check Report - {date_obj.strftime('%Y-%m-%d')}"
-
-                conn = mysql.connector.connect(**self.db_config)
-                cursor = conn.cursor(dictionary=True)
-                cursor.execute(f"SELECT * FROM {table_name}")
-                report_data = cursor.fetchall()
-                cursor.close()
-                conn.close()
-
-                self.display_report(report_title, report_data, report_type)
-
-            elif report_type == 'weekly':
-                date_str = self.week_entry.get()
-                try:
-                    start_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                except ValueError:
-                    messagebox.showerror("Invalid Date", "Please enter a valid date in YYYY-MM-DD format")
-                    return
-
-                end_date = start_date + timedelta(days=6)
-                report_title = f"Weekly Health Check Report - {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
-                report_data = []
-
-                conn = mysql.connector.connect(**self.db_config)
-                cursor = conn.cursor(dictionary=True)
-
-                for single_date in (start_date + timedelta(n) for n in range(7)):
-                    table_name = f"health_check_{single_date.strftime('%Y%m%d')}"
-                    cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
-                    if cursor.fetchone():
-                        cursor.execute(f"SELECT * FROM {table_name}")
-                        day_data = cursor.fetchall()
-                        for record in day_data:
-                            record['date'] = single_date.strftime('%Y-%m-%d')
-                            report_data.append(record)
-
-                cursor.close()
-                conn.close()
-
-                self.display_report(report_title, report_data, report_type)
-
-            elif report_type == 'monthly':
-                month_str = self.month_entry.get()
-                try:
-                    year, month = map(int, month_str.split('-'))
-                    first_day = datetime(year, month, 1).date()
-                    last_day = datetime(year, month, monthrange(year, month)[1]).date()
-                except ValueError:
-                    messagebox.showerror("Invalid Month", "Please enter a valid month in YYYY-MM format")
-                    return
-
-                report_title = f"Monthly Health Check Report - {first_day.strftime('%Y-%m')}"
-                report_data = []
-
-                conn = mysql.connector.connect(**self.db_config)
-                cursor = conn.cursor(dictionary=True)
-
-                current_date = first_day
-                while current_date <= last_day:
-                    table_name = f"health_check_{current_date.strftime('%Y%m%d')}"
-                    cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
-                    if cursor.fetchone():
-                        cursor.execute(f"SELECT * FROM {table_name}")
-                        day_data = cursor.fetchall()
-                        for record in day_data:
-                            record['date'] = current_date.strftime('%Y-%m-%d')
-                            report_data.append(record)
-                    current_date += timedelta(days=1)
-
-                cursor.close()
-                conn.close()
-
-                self.display_report(report_title, report_data, report_type)
-
-            elif report_type == 'yearly':
-                year_str = self.year_entry.get()
-                try:
-                    year = int(year_str)
-                    first_day = datetime(year, 1, 1).date()
-                    last_day = datetime(year, 12, 31).date()
-                except ValueError:
-                    messagebox.showerror("Invalid Year", "Please enter a valid 4-digit year")
-                    return
-
-                report_title = f"Yearly Health Check Report - {year}"
-                report_data = []
-
-                conn = mysql.connector.connect(**self.db_config)
-                cursor = conn.cursor(dictionary=True)
-
-                current_date = first_day
-                while current_date <= last_day:
-                    table_name = f"health_check_{current_date.strftime('%Y%m%d')}"
-                    cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
-                    if cursor.fetchone():
-                        cursor.execute(f"SELECT * FROM {table_name}")
-                        day_data = cursor.fetchall()
-                        for record in day_data:
-                            record['date'] = current_date.strftime('%Y-%m-%d')
-                            report_data.append(record)
-                    current_date += timedelta(days=1)
-
-                cursor.close()
-                conn.close()
-
-                self.display_report(report_title, report_data, 'yearly')
-
-            elif report_type == 'custom':
-                try:
-                    start_date = datetime.strptime(self.start_date_entry.get(), '%Y-%m-%d').date()
-                    end_date = datetime.strptime(self.end_date_entry.get(), '%Y-%m-%d').date()
-                except ValueError:
-                    messagebox.showerror("Invalid Date", "Please enter valid dates in YYYY-MM-DD format")
-                    return
-
-                if start_date > end_date:
-                    messagebox.showerror("Invalid Range", "Start date must be before end date")
-                    return
-
-                report_title = f"Custom Health Check Report - {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
-                report_data = []
-
-                conn = mysql.connector.connect(**self.db_config)
-                cursor = conn.cursor(dictionary=True)
-
-                current_date = start_date
-                while current_date <= end_date:
-                    table_name = f"health_check_{current_date.strftime('%Y%m%d')}"
-                    cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
-                    if cursor.fetchone():
-                        cursor.execute(f"SELECT * FROM {table_name}")
-                        day_data = cursor.fetchall()
-                        for record in day_data:
-                            record['date'] = current_date.strftime('%Y-%m-%d')
-                            report_data.append(record)
-                    current_date += timedelta(days=1)
-
-                cursor.close()
-                conn.close()
-
-                self.display_report(report_title, report_data, 'custom')
+        # Today's daily report shows the live Zabbix reading; every other period shows what was recorded
+        live = report_type == 'daily' and start_date == datetime.now().date()
+        metrics = load_metric_registry(self.zabbix_config)
 
-        except mysql.connector.Error as err:
+        def fetch(job):
+            conditions = None if live else self.reading_store.conditions(start_date, end_date, metrics)
+            # Skip the server entirely when the catalog knows the range is empty
+            if not self.day_catalog.has_days_between(start_date, end_date):
+                return [], None, conditions
+            if report_type == 'daily':
+                # A single day lists every check, straight from the raw rows
+                return fetch_results(self.db_pool, start_date, end_date), None, conditions
+            # Range reports only need per-check totals, read from the daily rollup
+            return [], self.fetch_range_summary_in_chunks(job, start_date, end_date), conditions
+
+        def done(result):
+            if job is not self.report_job:
+                return  # Superseded or cancelled
+            self.end_report_job()
+            data, summary, conditions = result
+            self.display_report(Report(
+                report_title, report_type, start_date, end_date, data, summary=summary, conditions=conditions,
+                live=self.zabbix_data if conditions is None else None
+            ))
+
+        def failed(err):
+            if job is not self.report_job:
+                return
+            self.end_report_job()
             messagebox.showerror("Database Error", f"Error generating report: {err}")
 
-    def display_report(self, title, data, report_type):
+        def progress(done_chunks, total_chunks):
+            if job is self.report_job:
+                self.report_progress.configure(maximum=total_chunks, value=done_chunks)
+
+        # A new report replaces one that is still running
+        if self.report_job:
+            self.report_job.cancel()
+        job = self.report_job = self.db_worker.submit(fetch, done, on_error=failed, on_progress=progress)
+        self.report_progress.configure(value=0)
+        self.report_progress.grid()
+        self.cancel_report_btn.grid()
+
+    def cancel_report(self):
+        """Stop the report being generated"""
+        if self.report_job:
+            self.report_job.cancel()
+            self.end_report_job()
+
+    def end_report_job(self):
+        self.report_job = None
+        self.report_progress.grid_remove()
+        self.cancel_report_btn.grid_remove()
+
+    def fetch_range_summary_in_chunks(self, job, start_date, end_date):
+        """fetch_range_summary one calendar year at a time, reporting progress to job and stopping when it is cancelled"""
+        chunks = year_chunks(start_date, end_date)
+        summaries = []
+        for i, (chunk_start, chunk_end) in enumerate(chunks):
+            job.check_cancelled()
+            if self.day_catalog.has_days_between(chunk_start, chunk_end):
+                summaries.append(fetch_range_summary(self.db_pool, chunk_start, chunk_end))
+            job.report_progress(i + 1, len(chunks))
+        return merge_range_summaries(summaries)
+
+    def display_report(self, report):
+        """Show a Report: one insert of its text, then one tag_add per tag over the computed ranges"""
+        self.current_report = report
+        text, ranges = tagged_text(report.segments())
         self.report_text.delete(1.0, tk.END)
-        # Add title
-        self.report_text.insert(tk.END, f"{title}\n", 'title')
-        self.report_text.insert(tk.END, "=" * len(title) + "\n\n", 'title')
-        # Add Zabbix data to report
-        zabbix = self.zabbix_data or {}
-        temp = zabbix.get('temp')
-        temp_status = zabbix.get('temp_status')
-        humidity = zabbix.get('humidity')
-        humidity_status = zabbix.get('humidity_status')
-        zabbix_error = zabbix.get('error')
-        self.report_text.insert(tk.END, "Zabbix Data (Temperature & Humidity):\n", 'header')
-        if zabbix_error:
-            self.report_text.insert(tk.END, f"  Error: {zabbix_error}\n", 'not_ok')
-        else:
-            self.report_text.insert(tk.END, f"  Temperature: {temp if temp is not None else 'N/A'} °C ({temp_status})\n", 'ok' if temp_status=='OK' else 'not_ok')
-            self.report_text.insert(tk.END, f"  Humidity: {humidity if humidity is not None else 'N/A'} % ({humidity_status})\n", 'ok' if humidity_status=='OK' else 'not_ok')
-        self.report_text.insert(tk.END, "\n")
-        if not data:
-            self.report_text.insert(tk.END, "No data available for this report period.\n")
-            return
-        # Find last submitter
-        last_submit = None
-        if data:
-            # Sort by timestamp if available
-            try:
-                last_submit = max(data, key=lambda r: r.get('timestamp', ''))
-            except Exception:
-                last_submit = data[-1]
-        last_user = last_submit.get('username') if last_submit and 'username' in last_submit else None
-        if last_user:
-            self.report_text.insert(tk.END, f"Last submitted by: {last_user}\n\n", 'header')
-        if report_type == 'daily':
-            self.report_text.insert(tk.END, "Check Name".ljust(40), 'header')
-            self.report_text.insert(tk.END, "Status".ljust(10), 'header')
-            self.report_text.insert(tk.END, "Notes\n", 'header')
-            self.report_text.insert(tk.END, "-" * 80 + "\n", 'header')
-            for record in data:
-                self.report_text.insert(tk.END, record['check_name'].ljust(40))
-                status = "OK" if record['status'] == "OK" else "NOT OK"
-                status_tag = 'ok' if status == "OK" else 'not_ok'
-                self.report_text.insert(tk.END, status.ljust(10), status_tag)
-                self.report_text.insert(tk.END, f"{record['notes'] or ''}\n")
-                if record['status'] == "NOT OK":
-                    self.report_text.insert(tk.END, f"  Reason: {record['reason']}\n\n", 'reason')
-                else:
-                    self.report_text.insert(tk.END, "\n")
-            total_checks = len(data)
-            ok_checks = sum(1 for r in data if r['status'] == "OK")
-            not_ok_checks = total_checks - ok_checks
-            self.report_text.insert(tk.END, "\nSUMMARY:\n", 'header')
-            self.report_text.insert(tk.END, f"Total checks: {total_checks}\n")
-            self.report_text.insert(tk.END, f"Passed: {ok_checks}\n", 'ok')
-            self.report_text.insert(tk.END, f"Failed: {not_ok_checks}\n", 'not_ok')
-            self.report_text.insert(tk.END, f"Success rate: {ok_checks/total_checks:.1%}\n")
-        else:
-            check_stats = {}
-            for record in data:
-                check_name = record['check_name']
-                if check_name not in check_stats:
-                    check_stats[check_name] = {
-                        'total': 0,
-                        'ok': 0,
-                        'not_ok': 0,
-                        'last_reason': None,
-                        'last_date': None
-                    }
-                check_stats[check_name]['total'] += 1
-                if record['status'] == "OK":
-                    check_stats[check_name]['ok'] += 1
-                else:
-                    check_stats[check_name]['not_ok'] += 1
-                    check_stats[check_name]['last_reason'] = record.get('reason')
-                    check_stats[check_name]['last_date'] = record.get('date')
-            self.report_text.insert(tk.END, "Check Name".ljust(40), 'header')
-            self.report_text.insert(tk.END, "Passed".center(10), 'header')
-            self.report_text.insert(tk.END, "Failed".center(10), 'header')
-            self.report_text.insert(tk.END, "Last Failure Date".center(20), 'header')
-            self.report_text.insert(tk.END, "Last Failure Reason\n", 'header')
-            self.report_text.insert(tk.END, "-" * 100 + "\n", 'header')
-            for check_name, stats in check_stats.items():
-                self.report_text.insert(tk.END, check_name.ljust(40))
-                self.report_text.insert(tk.END, str(stats['ok']).center(10), 'ok')
-                self.report_text.insert(tk.END, str(stats['not_ok']).center(10), 'not_ok')
-                if stats['last_reason']:
-                    self.report_text.insert(tk.END, (stats['last_date'] or 'N/A').center(20))
-                    self.report_text.insert(tk.END, stats['last_reason'] + "\n", 'reason')
-                else:
-                    self.report_text.insert(tk.END, "N/A".center(20))
-                    self.report_text.insert(tk.END, "N/A\n")
-            total_days = len({r['date'] for r in data if 'date' in r}) if data else 0
-            total_checks = sum(stats['total'] for stats in check_stats.values())
-            ok_checks = sum(stats['ok'] for stats in check_stats.values())
-            not_ok_checks = total_checks - ok_checks
-            self.report_text.insert(tk.END, "\nSUMMARY:\n", 'header')
-            self.report_text.insert(tk.END, f"Report period covers {total_days} days\n")
-            self.report_text.insert(tk.END, f"Total checks performed: {total_checks}\n")
-            self.report_text.insert(tk.END, f"Total passed: {ok_checks}\n", 'ok')
-            self.report_text.insert(tk.END, f"Total failed: {not_ok_checks}\n", 'not_ok')
-            self.report_text.insert(tk.END, f"Overall success rate: {ok_checks/total_checks:.1%}\n")
-        self.report_text.tag_config('title', font=('Segoe UI', 14, 'bold'), justify='center')
-       
-        self.report_text.tag_config('header', font=('Segoe UI', 10, 'bold'))
-        self.report_text.tag_config('ok', foreground='green')
-        self.report_text.tag_config('not_ok', foreground='red')
-        self.report_text.tag_config('reason', foreground='orange')
+        self.report_text.insert(1.0, text)
+        for tag, indices in ranges.items():
+            self.report_text.tag_add(tag, *indices)
 
     def export_report(self):
-        report_text = self.report_text.get(1.0, tk.END)
-        if not report_text.strip():
+        report = self.current_report
+        if report is None:
             messagebox.showwarning("Empty Report", "There is no report to export.")
             return
-        first_line = report_text.split('\n')[0]
-        safe_filename = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in first_line)
-        default_filename = os.path.join(self.export_dir, f"{safe_filename}.txt")
+        safe_filename = report.file_stem()
         file_path = filedialog.asksaveasfilename(
             initialdir=self.export_dir,
             initialfile=f"{safe_filename}.txt",
@@ -2012,8 +2060,7 @@ class HealthCheckApp:
         if not file_path:
             return
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(report_text)
+            report.write('txt', file_path)
             messagebox.showinfo(
                 "Export Successful",
                 f"Report exported to:\n{file_path}",
@@ -2026,122 +2073,67 @@ class HealthCheckApp:
                 parent=self.root
                        )
 
-    def get_zabbix_temp_humidity(self, zabbix_url, username, password, host, temp_key, humidity_key):
-        """
-        Retrieve temperature and humidity from Zabbix API.
-        Returns: (temp_value, temp_status, humidity_value, humidity_status, error_message)
-        """
-        try:
-            # Authenticate
-            payload = {
-                "jsonrpc": "2.0",
-                "method": "user.login",
-                "params": {
-                    "user": username,
-                    "password": password
-                },
-                "id": 1
-            }
-            r = requests.post(zabbix_url, json=payload, timeout=10)
-            r.raise_for_status()
-            auth = r.json().get('result')
-            if not auth:
-                return (None, 'NOT OK', None, 'NOT OK', 'Zabbix authentication failed')
-
-            # Get temperature
-            payload = {
-                "jsonrpc": "2.0",
-                "method": "item.get",
-                "params": {
-                    "output": ["lastvalue"],
-                    "host": host,
-                    "search": {"key_": temp_key},
-                    "sortfield": "name"
-                },
-                "auth": auth,
-                "id": 2
-            }
-            r = requests.post(zabbix_url, json=payload, timeout=10)
-            r.raise_for_status()
-            temp_items = r.json().get('result', [])
-            temp_value = float(temp_items[0]['lastvalue']) if temp_items else None
-
-            # Get humidity
-            payload['params']['search']['key_'] = humidity_key
-            r = requests.post(zabbix_url, json=payload, timeout=10)
-            r.raise_for_status()
-            humidity_items = r.json().get('result', [])
-            humidity_value = float(humidity_items[0]['lastvalue']) if humidity_items else None
-
-            # Logout
-            requests.post(zabbix_url, json={
-                "jsonrpc": "2.0",
-                "method": "user.logout",
-                "params": [],
-                "auth": auth,
-                "id": 3
-            }, timeout=5)
-
-            # Status logic
-            temp_status = 'OK' if temp_value is not None and temp_value < 28 else 'NOT OK'
-            humidity_status = 'OK' if humidity_value is not None and 40 <= humidity_value <= 60 else 'NOT OK'
-            return (temp_value, temp_status, humidity_value, humidity_status, None)
-        except Exception as e:
-            return (None, 'NOT OK', None, 'NOT OK', str(e))
+    def get_zabbix_client(self):
+        """The ZabbixClient for the current config, recreated when the config changes"""
+        settings = tuple(self.zabbix_config.get(key) for key in ('url', 'username', 'password', 'api_token'))
+        if self.zabbix_client is None or self.zabbix_client_settings != settings:
+            if self.zabbix_client is not None:
+                self.zabbix_client.close()
+            url, username, password, api_token = settings
+            self.zabbix_client = ZabbixClient(url, username, password, api_token=api_token)
+            self.zabbix_client_settings = settings
+        return self.zabbix_client
+
+    def fetch_zabbix_reading(self):
+        """Poll every registered Zabbix metric and record the values; runs off the Tk thread"""
+        return read_sensors(self.get_zabbix_client(), load_metric_registry(self.zabbix_config), self.reading_store)
 
     def update_zabbix_data(self):
-        """Fetch latest Zabbix temp/humidity and update UI fields"""
-        from threading import Thread
-        def fetch():
+        """Fetch a fresh Zabbix reading in the background; the UI updates when it arrives"""
+        if self.zabbix_snapshot.refresh(force=True) and self.tab_built(self.TAB_CHECK_FORM):
             self.zabbix_loading_label.config(text="Loading Zabbix data...")
             self.refresh_btn.state(["disabled"])
             self.zabbix_config_btn.state(["disabled"])
-            temp, temp_status, humidity, humidity_status, error = self.get_zabbix_temp_humidity(
-                self.zabbix_config['url'],
-                self.zabbix_config['username'],
-                self.zabbix_config['password'],
-                self.zabbix_config['host'],
-                self.zabbix_config['temp_key'],
-                self.zabbix_config['humidity_key']
-            )
-            self.zabbix_data = {
-                'temp': temp,
-                'temp_status': temp_status,
-                'humidity': humidity,
-                'humidity_status': humidity_status,
-                'error': error
-            }
-            # Update UI if fields exist
-            if hasattr(self, 'zabbix_temp_label'):
-                self.zabbix_temp_label.config(text=f"Temperature: {temp if temp is not None else 'N/A'} °C ({temp_status})")
-            if hasattr(self, 'zabbix_humidity_label'):
-                self.zabbix_humidity_label.config(text=f"Humidity: {humidity if humidity is not None else 'N/A'} % ({humidity_status})")
-            if hasattr(self, 'zabbix_error_label'):
-                self.zabbix_error_label.config(text=error or "")
-            self.zabbix_loading_label.config(text="")
-            self.refresh_btn.state(["!disabled"])
-            self.zabbix_config_btn.state(["!disabled"])
-            # Update dashboard if present, on main thread
-            if hasattr(self, 'update_dashboard'):
-                self.root.after(0, self.update_dashboard)
-        Thread(target=fetch, daemon=True).start()
 
-    def load_zabbix_config(self):
-        default = {
-            'url': 'http://your-zabbix-server/zabbix/api_jsonrpc.php',
-            'username': 'api_user',
-            'password': 'api_password',
-            'host': 'YourHostName',
-            'temp_key': 'sensor.temp',
-            'humidity_key': 'sensor.humidity'
-        }
+    def on_zabbix_reading(self, data):
+        """Show a newly fetched Zabbix reading wherever it is displayed"""
+        self.show_zabbix_data()
+        self.show_dashboard_zabbix()
+        self.schedule_zabbix_refresh(failed=bool(data.get('error')))
+
+    def schedule_zabbix_refresh(self, failed=False):
+        """Plan the next automatic refresh: the configured interval, backing off after failures"""
+        self.zabbix_failures = self.zabbix_failures + 1 if failed else 0
         try:
-            if os.path.exists(self.zabbix_config_path):
-                with open(self.zabbix_config_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return default
+            interval = max(5, int(float(self.zabbix_config.get('refresh_interval') or ZABBIX_REFRESH_INTERVAL)))
+        except (TypeError, ValueError):
+            interval = ZABBIX_REFRESH_INTERVAL
+        if self.zabbix_refresh_after is not None:
+            self.root.after_cancel(self.zabbix_refresh_after)
+        delay = refresh_delay(interval, self.zabbix_failures)
+        if failed:
+            print(f"[INFO] Zabbix refresh failed {self.zabbix_failures} time(s) in a row; next try in {delay:.0f}s")
+        self.zabbix_refresh_after = self.root.after(int(delay * 1000), self.auto_refresh_zabbix)
+
+    def auto_refresh_zabbix(self):
+        self.zabbix_refresh_after = None
+        self.update_zabbix_data()
+
+    def show_zabbix_data(self):
+        """Show the last Zabbix reading on the Health Check tab, if it is built"""
+        data = self.zabbix_snapshot.data
+        if not data or not self.tab_built(self.TAB_CHECK_FORM):
+            return
+        temp, humidity = data['temp'], data['humidity']
+        self.zabbix_temp_label.config(text=f"Temperature: {temp if temp is not None else 'N/A'} °C ({data['temp_status']})")
+        self.zabbix_humidity_label.config(text=f"Humidity: {humidity if humidity is not None else 'N/A'} % ({data['humidity_status']})")
+        self.zabbix_error_label.config(text=data['error'] or "")
+        self.zabbix_loading_label.config(text="")
+        self.refresh_btn.state(["!disabled"])
+        self.zabbix_config_btn.state(["!disabled"])
+
+    def load_zabbix_config(self):
+        return read_zabbix_config(self.zabbix_config_path)
 
     def save_zabbix_config(self):
         try:
@@ -2150,11 +2142,78 @@ class HealthCheckApp:
         except Exception as e:
             messagebox.showerror("Config Error", f"Failed to save Zabbix config: {e}")
 
+    def open_diagnostics_dialog(self):
+        """Show the span timings and counters collected by the instrumentation, refreshed every 2 s"""
+        win = tk.Toplevel(self.root)
+        win.title("Diagnostics")
+        win.geometry("980x560")
+        card = ttk.Frame(win, style='Card.TLabelframe', padding=(16, 12))
+        card.pack(fill=tk.BOTH, expand=True, padx=16, pady=12)
+
+        columns = ('name', 'calls', 'errors', 'avg', 'p50', 'p95', 'max', 'total')
+        headings = ('Span', 'Calls', 'Errors', 'Avg ms', 'p50 ms', 'p95 ms', 'Max ms', 'Total ms')
+        tree = ttk.Treeview(card, columns=columns, show='headings', height=18)
+        for col, text, width in zip(columns, headings, (440, 60, 60, 70, 70, 70, 70, 80)):
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor='w' if col == 'name' else 'e')
+        scrollbar = ttk.Scrollbar(card, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.grid(row=0, column=0, sticky='nsew')
+        scrollbar.grid(row=0, column=1, sticky='ns')
+        counters_label = ttk.Label(card, text="", style='TLabel', wraplength=900, justify=tk.LEFT)
+        counters_label.grid(row=1, column=0, columnspan=2, sticky='w', pady=(8, 0))
+        card.rowconfigure(0, weight=1)
+        card.columnconfigure(0, weight=1)
+
+        def fmt(ms):
+            return '' if ms is None else f"{ms:.1f}"
+
+        def refresh():
+            if not win.winfo_exists():
+                return
+            stats = instrumentation.snapshot()
+            tree.delete(*tree.get_children())
+            # Where the time went: biggest total first
+            for name, h in sorted(stats['spans'].items(), key=lambda item: -item[1]['total_ms']):
+                tree.insert('', 'end', values=(name, h['count'], h['errors'], fmt(h['avg_ms']), fmt(h['p50_ms']),
+                                               fmt(h['p95_ms']), fmt(h['max_ms']), fmt(h['total_ms'])))
+            counters = ', '.join(f"{name}: {value}" for name, value in stats['counters'].items())
+            counters_label.config(text=f"Counters: {counters or 'none'}")
+            win.after(2000, refresh)
+
+        def save_trace():
+            file_path = filedialog.asksaveasfilename(
+                parent=win,
+                initialdir=self.export_dir,
+                initialfile=f"health_check_trace_{datetime.now():%Y%m%d_%H%M%S}.json",
+                defaultextension=".json",
+                filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")]
+            )
+            if not file_path:
+                return
+            try:
+                instrumentation.write_trace(file_path)
+                messagebox.showinfo("Trace Saved", f"Trace written to:\n{file_path}", parent=win)
+            except Exception as e:
+                messagebox.showerror("Trace Failed", f"Error writing trace:\n{e}", parent=win)
+
+        def reset():
+            instrumentation.reset()
+            tree.delete(*tree.get_children())
+            counters_label.config(text="Counters: none")
+
+        btn_frame = ttk.Frame(card, style='TFrame')
+        btn_frame.grid(row=2, column=0, columnspan=2, pady=(12, 0), sticky='w')
+        ttk.Button(btn_frame, text="Save Trace...", style='Export.TButton', command=save_trace).pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(btn_frame, text="Reset", style='Clear.TButton', command=reset).pack(side=tk.LEFT, padx=8)
+        ttk.Button(btn_frame, text="Close", style='Report.TButton', command=win.destroy).pack(side=tk.LEFT, padx=8)
+        refresh()
+
     def open_zabbix_config_dialog(self):
         """Open a dialog to edit Zabbix config (URL, username, password, host, keys)"""
         config_win = tk.Toplevel(self.root)
         config_win.title("Edit Zabbix Configuration")
-        config_win.geometry("440x440")  # Increased height for full button visibility
+        config_win.geometry("440x530")  # Increased height for full button visibility
         # Use the modern theme background
         primary_bg = '#f6fbff'
         card_bg = '#ffffff'
@@ -2170,17 +2229,20 @@ class HealthCheckApp:
             ("Zabbix URL", 'url'),
             ("Username", 'username'),
             ("Password", 'password'),
+            ("API Token", 'api_token'),
             ("Host", 'host'),
             ("Temperature Key", 'temp_key'),
-            ("Humidity Key", 'humidity_key')
+            ("Humidity Key", 'humidity_key'),
+            ("Refresh Interval (s)", 'refresh_interval')
         ]
         entries = {}
         for i, (label, key) in enumerate(fields):
             lbl = ttk.Label(card, text=label+":", style='TLabel')
             lbl.grid(row=i, column=0, sticky='e', padx=(0,12), pady=8)
-            ent = ttk.Entry(card, width=32, show='*' if key=='password' else None, font=('Segoe UI', 11))
+            ent = ttk.Entry(card, width=32, show='*' if key in ('password', 'api_token') else None, font=('Segoe UI', 11))
             ent.grid(row=i, column=1, padx=(0,0), pady=8)
-            ent.insert(0, str(self.zabbix_config.get(key, '')))
+            default = ZABBIX_REFRESH_INTERVAL if key == 'refresh_interval' else ''
+            ent.insert(0, str(self.zabbix_config.get(key, default)))
             ent.configure(background=card_bg, foreground='#222e3a')
             entries[key] = ent
         def save():
@@ -2230,6 +2292,9 @@ class HealthCheckApp:
         self.dash_zabbix_humidity.pack(side=tk.LEFT, padx=10, pady=8)
         self.dash_zabbix_status = ttk.Label(zabbix_card, text="", style='TLabel')
         self.dash_zabbix_status.pack(side=tk.LEFT, padx=10, pady=8)
+        # Per-room min/max/avg, shown when more than the two default sensors are polled
+        self.dash_zabbix_rooms = ttk.Label(zabbix_card, text="", style='TLabel', justify=tk.LEFT)
+        self.dash_zabbix_rooms.pack(side=tk.BOTTOM, anchor='w', padx=10, pady=(0, 8))
 
         # Health check summary
         summary_card = ttk.LabelFrame(left, text="Today's Health Check Summary", style='Card.TLabelframe')
@@ -2251,6 +2316,8 @@ class HealthCheckApp:
         from tkcalendar import Calendar
         self.dash_calendar = Calendar(left, selectmode='none', date_pattern='yyyy-mm-dd')
         self.dash_calendar.pack(fill=tk.X, pady=(0, 16))
+        # Recolor from the month cache whenever the user navigates
+        self.dash_calendar.bind('<<CalendarMonthChanged>>', lambda e: self.update_dashboard_calendar())
         self.update_dashboard_calendar()  # Populate calendar colors
 
         # Right: Per-check status
@@ -2273,45 +2340,53 @@ class HealthCheckApp:
         # Initial update
         self.update_dashboard()
 
+    @instrumentation.timed("ui.update_dashboard")
     def update_dashboard(self):
-        """Update the dashboard widgets with latest data"""
-        try:
-            # --- Update Zabbix Data ---
-            temp, temp_status, humidity, humidity_status, error = self.get_zabbix_temp_humidity(
-                self.zabbix_config['url'],
-                self.zabbix_config['username'],
-                self.zabbix_config['password'],
-                self.zabbix_config['host'],
-                self.zabbix_config['temp_key'],
-                self.zabbix_config['humidity_key']
-            )
-            self.zabbix_data = {
-                'temp': temp,
-                'temp_status': temp_status,
-                'humidity': humidity,
-                'humidity_status': humidity_status,
-                'error': error
-            }
-
-            # Update Zabbix summary labels
-            if hasattr(self, 'dash_zabbix_temp'):
-                self.dash_zabbix_temp.config(text=f"Temperature: {temp if temp is not None else 'N/A'} °C")
-            if hasattr(self, 'dash_zabbix_humidity'):
-                self.dash_zabbix_humidity.config(text=f"Humidity: {humidity if humidity is not None else 'N/A'} %")
-            if hasattr(self, 'dash_zabbix_status'):
-                if error:
-                    self.dash_zabbix_status.config(text="Error fetching data", foreground='red')
-                else:
-                    self.dash_zabbix_status.config(text="Data OK", foreground='green')
+        """Reload the dashboard data in the background and redraw it when ready (no-op until the tab is built)"""
+        if not self.tab_built(self.TAB_DASHBOARD):
+            return
+        def show_error(e):
+            print(f"[ERROR] Updating dashboard failed: {e}")
+            messagebox.showerror("Update Error", f"Error updating dashboard: {e}", parent=self.root)
+        self.show_dashboard_zabbix()
+        self.db_worker.submit(lambda job: self.load_dashboard_data(), self.render_dashboard, on_error=show_error)
+
+    def load_dashboard_data(self):
+        """Fetch today's per-check rollup; runs on a database worker."""
+        today = datetime.now().date()
+        health_data = fetch_day_summary(self.db_pool, today) if today in self.day_catalog else []
+        if health_data:
+            # The pie chart will need matplotlib; import it here rather than on the Tk thread
+            preload_chart_modules()
+        return health_data
+
+    def show_dashboard_zabbix(self):
+        """Show the cached Zabbix reading on the dashboard, refetching it in the background if stale"""
+        if not self.tab_built(self.TAB_DASHBOARD):
+            return
+        data = self.zabbix_data
+        if not data:
+            # First fetch still running; on_zabbix_reading fills the labels in
+            self.dash_zabbix_status.config(text="Loading...", foreground='blue')
+            return
+        temp, humidity = data['temp'], data['humidity']
+        self.dash_zabbix_temp.config(text=f"Temperature: {temp if temp is not None else 'N/A'} °C")
+        self.dash_zabbix_humidity.config(text=f"Humidity: {humidity if humidity is not None else 'N/A'} %")
+        if data['error']:
+            self.dash_zabbix_status.config(text="Error fetching data", foreground='red')
+        else:
+            self.dash_zabbix_status.config(text="Data OK", foreground='green')
+        rooms = format_room_stats(data['rooms']) if data.get('sensors', 0) > 2 else []
+        self.dash_zabbix_rooms.config(text="\n".join(line for line, _ in rooms))
 
+    def render_dashboard(self, health_data):
+        """Update the dashboard's health check widgets with data from load_dashboard_data"""
+        try:
             # --- Update Health Check Summary ---
-            today_table_name = self.generate_table_name()
-            self.current_day_table = today_table_name  # Ensure current_day_table is always up-to-date
+            self.check_day_rollover()
 
-            # Check if today's table exists
-            table_exists = self.check_for_existing_day_table()
-            if not table_exists:
-                # If no table for today, reset summary labels
+            if not health_data:
+                # If nothing submitted today, reset summary labels
                 self.dash_ok_label.config(text="OK: 0")
                 self.dash_notok_label.config(text="NOT OK: 0")
                 self.dash_total_label.config(text="Total: 0")
@@ -2321,35 +2396,27 @@ class HealthCheckApp:
                     self.dash_pie_canvas = None
                 return  # No data to display yet
 
-            # Fetch today's health check data
-            conn = mysql.connector.connect(**self.db_config)
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(f"SELECT * FROM {today_table_name}")
-            health_data = cursor.fetchall()
-            cursor.close()
-            conn.close()
-
             # Update health check summary labels
-            total_checks = len(health_data)
-            ok_checks = sum(1 for r in health_data if r['status'] == "OK")
-            not_ok_checks = total_checks - ok_checks
+            ok_checks = sum(int(r['ok_count']) for r in health_data)
+            not_ok_checks = sum(int(r['not_ok_count']) for r in health_data)
+            total_checks = ok_checks + not_ok_checks
             self.dash_ok_label.config(text=f"OK: {ok_checks}")
             self.dash_notok_label.config(text=f"NOT OK: {not_ok_checks}")
             self.dash_total_label.config(text=f"Total: {total_checks}")
 
             # --- Update Pie Chart ---
             try:
-                import matplotlib
-                matplotlib.use('Agg')  # Use non-interactive backend
-                import matplotlib.pyplot as plt
+                # Figure instead of pyplot: no global figure manager, nothing to close
+                from matplotlib.figure import Figure
                 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
                 # Remove previous pie chart if exists
                 if hasattr(self, 'dash_pie_canvas') and self.dash_pie_canvas:
                     self.dash_pie_canvas.get_tk_widget().destroy()
-                    self.dash_pie_canvas = Non e
+                    self.dash_pie_canvas = None
                 # Only show if there are checks
                 if total_checks > 0:
-                    fig, ax = plt.subplots(figsize=(2.2, 2.2), dpi=80)
+                    fig = Figure(figsize=(2.2, 2.2), dpi=80)
+                    ax = fig.add_subplot()
                     labels = ['OK', 'NOT OK']
                     sizes = [ok_checks, not_ok_checks]
                     colors = ['#4CAF50', '#F44336']
@@ -2360,7 +2427,6 @@ class HealthCheckApp:
                     self.dash_pie_canvas = FigureCanvasTkAgg(fig, master=self.dash_pie_frame)
                     self.dash_pie_canvas.draw()
                     self.dash_pie_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-                    plt.close(fig)
             except ImportError:
                 # matplotlib not installed
                 if hasattr(self, 'dash_pie_canvas') and self.dash_pie_canvas:
@@ -2404,73 +2470,145 @@ class HealthCheckApp:
 
     def update_dashboard_calendar(self):
         """Update the dashboard calendar to highlight days with problems in red."""
-        import calendar as pycalendar
-        from datetime import datetime
         try:
-            # Clear all previous tags
+            # Month currently shown by the calendar
+            month, year = self.dash_calendar.get_displayed_month()
+        except Exception as e:
+            print(f"[ERROR] Calendar update failed: {e}")
+            return
+        problem_days = self.problem_cache.cached(year, month)
+        if problem_days is not None:
+            self.paint_dashboard_calendar(year, month, problem_days)
+            return
+        # Not cached yet: query in the background and paint when it arrives
+        self.db_worker.submit(
+            lambda job: self.problem_cache.get(year, month),
+            lambda days: self.paint_dashboard_calendar(year, month, days),
+            on_error=lambda e: print(f"[ERROR] Calendar update failed: {e}")
+        )
+
+    def paint_dashboard_calendar(self, year, month, problem_days):
+        try:
+            # The user may have navigated elsewhere while the month was loading
+            if self.dash_calendar.get_displayed_month() != (month, year):
+                return
+            # Color the whole month in a single pass
             self.dash_calendar.calevent_remove('all')
-            # Get current month/year
-            year = self.dash_calendar.selection_get().year if self.dash_calendar.selection_get() else datetime.now().year
-            month = self.dash_calendar.selection_get().month if self.dash_calendar.selection_get() else datetime.now().month
-            # For each day in month, check for NOT OK
-            for day in range(1, pycalendar.monthrange(year, month)[1] + 1):
-                table_name = f"health_check_{year}{month:02d}{day:02d}"
-                try:
-                    conn = mysql.connector.connect(**self.db_config)
-                    cursor = conn.cursor(dictionary=True)
-                    cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
-                    if cursor.fetchone():
-                        cursor.execute(f"SELECT status FROM {table_name}")
-                        statuses = [row['status'] for row in cursor.fetchall()]
-                        if any(s != 'OK' for s in statuses):
-                            # Mark this day as red
-                            date_str = f"{year}-{month:02d}-{day:02d}"
-                            self.dash_calendar.calevent_create(datetime(year, month, day), 'Problem', 'problem')
-                    cursor.close()
-                    conn.close()
-                except Exception:
-                    pass
+            for day in sorted(problem_days):
+                # Mark this day as red
+                self.dash_calendar.calevent_create(day, 'Problem', 'problem')
             self.dash_calendar.tag_config('problem', background='red', foreground='white')
+            # Warm the cache for the months the user is most likely to open next
+            self.problem_cache.prefetch(adjacent_months(year, month))
         except Exception as e:
             print(f"[ERROR] Calendar update failed: {e}")
 if __name__ == "__main__":
+    import argparse
+    import sys
+    if sys.argv[1:2] == ['report']:
+        # Headless report generation (cron): python work.py report --help
+        from healthcheck_core import cli
+        raise SystemExit(cli.main(sys.argv[2:], export_dir=DEFAULT_EXPORT_DIR))
+    if sys.argv[1:2] == ['serve']:
+        # Ingestion API without the UI: python work.py serve --help
+        from healthcheck_core import api
+        raise SystemExit(api.main(sys.argv[2:], export_dir=DEFAULT_EXPORT_DIR))
+    parser = argparse.ArgumentParser(description="System Health Monitor",
+                                     epilog="Without the UI: %(prog)s report --help (reports), %(prog)s serve --help (ingestion API)")
+    parser.add_argument('--migrate-day-tables', action='store_true',
+                        help=f"copy the legacy health_check_YYYYMMDD tables into {RESULTS_TABLE} and exit")
+    parser.add_argument('--drop-legacy-tables', action='store_true',
+                        help="with --migrate-day-tables, drop each legacy table once it has been copied")
+    parser.add_argument('--backfill-summary', action='store_true',
+                        help=f"rebuild {SUMMARY_TABLE} from the full history and exit")
+    parser.add_argument('--backfill-sensors', metavar='START_DATE',
+                        help="load Zabbix sensor history from START_DATE (YYYY-MM-DD) into the reading store and exit; "
+                             "resumes an interrupted run")
+    parser.add_argument('--backfill-until', metavar='END_DATE',
+                        help="with --backfill-sensors, the last day to load (default: today)")
+    parser.add_argument('--import-checks', metavar='CSV',
+                        help=f"add or update the checks of {CHECKS_TABLE} from a CSV file with check_name and category "
+                             "columns (optional: room, sort_order, active) and exit")
+    parser.add_argument('--api-port', type=int, metavar='PORT',
+                        help="also serve the ingestion API on PORT while the app runs (see: serve --help)")
+    parser.add_argument('--db-pool-size', type=int, metavar='N',
+                        help=f"database connections to keep open (default: {DB_POOL_SIZE})")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="write the collected timings as a JSON trace file to PATH on exit")
+    parser.add_argument('--zabbix-config', default=os.path.join(DEFAULT_EXPORT_DIR, 'zabbix_config.json'),
+                        help="Zabbix settings file used by --backfill-sensors")
+    args = parser.parse_args()
+    if args.trace:
+        import atexit
+        atexit.register(instrumentation.write_trace, args.trace)
+
+    db_config = dict(DEFAULT_DB_CONFIG)
+    if args.db_pool_size:
+        db_config['pool_size'] = args.db_pool_size
+
+    if args.migrate_day_tables or args.backfill_summary:
+        ensure_schema(db_config)
+        db_pool = get_db_pool(db_config)
+        if args.migrate_day_tables:
+            copied = migrate_day_tables(db_pool, drop_legacy=args.drop_legacy_tables)
+            print(f"[INFO] Migrated {copied} legacy day tables into {RESULTS_TABLE}")
+        if args.backfill_summary:
+            written = backfill_daily_summary(db_pool)
+            print(f"[INFO] Backfilled {written} rows into {SUMMARY_TABLE}")
+        raise SystemExit(0)
+
+    if args.import_checks:
+        ensure_schema(db_config)
+        with open(args.import_checks, newline='', encoding='utf-8-sig') as f:
+            checks = [row for row in csv.DictReader(f) if (row.get('check_name') or '').strip()]
+        for i, check in enumerate(checks):
+            check['check_name'] = check['check_name'].strip()
+            check['sort_order'] = check.get('sort_order') or i
+        try:
+            written = upsert_checks(get_db_pool(db_config), checks)
+        except ValueError as e:
+            print(f"[ERROR] Could not import checks: {e}")
+            raise SystemExit(1)
+        print(f"[INFO] Imported {written} checks into {CHECKS_TABLE}")
+        raise SystemExit(0)
+
+    if args.backfill_sensors:
+        ensure_schema(db_config)
+        start = datetime.strptime(args.backfill_sensors, '%Y-%m-%d').date()
+        until = datetime.strptime(args.backfill_until, '%Y-%m-%d').date() if args.backfill_until else datetime.now().date()
+        zabbix_config = read_zabbix_config(args.zabbix_config)
+        client = ZabbixClient(zabbix_config['url'], zabbix_config.get('username'),
+                              zabbix_config.get('password'), zabbix_config.get('api_token'))
+        try:
+            written = backfill_sensor_history(
+                client, ReadingStore(get_db_pool(db_config)), load_metric_registry(zabbix_config), start, until,
+                progress=lambda done, total: print(f"[INFO] Backfilled chunk {done}/{total}")
+            )
+        finally:
+            client.close()
+        print(f"[INFO] Backfilled {written} sensor rows from {start} to {until}")
+        raise SystemExit(0)
+
     def start_main_app(username):
         login_root.destroy()
         main_root = tk.Tk()
-        app = HealthCheckApp(main_root, username=username)
+        app = HealthCheckApp(main_root, username=username, db_config=db_config, api_port=args.api_port)
         main_root.mainloop()
 
     # Show login window first
     login_root = tk.Tk()
-    db_config = {
-        'host': 'localhost',
-        'user': 'root',
-        'password': '123456',
-        'database': 'health_checks_db'
-    }
-    # Ensure users table exists before login
+    startup_timer.mark("tk")
+    # Bring the schema up to date before login
     try:
-        conn = mysql.connector.connect(
-            host=db_config['host'],
-            user=db_config['user'],
-            password=db_config['password']
-        )
-        cursor = conn.cursor()
-        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_config['database']}")
-        conn.commit()
-        conn.database = db_config['database']
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                username VARCHAR(50) NOT NULL UNIQUE,
-                password VARCHAR(128) NOT NULL
-            )
-        """)
-        conn.commit()
-        cursor.close()
-        conn.close()
+        ensure_schema(db_config)
     except Exception as err:
         messagebox.showerror("Database Error", f"Error initializing database: {err}")
+    startup_timer.mark("db bootstrap")
 
     login_app = LoginWindow(login_root, db_config, on_success=start_main_app)
+    startup_timer.mark("widgets")
+    def report_login_ready():
+        startup_timer.mark("first paint")
+        startup_timer.report("Login window ready")
+    login_root.after_idle(report_login_ready)
     login_root.mainloop()